@@ -1,34 +1,131 @@
 """
 Authentication utilities for Clerk JWT verification.
+
+Verified token payloads are cached (keyed by a hash of the token, never past
+its `exp`), so a dashboard making many requests with the same session token
+pays for one RS256 verification. Clerk's signing keys are fetched and
+refreshed by a background thread started with the app (startup itself does
+no network I/O); requests only read the in-memory key set and never wait on
+the JWKS endpoint.
 """
+import hashlib
 import os
-from typing import Optional
-from functools import lru_cache
+import threading
+import time
+from typing import Dict, Optional
 
-import httpx
 import jwt
-from jwt import PyJWKClient
 from fastapi import HTTPException, Header
 
+from api.cache import TTLCache
+from api.http_clients import get_sync_client
+from api.timing import span
+
 
 # Clerk configuration
 CLERK_ISSUER = os.environ.get("CLERK_ISSUER", "")  # e.g., https://crisp-kite-78.clerk.accounts.dev
 CLERK_SECRET_KEY = os.environ.get("CLERK_SECRET_KEY", "")
 
+# How often signing keys are re-fetched, and the minimum gap between fetches
+# triggered by tokens signed with an unknown key
+JWKS_REFRESH_SECONDS = float(os.environ.get("JWKS_REFRESH_SECONDS", "300"))
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30.0
 
-@lru_cache()
-def get_jwks_client():
-    """Get the JWKS client for Clerk JWT verification."""
-    jwks_url = f"{CLERK_ISSUER}/.well-known/jwks.json"
-    return PyJWKClient(jwks_url)
+# Verified token payloads, keyed by sha256 of the token
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_TOKEN_CACHE_MAX_ENTRIES", "4096"))
 
+_token_cache = TTLCache(maxsize=AUTH_TOKEN_CACHE_MAX_ENTRIES, ttl=60.0)
 
-def verify_clerk_token(token: str) -> dict:
-    """Verify a Clerk JWT and return the payload."""
+
+# ─────────────────────────────────────────────────────────────
+# SIGNING KEYS (JWKS)
+# ─────────────────────────────────────────────────────────────
+
+
+class JWKSCache:
+    """Clerk's signing keys by key ID, refreshed in the background."""
+
+    def __init__(self, jwks_url: str, refresh_seconds: float = JWKS_REFRESH_SECONDS):
+        self.jwks_url = jwks_url
+        self.refresh_seconds = refresh_seconds
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._loaded = False
+        self._last_fetch = 0.0
+        self._fetch_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, jwks: dict) -> None:
+        """Replace the key set from a JWKS document."""
+        keys = {}
+        for key in jwt.PyJWKSet.from_dict(jwks).keys:
+            if key.key_id:
+                keys[key.key_id] = key
+        self._keys = keys
+        self._loaded = True
+
+    def refresh(self) -> None:
+        """Fetch the JWKS document now."""
+        with self._fetch_lock:
+            self._last_fetch = time.monotonic()
+            response = get_sync_client("clerk").get(self.jwks_url)
+            response.raise_for_status()
+            self.load(response.json())
+
+    def get(self, key_id: Optional[str]) -> Optional[jwt.PyJWK]:
+        """
+        Look up a signing key without waiting on the network.
+
+        Only before the first successful fetch (e.g. the Lambda handler,
+        which skips the lifespan) is the key set fetched inline. An unknown
+        key ID wakes the background refresher instead; that request fails,
+        and requests after the refresh succeed.
+        """
+        if not self._loaded:
+            print("🔑 JWKS not prefetched, fetching inline")
+            self.refresh()
+        key = self._keys.get(key_id)
+        if key is None and time.monotonic() - self._last_fetch >= JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+            self._wake.set()
+        return key
+
+    def start(self) -> None:
+        """
+        Start the background refresher, which prefetches the keys right away
+        (idempotent; returns without waiting on the network).
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Background loop: fetch now, then periodically or early when woken."""
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ JWKS refresh failed, keeping {len(self._keys)} cached keys: {e}")
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+
+jwks_cache = JWKSCache(f"{CLERK_ISSUER}/.well-known/jwks.json")
+
+
+# ─────────────────────────────────────────────────────────────
+# TOKEN VERIFICATION
+# ─────────────────────────────────────────────────────────────
+
+
+def _decode_clerk_token(token: str) -> dict:
+    """Fully verify a Clerk JWT (signature, issuer, expiry) and return the payload."""
     try:
-        jwks_client = get_jwks_client()
-        signing_key = jwks_client.get_signing_key_from_jwt(token)
-        
+        key_id = jwt.get_unverified_header(token).get("kid")
+        signing_key = jwks_cache.get(key_id)
+        if signing_key is None:
+            raise HTTPException(status_code=401, detail="Invalid token: unknown signing key")
+
         payload = jwt.decode(
             token,
             signing_key.key,
@@ -48,19 +145,39 @@ def verify_clerk_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
 
+def verify_clerk_token(token: str) -> dict:
+    """Verify a Clerk JWT and return the payload (cached until the token expires)."""
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
+    with span("auth", "verify_token"):
+        payload = _decode_clerk_token(token)
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.set(cache_key, payload, ttl=remaining)
+    return payload
+
+
+def get_auth_cache_stats() -> dict:
+    """Hit/miss counters for the verified-token cache."""
+    return _token_cache.stats()
+
+
 def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
     """FastAPI dependency to get current user ID from Clerk JWT."""
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
-    
+
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization format")
-    
+
     token = authorization.split(" ", 1)[1]
     payload = verify_clerk_token(token)
-    
+
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="User ID not found in token")
-    
+
     return user_id
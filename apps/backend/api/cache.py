@@ -0,0 +1,221 @@
+"""
+In-process caching utilities.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Keeps hit/miss counters so the effect of a cache can be measured.
+
+    A read-through caller that loads a value while another thread writes it
+    can pass the generation() taken before its load to set(): the value is
+    then dropped if the key was invalidated meanwhile, since it may predate
+    the write.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Generation of each key's last invalidation (the most recent maxsize
+        # keys), and the newest generation forgotten when trimming them
+        self._generation = 0
+        self._invalidations: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._forgotten_generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def generation(self) -> int:
+        """Current invalidation generation; take it before loading a value to set()."""
+        with self._lock:
+            return self._generation
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        With `generation` (from generation(), taken before the value was
+        loaded), nothing is stored if the key was invalidated since.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None:
+                invalidated = self._invalidations.get(key, self._forgotten_generation)
+                if invalidated > generation:
+                    return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry, and any value for it still being loaded."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+            self._invalidations[key] = self._generation
+            self._invalidations.move_to_end(key)
+            while len(self._invalidations) > self.maxsize:
+                _, forgotten = self._invalidations.popitem(last=False)
+                self._forgotten_generation = forgotten
+
+    def clear(self) -> None:
+        """Drop every entry, and any value still being loaded (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._invalidations.clear()
+            self._forgotten_generation = self._generation
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "size": len(self._data),
+            }
+
+
+class AsyncTTLCache:
+    """
+    Async read-through cache with single-flight loads and stale-while-revalidate.
+
+    Within `ttl` an entry is served as is. For a further `stale_ttl` it is
+    still served, but a background refresh is started. Concurrent misses
+    for a key share one load instead of each calling the loader. Failed
+    loads are never cached; a failed background refresh keeps the stale
+    value until it runs out.
+
+    Besides hit/miss counters it records how long loads take, i.e. the
+    latency of the upstream behind the cache. Use from a single event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, stale_ttl: float = 300.0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        # key -> (value, fresh_until, stale_until)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_failures = 0
+        self.loads = 0
+        self.load_seconds_total = 0.0
+        self.load_seconds_max = 0.0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the value for `key`, calling `loader()` when it must be (re)loaded."""
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < stale_until:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                self._load(key, loader)
+                return value
+            del self._data[key]
+
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        # Shielded: a cancelled request must not cancel a load others await
+        return await asyncio.shield(self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> "asyncio.Task":
+        """Start (or join) the single in-flight load for a key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_load(key, loader))
+            # Background refreshes may have no awaiter; mark failures as seen
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _run_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Call the loader, time it and store the result."""
+        start = time.monotonic()
+        try:
+            value = await loader()
+        except BaseException as e:
+            self.load_failures += 1
+            if key in self._data:
+                print(f"⚠️ {self.name}: refresh of {key!r} failed, serving stale value: {e}")
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            self.loads += 1
+            self.load_seconds_total += elapsed
+            self.load_seconds_max = max(self.load_seconds_max, elapsed)
+            self._inflight.pop(key, None)
+
+        now = time.monotonic()
+        self._data[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and upstream load latency."""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": ((self.hits + self.stale_hits) / lookups) if lookups else 0.0,
+            "size": len(self._data),
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "load_seconds_avg": (self.load_seconds_total / self.loads) if self.loads else 0.0,
+            "load_seconds_max": self.load_seconds_max,
+        }
@@ -0,0 +1,36 @@
+"""
+Offloading blocking I/O (boto3, CloudWatch, SQS) from the event loop.
+
+Route handlers are `async def`, so calling synchronous boto3 directly would
+stall every other in-flight request on the worker. Blocking calls are run
+on a bounded thread pool instead; the bound keeps a burst of requests from
+opening more AWS connections than the client pools allow.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# Max concurrent blocking calls per process (also used to size boto3 pools)
+IO_EXECUTOR_WORKERS = int(os.environ.get("IO_EXECUTOR_WORKERS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="io")
+
+
+async def run_sync(func: Callable, *args, **kwargs):
+    """Run a blocking function on the I/O pool and await its result."""
+    loop = asyncio.get_running_loop()
+    # Copy the context so request-scoped contextvars are visible in the worker
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_executor, call)
+
+
+def offload(func: Callable) -> Callable:
+    """Wrap a blocking function as an awaitable with the same signature."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_sync(func, *args, **kwargs)
+    return wrapper
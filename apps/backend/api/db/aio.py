@@ -0,0 +1,41 @@
+"""
+Async data access for the FastAPI routes.
+
+Same functions and signatures as api.db.storage, but awaitable: each call
+runs on the bounded I/O pool so storage latency never blocks the event loop.
+"""
+from api.concurrency import offload
+from api.db import storage
+
+# Projects
+create_project = offload(storage.create_project)
+get_project = offload(storage.get_project)
+get_project_by_key = offload(storage.get_project_by_key)
+get_project_by_subdomain = offload(storage.get_project_by_subdomain)
+get_org_version = offload(storage.get_org_version)
+list_projects = offload(storage.list_projects)
+list_projects_page = offload(storage.list_projects_page)
+list_all_projects = offload(storage.list_all_projects)
+list_projects_changed_since = offload(storage.list_projects_changed_since)
+update_project = offload(storage.update_project)
+update_project_by_key = offload(storage.update_project_by_key)
+delete_project = offload(storage.delete_project)
+
+# Deployments
+create_deployment = offload(storage.create_deployment)
+get_deployment = offload(storage.get_deployment)
+list_deployments = offload(storage.list_deployments)
+list_deployments_page = offload(storage.list_deployments_page)
+list_org_deployments_page = offload(storage.list_org_deployments_page)
+update_deployment = offload(storage.update_deployment)
+
+# Usage
+get_org_usage = offload(storage.get_org_usage)
+update_org_usage = offload(storage.update_org_usage)
+increment_org_usage = offload(storage.increment_org_usage)
+
+# GitHub connections
+save_github_token = offload(storage.save_github_token)
+get_github_token = offload(storage.get_github_token)
+get_github_installation = offload(storage.get_github_installation)
+delete_github_connection = offload(storage.delete_github_connection)
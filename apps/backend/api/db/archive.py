@@ -0,0 +1,158 @@
+"""
+Cold archive for deployment history.
+
+Deployments that fall out of the retention window (see api.db.retention)
+are written here as gzipped NDJSON, one object per retention run:
+
+    deployments/{project_id}/{YYYY}/{MM}/{timestamp}-{id}.ndjson.gz
+
+The object store is S3 when DEPLOYMENT_ARCHIVE_BUCKET is set, otherwise a
+local directory (DEPLOYMENT_ARCHIVE_DIR) that stands in for it during local
+runs. On Lambda the bucket is required: the filesystem is read-only, so
+archiving fails with ArchiveNotConfiguredError instead. On S3 the layout can
+be queried directly with Athena (JSON SerDe, gzip).
+"""
+import os
+import gzip
+import json
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import List
+
+DEPLOYMENT_ARCHIVE_BUCKET = os.environ.get("DEPLOYMENT_ARCHIVE_BUCKET")
+DEPLOYMENT_ARCHIVE_DIR = os.environ.get("DEPLOYMENT_ARCHIVE_DIR", ".archive")
+
+ARCHIVE_PREFIX = "deployments"
+
+
+class ArchiveNotConfiguredError(RuntimeError):
+    """Raised when there is nowhere to archive deployment history."""
+
+
+class LocalObjectStore:
+    """Object store backed by a local directory (keys are relative paths)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, key: str, body: bytes) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as f:
+            return f.read()
+
+    def list(self, prefix: str) -> List[str]:
+        base = os.path.join(self.root, prefix)
+        keys = []
+        for dirpath, _, filenames in os.walk(base):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                keys.append(os.path.relpath(path, self.root).replace(os.sep, "/"))
+        return sorted(keys)
+
+
+class S3ObjectStore:
+    """Object store backed by an S3 bucket."""
+
+    def __init__(self, bucket: str):
+        import boto3
+
+        self.bucket = bucket
+        self.client = boto3.client("s3")
+
+    def put(self, key: str, body: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ContentType="application/x-ndjson",
+            ContentEncoding="gzip",
+        )
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return sorted(keys)
+
+
+@lru_cache(maxsize=None)
+def get_object_store():
+    """
+    Get the configured archive object store (cached).
+
+    Raises:
+        ArchiveNotConfiguredError: On Lambda without DEPLOYMENT_ARCHIVE_BUCKET
+    """
+    if DEPLOYMENT_ARCHIVE_BUCKET:
+        return S3ObjectStore(DEPLOYMENT_ARCHIVE_BUCKET)
+    if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        raise ArchiveNotConfiguredError(
+            "DEPLOYMENT_ARCHIVE_BUCKET is not set; Lambda's filesystem is read-only, "
+            "so deployment history cannot be archived"
+        )
+    return LocalObjectStore(DEPLOYMENT_ARCHIVE_DIR)
+
+
+def _json_default(value):
+    """Serialize DynamoDB numbers (Decimal) as plain JSON numbers."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_deployment_archive(project_id: str, deployments: List[dict]) -> str:
+    """
+    Archive deployment records as one gzipped NDJSON object.
+
+    Args:
+        project_id: Project the deployments belong to
+        deployments: Deployment records to archive
+
+    Returns:
+        The object key that was written
+    """
+    now = datetime.utcnow()
+    key = (
+        f"{ARCHIVE_PREFIX}/{project_id}/{now:%Y}/{now:%m}/"
+        f"{int(time.time())}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+    )
+    lines = (
+        json.dumps(d, default=_json_default, separators=(",", ":"), sort_keys=True)
+        for d in deployments
+    )
+    body = gzip.compress(("\n".join(lines) + "\n").encode())
+    get_object_store().put(key, body)
+    return key
+
+
+def read_archived_deployments(project_id: str) -> List[dict]:
+    """
+    Read every archived deployment for a project (newest first).
+
+    A deployment archived twice (e.g. a retention run interrupted after the
+    archive write) is returned once.
+    """
+    store = get_object_store()
+    deployments = {}
+    for key in store.list(f"{ARCHIVE_PREFIX}/{project_id}/"):
+        for line in gzip.decompress(store.get(key)).decode().splitlines():
+            if line:
+                record = json.loads(line)
+                deployments[record["deploy_id"]] = record
+    return sorted(deployments.values(), key=lambda d: d["SK"], reverse=True)
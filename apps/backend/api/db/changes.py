@@ -0,0 +1,88 @@
+"""
+In-process change feed for project records.
+
+Every project write made through api.db.storage is published here, and so
+are DynamoDB Streams records delivered to the API (writes made by other
+processes, e.g. the SQS deploy worker). Listeners receive the project's new
+state as a plain dict, or a dict with "deleted": True for deletions.
+
+Listeners are called synchronously on the writer's thread and must be
+quick; api.events hands changes off to the event loop.
+"""
+import threading
+from functools import lru_cache
+from typing import Callable, List
+
+ChangeListener = Callable[[dict], None]
+
+_listeners: List[ChangeListener] = []
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _get_deserializer():
+    """DynamoDB type deserializer (imported lazily: boto3 is optional here)."""
+    from boto3.dynamodb.types import TypeDeserializer
+
+    return TypeDeserializer()
+
+
+def subscribe(listener: ChangeListener) -> Callable[[], None]:
+    """Register a listener; returns a function that unregisters it."""
+    with _lock:
+        _listeners.append(listener)
+
+    def unsubscribe() -> None:
+        with _lock:
+            if listener in _listeners:
+                _listeners.remove(listener)
+
+    return unsubscribe
+
+
+def publish(change: dict) -> None:
+    """Deliver a project change to every listener."""
+    with _lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(change)
+        except Exception as e:
+            print(f"⚠️ Change listener failed: {e}")
+
+
+def stream_record_to_change(record: dict):
+    """
+    Convert a DynamoDB Streams record from the projects table to a change.
+
+    Returns None for records that are not about PROJECT# items (claims,
+    CONFIG# items, ...).
+    """
+    deserializer = _get_deserializer()
+    data = record.get("dynamodb", {})
+    keys = {k: deserializer.deserialize(v) for k, v in data.get("Keys", {}).items()}
+    if not str(keys.get("SK", "")).startswith("PROJECT#"):
+        return None
+
+    if record.get("eventName") == "REMOVE":
+        return {
+            "project_id": keys["SK"][len("PROJECT#"):],
+            "organization_id": keys["PK"][len("ORG#"):],
+            "deleted": True,
+        }
+
+    image = data.get("NewImage")
+    if not image:
+        return None
+    return {k: deserializer.deserialize(v) for k, v in image.items()}
+
+
+def handle_stream_records(records: List[dict]) -> int:
+    """Publish the project changes in a batch of DynamoDB Streams records."""
+    published = 0
+    for record in records:
+        change = stream_record_to_change(record)
+        if change is not None:
+            publish(change)
+            published += 1
+    return published
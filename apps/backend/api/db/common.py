@@ -0,0 +1,372 @@
+"""
+Backend-independent helpers shared by the storage implementations.
+
+Item layout, ID generation and pagination cursors live here so the DynamoDB
+and in-memory backends produce identical records.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import base64
+import hashlib
+import random
+import string
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from datetime import datetime
+
+# Shorlabs domain for custom URLs
+SHORLABS_DOMAIN = os.environ.get("SHORLABS_DOMAIN", "shorlabs.com")
+
+
+# ─────────────────────────────────────────────────────────────
+# PAGINATION
+# ─────────────────────────────────────────────────────────────
+
+# Default page size for paginated list operations
+DEFAULT_PAGE_SIZE = 50
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    """Encode a DynamoDB LastEvaluatedKey as an opaque, URL-safe cursor."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str],
+    key_attrs: Sequence[str],
+    partition: Tuple[str, str],
+    sk_prefix: str = "",
+) -> Optional[dict]:
+    """
+    Decode a cursor produced by encode_cursor back into an ExclusiveStartKey.
+
+    The key must be one the query could have returned: exactly the table's
+    (or index's) key attributes, in the partition being queried and within
+    the sort key prefix. Anything else would fail the query, or page through
+    another organization's or project's partition.
+
+    Args:
+        cursor: Cursor from the client (None or "" for the first page)
+        key_attrs: Key attributes of the table or index queried
+        partition: (attribute, value) of the partition queried
+        sk_prefix: Prefix the key's SK must have, if it has one
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or doesn't fit the query
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if (
+        not isinstance(key, dict)
+        or set(key) != set(key_attrs)
+        or not all(isinstance(value, str) for value in key.values())
+        or key[partition[0]] != partition[1]
+        or not key.get("SK", "").startswith(sk_prefix)
+    ):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return key
+
+
+# ─────────────────────────────────────────────────────────────
+# EXPIRY
+# ─────────────────────────────────────────────────────────────
+
+# Epoch-seconds attribute DynamoDB TTL deletes rows by. Rows past it are
+# hidden from reads until DynamoDB removes them (which can take a while).
+TTL_ATTRIBUTE = "ttl"
+
+
+def is_expired(item: dict, now: Optional[float] = None) -> bool:
+    """True if the item carries a TTL that has passed."""
+    expires_at = item.get(TTL_ATTRIBUTE)
+    if expires_at is None:
+        return False
+    return expires_at <= (time.time() if now is None else now)
+
+
+# ─────────────────────────────────────────────────────────────
+# IDS AND SUBDOMAINS
+# ─────────────────────────────────────────────────────────────
+
+
+def generate_project_id() -> str:
+    """Generate a unique project ID."""
+    return uuid.uuid4().hex[:12]
+
+
+def generate_deploy_id() -> str:
+    """Generate a unique deployment ID (Vercel-style)."""
+    chars = string.ascii_letters + string.digits
+    return ''.join(random.choices(chars, k=9))
+
+
+def slugify(text: str) -> str:
+    """
+    Convert a string to a URL-friendly slug.
+
+    Examples:
+        "My Project" -> "my-project"
+        "Test App 123" -> "test-app-123"
+    """
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    text = re.sub(r'[\s_]+', '-', text)
+    text = re.sub(r'-+', '-', text)
+    text = text.strip('-')
+    return text[:50]  # Max 50 chars for subdomain
+
+
+# Candidates tried before giving up on a name (base + 10 short suffixes + 1 long)
+SUBDOMAIN_CANDIDATES = 12
+
+
+class SubdomainUnavailableError(ValueError):
+    """Raised when no candidate subdomain could be claimed for a project."""
+
+
+def subdomain_candidates(project_name: str) -> Iterator[str]:
+    """
+    Yield candidate subdomains for a project, most readable first.
+
+    Examples:
+        "My Project" -> "my-project", "my-project-7x8k", ..., "my-project-1a2b3c4d"
+    """
+    base = slugify(project_name)
+    if not base:
+        base = "project"
+
+    yield base
+    for _ in range(SUBDOMAIN_CANDIDATES - 2):
+        yield f"{base}-{uuid.uuid4().hex[:4]}"
+    # Fallback to a longer suffix if too many collisions
+    yield f"{base}-{uuid.uuid4().hex[:8]}"
+
+
+def subdomain_claim_key(subdomain: str) -> dict:
+    """
+    Key of the item that reserves a subdomain in the projects table.
+
+    Claim items deliberately carry neither `subdomain` nor `project_id`, so
+    they stay out of the subdomain and project-id indexes.
+    """
+    return {"PK": f"SUBDOMAIN#{subdomain}", "SK": f"SUBDOMAIN#{subdomain}"}
+
+
+def build_subdomain_claim(subdomain: str, project_id: str) -> dict:
+    """Build the item that reserves `subdomain` for `project_id`."""
+    return dict(
+        subdomain_claim_key(subdomain),
+        claimed_by=project_id,
+        claimed_at=datetime.utcnow().isoformat(),
+    )
+
+
+def get_current_period() -> str:
+    """Get current billing period in YYYY-MM format."""
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+# ─────────────────────────────────────────────────────────────
+# ITEM LAYOUT
+# ─────────────────────────────────────────────────────────────
+
+
+# Project attributes stored on the separate CONFIG# item rather than the
+# PROJECT# item. Listings, status polls and the edge router only read the
+# small PROJECT# ("hot") item; env_vars in particular can be arbitrarily large.
+PROJECT_CONFIG_FIELDS = (
+    "env_vars",
+    "root_directory",
+    "start_command",
+    "memory",
+    "timeout",
+    "ephemeral_storage",
+)
+
+# Attributes returned by the project listing endpoint
+PROJECT_LIST_ATTRIBUTES = (
+    "project_id",
+    "organization_id",
+    "name",
+    "github_url",
+    "github_repo",
+    "status",
+    "function_url",
+    "subdomain",
+    "custom_url",
+    "created_at",
+    "updated_at",
+)
+
+
+def project_config_key(org_id: str, project_id: str) -> dict:
+    """Key of a project's CONFIG# item (same partition as the project)."""
+    return {"PK": f"ORG#{org_id}", "SK": f"CONFIG#{project_id}"}
+
+
+def org_version(items: Iterable[dict]) -> str:
+    """
+    An organization's project version, from its PROJECT# and TOMBSTONE# items.
+
+    Every project write advances the project's updated_at, and a deletion
+    replaces the PROJECT# item with a tombstone, so a digest of every item's
+    (SK, updated_at) changes with every write in the org, even one whose
+    clock is behind the org's newest write. List responses are validated
+    (ETag) with it, without a separate counter that each write would have to
+    bump.
+    """
+    digest = hashlib.sha256()
+    for sk, updated_at in sorted((item["SK"], item["updated_at"]) for item in items):
+        digest.update(f"{sk}|{updated_at}\n".encode())
+    return digest.hexdigest()
+
+
+# How long deletions are remembered for delta sync; clients that last synced
+# before this window must refetch the full list
+PROJECT_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("PROJECT_TOMBSTONE_RETENTION_DAYS", "30"))
+
+
+def build_project_tombstone(org_id: str, project_id: str) -> dict:
+    """
+    Build the TOMBSTONE# item recording a project deletion.
+
+    Tombstones carry organization_id and updated_at like project items, so
+    they show up in the org-updated index next to changed projects, and
+    expire through TTL after PROJECT_TOMBSTONE_RETENTION_DAYS.
+    """
+    deleted_at = datetime.utcnow().isoformat()
+    return {
+        "PK": f"ORG#{org_id}",
+        "SK": f"TOMBSTONE#{project_id}",
+        "organization_id": org_id,
+        "project_id": project_id,
+        "deleted_at": deleted_at,
+        "updated_at": deleted_at,
+        TTL_ATTRIBUTE: int(time.time()) + PROJECT_TOMBSTONE_RETENTION_DAYS * 86400,
+    }
+
+
+def split_project_fields(fields: dict) -> Tuple[dict, dict]:
+    """Split project attributes into (hot, config) parts."""
+    hot = {k: v for k, v in fields.items() if k not in PROJECT_CONFIG_FIELDS}
+    config = {k: v for k, v in fields.items() if k in PROJECT_CONFIG_FIELDS}
+    return hot, config
+
+
+def merge_project_config(project: dict, config: Optional[dict]) -> dict:
+    """
+    Combine a PROJECT# item with its CONFIG# item into the full project.
+
+    Projects written before the split still carry config fields on the
+    PROJECT# item; those are used when there is no CONFIG# item.
+    """
+    merged = dict(project)
+    if config:
+        merged.update({k: v for k, v in config.items() if k in PROJECT_CONFIG_FIELDS})
+    return merged
+
+
+def project_attributes(item: dict, attributes: Optional[Sequence[str]]) -> dict:
+    """Apply a projection to an item (all attributes when `attributes` is None)."""
+    if attributes is None:
+        return item
+    return {k: item[k] for k in attributes if k in item}
+
+
+def build_project_item(
+    project_id: str,
+    user_id: str,
+    organization_id: str,
+    name: str,
+    github_url: str,
+    github_repo: str,
+    env_vars: Optional[dict],
+    root_directory: str,
+    start_command: str,
+    subdomain: str,
+    memory: int,
+    timeout: int,
+    ephemeral_storage: int,
+) -> dict:
+    """
+    Build a new project item.
+
+    Projects use PK=ORG#{org_id} following Vercel's model where
+    organizations own projects, not individual users.
+    """
+    now = datetime.utcnow().isoformat()
+    return {
+        "PK": f"ORG#{organization_id}",
+        "SK": f"PROJECT#{project_id}",
+        "project_id": project_id,
+        "organization_id": organization_id,
+        "created_by": user_id,  # Track who created it (for audit)
+        "name": name,
+        "github_url": github_url,
+        "github_repo": github_repo,
+        "status": "PENDING",
+        "function_url": None,
+        "ecr_repo": None,
+        "env_vars": env_vars or {},
+        "root_directory": root_directory,
+        "start_command": start_command,
+        "subdomain": subdomain,
+        "custom_url": f"https://{subdomain}.{SHORLABS_DOMAIN}",
+        "memory": memory,
+        "timeout": timeout,
+        "ephemeral_storage": ephemeral_storage,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def build_deployment_item(
+    project_id: str,
+    build_id: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+) -> dict:
+    """
+    Build a new deployment item (SK sorts deployments by start time).
+
+    With organization_id set the deployment also appears in the org-wide
+    feed, which is keyed by (organization_id, started_at). A deployment can
+    be recorded before its build starts; build_id (an index key, so never
+    null) is then set once the build has started. request_id identifies the
+    deploy request, so a retried request finds its deployment again.
+    """
+    deploy_id = generate_deploy_id()
+    timestamp = int(time.time())
+    item = {
+        "project_id": project_id,
+        "SK": f"DEPLOY#{timestamp}#{deploy_id}",
+        "deploy_id": deploy_id,
+        "status": "IN_PROGRESS",
+        "phase": "START",
+        # Outputs of completed deploy stages, by stage name
+        "checkpoints": {},
+        "logs_url": None,
+        "started_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+    }
+    if build_id:
+        item["build_id"] = build_id
+    if organization_id:
+        item["organization_id"] = organization_id
+    if request_id:
+        item["request_id"] = request_id
+    return item
@@ -2,45 +2,183 @@
 DynamoDB operations for Shorlabs projects and deployments.
 """
 import os
-import re
+import copy
 import time
-import uuid
-import random
-import string
-from typing import Optional
+import functools
+import itertools
+from typing import Iterator, Optional, Sequence, Tuple, Union
 from datetime import datetime
 from decimal import Decimal
 
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from api.cache import TTLCache
+from api.concurrency import IO_EXECUTOR_WORKERS
+from api.db.common import (
+    DEFAULT_PAGE_SIZE,
+    TTL_ATTRIBUTE,
+    encode_cursor,
+    decode_cursor,
+    generate_project_id,
+    get_current_period,
+    SubdomainUnavailableError,
+    subdomain_candidates,
+    subdomain_claim_key,
+    build_subdomain_claim,
+    project_config_key,
+    org_version,
+    build_project_tombstone,
+    split_project_fields,
+    merge_project_config,
+    project_attributes,
+    build_project_item,
+    build_deployment_item,
+)
 
 # Table names
 TABLE_NAME = os.environ.get("DYNAMODB_TABLE", "shorlabs-projects")
 DEPLOYMENTS_TABLE_NAME = os.environ.get("DEPLOYMENTS_TABLE", "shorlabs-deployments")
 
-# Shorlabs domain for custom URLs
-SHORLABS_DOMAIN = os.environ.get("SHORLABS_DOMAIN", "shorlabs.com")
+# GSI used to resolve subdomain -> project with a single keyed query
+SUBDOMAIN_INDEX_NAME = "subdomain-index"
 
-# DynamoDB client
-dynamodb = boto3.resource("dynamodb")
+# GSI on the projects table for delta sync: (organization_id, updated_at).
+# Holds PROJECT# and TOMBSTONE# items (the only ones carrying both keys).
+ORG_UPDATED_INDEX_NAME = "org-updated-index"
+
+# GSI on the deployments table addressing a deployment by (project_id, deploy_id)
+DEPLOY_ID_INDEX_NAME = "deploy-id-index"
+
+# GSI on the deployments table for the org-wide feed: (organization_id, started_at)
+ORG_DEPLOYMENTS_INDEX_NAME = "org-deployments-index"
+
+# GSI on the deployments table resolving a CodeBuild build to its deployment
+BUILD_ID_INDEX_NAME = "build-id-index"
+
+# Read-through cache for project items. Entries are invalidated by this
+# process's own writes; the TTL bounds staleness from writes made by other
+# processes (e.g. the SQS deploy worker). Entries are copies: callers may
+# modify the projects they get.
+PROJECT_CACHE_TTL_SECONDS = float(os.environ.get("PROJECT_CACHE_TTL_SECONDS", "5"))
+PROJECT_CACHE_MAX_ENTRIES = int(os.environ.get("PROJECT_CACHE_MAX_ENTRIES", "1024"))
+_project_cache = TTLCache(maxsize=PROJECT_CACHE_MAX_ENTRIES, ttl=PROJECT_CACHE_TTL_SECONDS)
+
+
+@functools.lru_cache(maxsize=None)
+def get_dynamodb_resource():
+    """
+    DynamoDB resource, created on first use so importing this module needs
+    no AWS configuration. The connection pool is sized to the API's I/O pool
+    so concurrent offloaded calls don't queue for a connection.
+    """
+    return boto3.resource(
+        "dynamodb",
+        config=Config(max_pool_connections=IO_EXECUTOR_WORKERS),
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# TABLE REGISTRY
+# ─────────────────────────────────────────────────────────────
+
+# Process-wide table handles, keyed by table name. Each table is bootstrapped
+# (one DescribeTable) the first time it is used in a process; after that the
+# request path only issues the actual reads and writes.
+_table_registry: dict = {}
+
+
+class TableNotProvisionedError(RuntimeError):
+    """Raised when a table is missing; run `python -m api.db.provision`."""
+
+
+def _get_table(table_name: str):
+    """Return the cached handle for a table, bootstrapping it on first use."""
+    table = _table_registry.get(table_name)
+    if table is not None:
+        return table
+
+    table = get_dynamodb_resource().Table(table_name)
+    try:
+        table.load()
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
+        raise TableNotProvisionedError(
+            f"DynamoDB table {table_name} does not exist. "
+            "Run `python -m api.db.provision` to create it."
+        )
+    _table_registry[table_name] = table
+    return table
+
+
+def _revalidate_tables(func):
+    """
+    Retry a data-access call once after a ResourceNotFound error.
+
+    The cached handles are dropped so the retry re-bootstraps every table it
+    touches; if a table really is gone, that surfaces as
+    TableNotProvisionedError instead of an opaque ClientError.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ResourceNotFoundException":
+                raise
+            print(f"⚠️ DynamoDB resource not found in {func.__name__}, re-validating tables")
+            _table_registry.clear()
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def get_projects_table():
+    """Get the projects table handle."""
+    return _get_table(TABLE_NAME)
+
+
+def get_deployments_table():
+    """Get the deployments table handle."""
+    return _get_table(DEPLOYMENTS_TABLE_NAME)
+
+
+# ─────────────────────────────────────────────────────────────
+# TABLE PROVISIONING
+# ─────────────────────────────────────────────────────────────
 
 
 def get_or_create_table():
     """
-    Backwards-compatible helper for the *projects* table.
+    Get or create the *projects* table (provisioning only).
     
     NOTE: Deployments now live in a separate table. For deployments, use
-    get_or_create_deployments_table instead.
+    get_or_create_deployments_table instead. Request-path code should use
+    get_projects_table, which never creates tables.
     """
     try:
-        table = dynamodb.Table(TABLE_NAME)
+        table = get_dynamodb_resource().Table(TABLE_NAME)
         table.load()
+        _ensure_index(
+            table,
+            _subdomain_index_definition(),
+            [{"AttributeName": "subdomain", "AttributeType": "S"}],
+        )
+        _ensure_index(
+            table,
+            _org_updated_index_definition(),
+            [
+                {"AttributeName": "organization_id", "AttributeType": "S"},
+                {"AttributeName": "updated_at", "AttributeType": "S"},
+            ],
+        )
+        _ensure_ttl(table, TTL_ATTRIBUTE)
         return table
-    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
         pass
 
     print(f"📦 Creating DynamoDB table: {TABLE_NAME}")
-    table = dynamodb.create_table(
+    table = get_dynamodb_resource().create_table(
         TableName=TABLE_NAME,
         KeySchema=[
             {"AttributeName": "PK", "KeyType": "HASH"},
@@ -50,6 +188,9 @@ def get_or_create_table():
             {"AttributeName": "PK", "AttributeType": "S"},
             {"AttributeName": "SK", "AttributeType": "S"},
             {"AttributeName": "project_id", "AttributeType": "S"},
+            {"AttributeName": "subdomain", "AttributeType": "S"},
+            {"AttributeName": "organization_id", "AttributeType": "S"},
+            {"AttributeName": "updated_at", "AttributeType": "S"},
         ],
         GlobalSecondaryIndexes=[
             {
@@ -59,14 +200,116 @@ def get_or_create_table():
                 ],
                 "Projection": {"ProjectionType": "ALL"},
             },
+            _subdomain_index_definition(),
+            _org_updated_index_definition(),
         ],
         BillingMode="PAY_PER_REQUEST",
     )
     table.wait_until_exists()
+    # Tombstones of deleted projects expire through TTL
+    _ensure_ttl(table, TTL_ATTRIBUTE)
     print(f"✅ Created DynamoDB table: {TABLE_NAME}")
     return table
 
 
+def _subdomain_index_definition() -> dict:
+    """GSI definition for subdomain lookups (only project items carry `subdomain`)."""
+    return {
+        "IndexName": SUBDOMAIN_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "subdomain", "KeyType": "HASH"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _org_updated_index_definition() -> dict:
+    """GSI definition for an organization's projects ordered by updated_at."""
+    return {
+        "IndexName": ORG_UPDATED_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "organization_id", "KeyType": "HASH"},
+            {"AttributeName": "updated_at", "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _deploy_id_index_definition() -> dict:
+    """GSI definition for direct (project_id, deploy_id) deployment lookups."""
+    return {
+        "IndexName": DEPLOY_ID_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "project_id", "KeyType": "HASH"},
+            {"AttributeName": "deploy_id", "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _org_deployments_index_definition() -> dict:
+    """GSI definition for an organization's deployments, newest first."""
+    return {
+        "IndexName": ORG_DEPLOYMENTS_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "organization_id", "KeyType": "HASH"},
+            {"AttributeName": "started_at", "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _build_id_index_definition() -> dict:
+    """GSI definition for build completion events: build_id -> deployment."""
+    return {
+        "IndexName": BUILD_ID_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "build_id", "KeyType": "HASH"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _wait_for_indexes(table) -> None:
+    """Block until no index on the table is still being created or backfilled."""
+    while True:
+        table.reload()
+        pending = [
+            i["IndexName"]
+            for i in table.global_secondary_indexes or []
+            if i["IndexStatus"] != "ACTIVE"
+        ]
+        if table.table_status == "ACTIVE" and not pending:
+            return
+        print(f"⏳ Waiting for {table.name} indexes: {', '.join(pending) or table.table_status}")
+        time.sleep(10)
+
+
+def _ensure_index(table, index_definition: dict, attribute_definitions: list) -> None:
+    """
+    Add a GSI to an existing table if it is missing.
+
+    DynamoDB backfills the new index from existing items in the background,
+    so items written before the index existed become queryable without a
+    separate data migration. Only one index can be created at a time, so
+    any in-flight index creation is awaited first.
+    """
+    index_name = index_definition["IndexName"]
+    indexes = table.global_secondary_indexes or []
+    if any(i["IndexName"] == index_name for i in indexes):
+        return
+
+    _wait_for_indexes(table)
+    print(f"📦 Adding {index_name} to DynamoDB table: {table.name}")
+    get_dynamodb_resource().meta.client.update_table(
+        TableName=table.name,
+        AttributeDefinitions=attribute_definitions,
+        GlobalSecondaryIndexUpdates=[
+            {"Create": index_definition},
+        ],
+    )
+
+
 def get_or_create_deployments_table():
     """
     Get or create the dedicated deployments table.
@@ -74,16 +317,42 @@ def get_or_create_deployments_table():
     Schema:
       - PK: project_id (HASH)
       - SK: sort key, e.g. "DEPLOY#<ts>#<deploy_id>"
+      - deploy-id-index: (project_id, deploy_id) for direct addressing
+      - org-deployments-index: (organization_id, started_at) for the org feed
+      - build-id-index: build_id, for CodeBuild completion events
+      - TTL on `ttl`, set by the retention policy on archived rows
     """
     try:
-        table = dynamodb.Table(DEPLOYMENTS_TABLE_NAME)
+        table = get_dynamodb_resource().Table(DEPLOYMENTS_TABLE_NAME)
         table.load()
+        _ensure_index(
+            table,
+            _deploy_id_index_definition(),
+            [
+                {"AttributeName": "project_id", "AttributeType": "S"},
+                {"AttributeName": "deploy_id", "AttributeType": "S"},
+            ],
+        )
+        _ensure_index(
+            table,
+            _org_deployments_index_definition(),
+            [
+                {"AttributeName": "organization_id", "AttributeType": "S"},
+                {"AttributeName": "started_at", "AttributeType": "S"},
+            ],
+        )
+        _ensure_index(
+            table,
+            _build_id_index_definition(),
+            [{"AttributeName": "build_id", "AttributeType": "S"}],
+        )
+        _ensure_ttl(table, TTL_ATTRIBUTE)
         return table
-    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
         pass
 
     print(f"📦 Creating DynamoDB deployments table: {DEPLOYMENTS_TABLE_NAME}")
-    table = dynamodb.create_table(
+    table = get_dynamodb_resource().create_table(
         TableName=DEPLOYMENTS_TABLE_NAME,
         KeySchema=[
             {"AttributeName": "project_id", "KeyType": "HASH"},
@@ -92,76 +361,128 @@ def get_or_create_deployments_table():
         AttributeDefinitions=[
             {"AttributeName": "project_id", "AttributeType": "S"},
             {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "deploy_id", "AttributeType": "S"},
+            {"AttributeName": "organization_id", "AttributeType": "S"},
+            {"AttributeName": "started_at", "AttributeType": "S"},
+            {"AttributeName": "build_id", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            _deploy_id_index_definition(),
+            _org_deployments_index_definition(),
+            _build_id_index_definition(),
         ],
         BillingMode="PAY_PER_REQUEST",
     )
     table.wait_until_exists()
+    _ensure_ttl(table, TTL_ATTRIBUTE)
     print(f"✅ Created DynamoDB deployments table: {DEPLOYMENTS_TABLE_NAME}")
     return table
 
 
-def generate_project_id() -> str:
-    """Generate a unique project ID."""
-    return uuid.uuid4().hex[:12]
+def _ensure_ttl(table, attribute_name: str) -> None:
+    """Enable DynamoDB TTL on a table if it is not already enabled."""
+    client = get_dynamodb_resource().meta.client
+    description = client.describe_time_to_live(TableName=table.name)
+    status = description.get("TimeToLiveDescription", {}).get("TimeToLiveStatus")
+    if status in ("ENABLED", "ENABLING"):
+        return
+
+    print(f"📦 Enabling TTL on {attribute_name} for DynamoDB table: {table.name}")
+    client.update_time_to_live(
+        TableName=table.name,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": attribute_name},
+    )
 
 
-def generate_deploy_id() -> str:
-    """Generate a unique deployment ID (Vercel-style)."""
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choices(chars, k=9))
+def provision_tables() -> None:
+    """Create every Shorlabs table (and missing indexes) if needed."""
+    get_or_create_table()
+    get_or_create_deployments_table()
+    get_or_create_org_usage_table()
+    get_or_create_github_connections_table()
 
 
 # ─────────────────────────────────────────────────────────────
-# PROJECT OPERATIONS
+# PAGINATION
 # ─────────────────────────────────────────────────────────────
 
-
-def slugify(text: str) -> str:
+def _query_pages(
+    table,
+    page_size: int,
+    cursor: Optional[str],
+    key_attrs: Sequence[str],
+    partition: Tuple[str, str],
+    sk_prefix: str = "",
+    **query_kwargs,
+) -> Iterator[Tuple[list, Optional[str]]]:
     """
-    Convert a string to a URL-friendly slug.
-    
-    Examples:
-        "My Project" -> "my-project"
-        "Test App 123" -> "test-app-123"
+    Lazily yield (items, next_cursor) pages for a query.
+
+    Each page is a single Query call, so callers that only need the first
+    page never read the rest of the partition. `key_attrs`, `partition` and
+    `sk_prefix` describe the keys the query returns; a cursor that isn't one
+    of them raises InvalidCursorError (see decode_cursor).
     """
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s-]', '', text)
-    text = re.sub(r'[\s_]+', '-', text)
-    text = re.sub(r'-+', '-', text)
-    text = text.strip('-')
-    return text[:50]  # Max 50 chars for subdomain
+    start_key = decode_cursor(cursor, key_attrs, partition, sk_prefix)
+    while True:
+        kwargs = dict(query_kwargs, Limit=page_size)
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = table.query(**kwargs)
+        start_key = response.get("LastEvaluatedKey")
+        yield response.get("Items", []), encode_cursor(start_key)
+        if not start_key:
+            return
 
 
-def generate_unique_subdomain(project_name: str) -> str:
+# ─────────────────────────────────────────────────────────────
+# PROJECT OPERATIONS
+# ─────────────────────────────────────────────────────────────
+
+
+def _first_condition_failed(error: ClientError) -> bool:
+    """True if a transaction was cancelled by the condition on its first item."""
+    if error.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+        return False
+    reasons = error.response.get("CancellationReasons") or []
+    return bool(reasons) and reasons[0].get("Code") == "ConditionalCheckFailed"
+
+
+@_revalidate_tables
+def claim_subdomain(project_id: str, project_name: str, subdomain: str = None) -> str:
     """
-    Generate a unique subdomain for a project.
+    Reserve a subdomain for an existing project by writing its claim item.
     
-    If the base subdomain is taken, adds a random suffix.
+    Used to backfill claims for projects created before subdomain claims
+    existed. Idempotent: a claim already held by the project is reused.
     
-    Examples:
-        "My Project" -> "my-project"
-        "My Project" (if taken) -> "my-project-7x8k"
+    Args:
+        project_id: Project that should own the subdomain
+        project_name: Used to derive candidates when `subdomain` is taken
+        subdomain: Preferred subdomain (e.g. the one the project already has)
+        
+    Returns:
+        The claimed subdomain
     """
-    base = slugify(project_name)
-    if not base:
-        base = "project"
-    
-    subdomain = base
-    
-    # Check if subdomain is already taken
-    attempt = 0
-    while get_project_by_subdomain(subdomain) is not None:
-        suffix = uuid.uuid4().hex[:4]
-        subdomain = f"{base}-{suffix}"
-        attempt += 1
-        if attempt > 10:
-            # Fallback to full UUID if too many collisions
-            subdomain = f"{base}-{uuid.uuid4().hex[:8]}"
-            break
-    
-    return subdomain
-
-
+    table = get_projects_table()
+    candidates = subdomain_candidates(project_name)
+    if subdomain:
+        candidates = itertools.chain([subdomain], candidates)
+
+    for candidate in candidates:
+        try:
+            table.put_item(
+                Item=build_subdomain_claim(candidate, project_id),
+                ConditionExpression="attribute_not_exists(PK) OR claimed_by = :pid",
+                ExpressionAttributeValues={":pid": project_id},
+            )
+            return candidate
+        except get_dynamodb_resource().meta.client.exceptions.ConditionalCheckFailedException:
+            continue
+    raise SubdomainUnavailableError(f"No subdomain available for {project_name!r}")
+
+
+@_revalidate_tables
 def get_project_by_subdomain(subdomain: str) -> Optional[dict]:
     """
     Look up a project by its subdomain.
@@ -174,21 +495,18 @@ def get_project_by_subdomain(subdomain: str) -> Optional[dict]:
     Returns:
         Project dict if found, None otherwise
     """
-    table = get_or_create_table()
-    
-    # Scan for projects with matching subdomain
-    # Note: In production with many projects, use a GSI on subdomain
-    response = table.scan(
-        FilterExpression="subdomain = :sd AND begins_with(SK, :sk_prefix)",
-        ExpressionAttributeValues={
-            ":sd": subdomain,
-            ":sk_prefix": "PROJECT#",
-        },
+    table = get_projects_table()
+
+    response = table.query(
+        IndexName=SUBDOMAIN_INDEX_NAME,
+        KeyConditionExpression=Key("subdomain").eq(subdomain),
+        Limit=1,
     )
     items = response.get("Items", [])
     return items[0] if items else None
 
 
+@_revalidate_tables
 def create_project(
     user_id: str,
     organization_id: str,
@@ -208,124 +526,524 @@ def create_project(
     
     Projects use PK=ORG#{org_id} following Vercel's model where
     organizations own projects, not individual users.
-    """
-    table = get_or_create_table()
-    project_id = generate_project_id()
-    now = datetime.utcnow().isoformat()
     
-    # Generate unique subdomain if not provided
-    if not subdomain:
-        subdomain = generate_unique_subdomain(name)
+    The project is stored as a small PROJECT# item plus a CONFIG# item
+    holding env vars and compute settings (see PROJECT_CONFIG_FIELDS). The
+    subdomain is reserved by a SUBDOMAIN#<name> claim item written in the
+    same transaction as both, so two projects can never share a
+    subdomain. A collision only costs a retry of that transaction with the
+    next candidate; no reads are needed.
     
-    # Build custom URL
-    custom_url = f"https://{subdomain}.{SHORLABS_DOMAIN}"
+    Raises:
+        SubdomainUnavailableError: If the subdomain (or every candidate
+            derived from the name) is already claimed
+    """
+    table = get_projects_table()
+    # The resource's client serializes plain Python values, like Table does
+    client = get_dynamodb_resource().meta.client
+    project_id = generate_project_id()
 
-    # Use ORG# for PK - organizations own projects (Vercel-like model)
-    item = {
-        "PK": f"ORG#{organization_id}",
-        "SK": f"PROJECT#{project_id}",
-        "project_id": project_id,
-        "organization_id": organization_id,
-        "created_by": user_id,  # Track who created it (for audit)
-        "name": name,
-        "github_url": github_url,
-        "github_repo": github_repo,
-        "status": "PENDING",
-        "function_url": None,
-        "ecr_repo": None,
-        "env_vars": env_vars or {},
-        "root_directory": root_directory,
-        "start_command": start_command,
-        "subdomain": subdomain,
-        "custom_url": custom_url,
-        "memory": memory,
-        "timeout": timeout,
-        "ephemeral_storage": ephemeral_storage,
-        "created_at": now,
-        "updated_at": now,
+    # An explicit subdomain is all-or-nothing; otherwise derive from the name
+    candidates = [subdomain] if subdomain else subdomain_candidates(name)
+
+    for candidate in candidates:
+        item = build_project_item(
+            project_id=project_id,
+            user_id=user_id,
+            organization_id=organization_id,
+            name=name,
+            github_url=github_url,
+            github_repo=github_repo,
+            env_vars=env_vars,
+            root_directory=root_directory,
+            start_command=start_command,
+            subdomain=candidate,
+            memory=memory,
+            timeout=timeout,
+            ephemeral_storage=ephemeral_storage,
+        )
+        hot, config = split_project_fields(item)
+        try:
+            client.transact_write_items(
+                TransactItems=[
+                    {
+                        "Put": {
+                            "TableName": table.name,
+                            "Item": build_subdomain_claim(candidate, project_id),
+                            "ConditionExpression": "attribute_not_exists(PK)",
+                        }
+                    },
+                    {
+                        "Put": {
+                            "TableName": table.name,
+                            "Item": hot,
+                            "ConditionExpression": "attribute_not_exists(PK)",
+                        }
+                    },
+                    {
+                        "Put": {
+                            "TableName": table.name,
+                            "Item": dict(project_config_key(organization_id, project_id), **config),
+                        }
+                    },
+                ]
+            )
+            return item
+        except ClientError as e:
+            if not _first_condition_failed(e):
+                raise
+            print(f"⚠️ Subdomain {candidate} is taken, trying another")
+
+    raise SubdomainUnavailableError(
+        f"Subdomain {subdomain!r} is already taken" if subdomain
+        else f"No subdomain available for {name!r}"
+    )
+
+
+@_revalidate_tables
+def get_org_version(org_id: str) -> str:
+    """
+    Get an organization's project version.
+
+    The version changes whenever any project in the org is created, updated
+    or deleted, so it validates project listings without reading them. It is
+    computed from the SK and updated_at of the org's PROJECT# and TOMBSTONE#
+    items, read with a strongly consistent query on the base table: a client
+    that lists right after its own write never gets a 304 for the listing
+    before it (the org-updated index lags writes).
+    """
+    items = []
+    for page, _ in _query_pages(
+        get_projects_table(),
+        1000,
+        None,
+        ("PK", "SK"),
+        ("PK", f"ORG#{org_id}"),
+        # CONFIG# sorts before PROJECT#, and nothing else is stored under ORG#
+        KeyConditionExpression=Key("PK").eq(f"ORG#{org_id}") & Key("SK").between("PROJECT#", "TOMBSTONE#\uffff"),
+        ProjectionExpression="SK, updated_at",
+        ConsistentRead=True,
+    ):
+        items.extend(page)
+    return org_version(items)
+
+
+def _projection(attributes: Optional[Sequence[str]]) -> dict:
+    """ProjectionExpression kwargs for a read (empty when reading whole items)."""
+    if attributes is None:
+        return {}
+    names = {f"#p{i}": attr for i, attr in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
     }
-    table.put_item(Item=item)
-    return item
 
 
-def get_project(project_id: str) -> Optional[dict]:
-    """Get a project by ID using GSI (for update/delete operations)."""
-    table = get_or_create_table()
-    response = table.query(
-        IndexName="project-id-index",
-        KeyConditionExpression=Key("project_id").eq(project_id),
+def _get_project_config(org_id: str, project_id: str, consistent: bool = False) -> Optional[dict]:
+    """Read a project's CONFIG# item."""
+    response = get_projects_table().get_item(
+        Key=project_config_key(org_id, project_id),
+        ConsistentRead=consistent,
     )
-    items = response.get("Items", [])
-    # Filter for project items (SK starts with PROJECT#)
-    project_items = [i for i in items if i.get("SK", "").startswith("PROJECT#")]
-    return project_items[0] if project_items else None
+    return response.get("Item")
 
 
-def get_project_by_key(org_id: str, project_id: str) -> Optional[dict]:
+@_revalidate_tables
+def get_project(
+    project_id: str,
+    cached: bool = False,
+    include_config: bool = False,
+) -> Optional[dict]:
+    """
+    Get a project by ID using GSI (for update/delete operations).
+    
+    Returns the PROJECT# item only (status, URLs, names); pass
+    include_config=True to also read env vars and compute settings, which
+    costs one extra GetItem.
+    
+    With cached=True a recent copy may be served from the in-process cache
+    instead of querying DynamoDB. Only cached reads fill the cache: the GSI
+    is eventually consistent, and a caller bypassing the cache must not
+    leave a copy that may predate its own last write.
+    """
+    project = _cached_project(project_id) if cached else None
+
+    if project is None:
+        generation = _project_cache.generation()
+        table = get_projects_table()
+        response = table.query(
+            IndexName="project-id-index",
+            KeyConditionExpression=Key("project_id").eq(project_id),
+        )
+        items = response.get("Items", [])
+        # Filter for project items (SK starts with PROJECT#)
+        project_items = [i for i in items if i.get("SK", "").startswith("PROJECT#")]
+        project = project_items[0] if project_items else None
+        if project is None:
+            return None
+        if cached:
+            _cache_project(project_id, project, generation)
+
+    if include_config:
+        project = merge_project_config(
+            project, _get_project_config(project["organization_id"], project_id)
+        )
+    return project
+
+
+@_revalidate_tables
+def get_project_by_key(
+    org_id: str,
+    project_id: str,
+    cached: bool = False,
+    include_config: bool = False,
+    attributes: Optional[Sequence[str]] = None,
+) -> Optional[dict]:
     """
     Get a project by Organization ID and Project ID using direct GetItem.
     
     Projects are stored with PK=ORG#{org_id} (org-owned model).
+    
+    By default this is a strongly consistent read. With cached=True the
+    in-process cache is consulted first and a miss is served by an
+    eventually consistent read, which costs half as much.
+    
+    Args:
+        org_id: Organization that owns the project
+        project_id: The project ID
+        cached: Allow a cached / eventually consistent read
+        include_config: Also read env vars and compute settings (the
+            PROJECT# and CONFIG# items are fetched in one BatchGetItem)
+        attributes: Only return these attributes of the PROJECT# item
     """
-    table = get_or_create_table()
+    if include_config:
+        return _get_project_with_config(org_id, project_id, consistent=not cached)
+
+    if cached and attributes is None:
+        project = _cached_project(project_id)
+        if project is not None:
+            return project if project.get("organization_id") == org_id else None
+
+    generation = _project_cache.generation()
+    table = get_projects_table()
     
     response = table.get_item(
         Key={
             "PK": f"ORG#{org_id}",
             "SK": f"PROJECT#{project_id}",
         },
-        ConsistentRead=True,
+        ConsistentRead=not cached,
+        **_projection(attributes),
     )
-    return response.get("Item")
+    project = response.get("Item")
+    if project is not None and attributes is None:
+        _cache_project(project_id, project, generation)
+    return project
+
+
+def _cached_project(project_id: str) -> Optional[dict]:
+    """A copy of the cached project, or None."""
+    project = _project_cache.get(project_id)
+    return copy.deepcopy(project) if project is not None else None
 
 
-def list_projects(org_id: str) -> list:
+def _cache_project(project_id: str, project: dict, generation: int) -> None:
     """
-    List all projects for an organization.
-    
-    Projects are stored with PK=ORG#{org_id} (org-owned model).
-    No filtering needed - just query by org partition key.
+    Cache a copy of a project read that started at `generation`.
+
+    Skipped if a write invalidated the project while it was being read: the
+    read may have returned the item from before the write.
+    """
+    _project_cache.set(project_id, copy.deepcopy(project), generation=generation)
+
+
+def _get_project_with_config(org_id: str, project_id: str, consistent: bool = True) -> Optional[dict]:
+    """Read a project's PROJECT# and CONFIG# items in one BatchGetItem."""
+    table = get_projects_table()
+    project_key = {"PK": f"ORG#{org_id}", "SK": f"PROJECT#{project_id}"}
+    config_key = project_config_key(org_id, project_id)
+
+    request = {table.name: {"Keys": [project_key, config_key], "ConsistentRead": consistent}}
+    items = []
+    while request:
+        response = get_dynamodb_resource().batch_get_item(RequestItems=request)
+        items.extend(response.get("Responses", {}).get(table.name, []))
+        # Unprocessed keys are rare for two small items; retry them until done
+        request = response.get("UnprocessedKeys") or None
+
+    by_sk = {item["SK"]: item for item in items}
+    project = by_sk.get(project_key["SK"])
+    if project is None:
+        return None
+    return merge_project_config(project, by_sk.get(config_key["SK"]))
+
+
+def get_project_cache_stats() -> dict:
+    """Hit/miss counters for the project read cache."""
+    return _project_cache.stats()
+
+
+def iter_project_pages(
+    org_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    attributes: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[list, Optional[str]]]:
     """
-    table = get_or_create_table()
+    Lazily yield (projects, next_cursor) pages for an organization.
     
-    response = table.query(
+    Projects are stored with PK=ORG#{org_id} (org-owned model). Only the
+    PROJECT# items are read; CONFIG# items share the partition but sort
+    outside the key condition.
+    """
+    return _query_pages(
+        get_projects_table(),
+        page_size,
+        cursor,
+        ("PK", "SK"),
+        ("PK", f"ORG#{org_id}"),
+        "PROJECT#",
         KeyConditionExpression=Key("PK").eq(f"ORG#{org_id}")
         & Key("SK").begins_with("PROJECT#"),
+        **_projection(attributes),
     )
-    return response.get("Items", [])
 
 
+@_revalidate_tables
+def list_projects_page(
+    org_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    attributes: Optional[Sequence[str]] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of an organization's projects and the cursor for the next."""
+    return next(iter_project_pages(org_id, limit, cursor, attributes))
+
+
+@_revalidate_tables
+def list_projects(org_id: str, attributes: Optional[Sequence[str]] = None) -> list:
+    """
+    List all projects for an organization.
+    
+    Follows LastEvaluatedKey across pages, so large orgs are not truncated.
+    Pass `attributes` to return only those fields of each project.
+    """
+    projects = []
+    for items, _ in iter_project_pages(org_id, page_size=100, attributes=attributes):
+        projects.extend(items)
+    return projects
+
+
+@_revalidate_tables
+def list_all_projects(include_config: bool = False) -> list:
+    """
+    List every project across all organizations.
+
+    This is a full table scan, meant for scheduled jobs such as usage
+    aggregation, never for the request path. With include_config=True the
+    CONFIG# items are read in the same scan and merged in.
+    """
+    table = get_projects_table()
+    if include_config:
+        scan_kwargs = {
+            "FilterExpression": "begins_with(SK, :sk_prefix) OR begins_with(SK, :config_prefix)",
+            "ExpressionAttributeValues": {":sk_prefix": "PROJECT#", ":config_prefix": "CONFIG#"},
+        }
+    else:
+        scan_kwargs = {
+            "FilterExpression": "begins_with(SK, :sk_prefix)",
+            "ExpressionAttributeValues": {":sk_prefix": "PROJECT#"},
+        }
+
+    response = table.scan(**scan_kwargs)
+    items = response.get("Items", [])
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **scan_kwargs)
+        items.extend(response.get("Items", []))
+
+    projects = [i for i in items if i["SK"].startswith("PROJECT#")]
+    if not include_config:
+        return projects
+
+    configs = {(i["PK"], i["SK"]): i for i in items if i["SK"].startswith("CONFIG#")}
+    return [
+        merge_project_config(
+            p, configs.get((p["PK"], project_config_key(p["organization_id"], p["project_id"])["SK"]))
+        )
+        for p in projects
+    ]
+
+
+@_revalidate_tables
+def list_projects_changed_since(
+    org_id: str,
+    since: str,
+    attributes: Optional[Sequence[str]] = None,
+) -> Tuple[list, list]:
+    """
+    Get an organization's projects written, and deleted, after a timestamp.
+
+    Queries the org-updated-index, so the cost is proportional to the number
+    of changes rather than to the number of projects. The index is
+    eventually consistent; callers should overlap successive windows.
+
+    Args:
+        org_id: Organization that owns the projects
+        since: ISO timestamp; only items with a later updated_at are returned
+        attributes: Only return these attributes of each project
+
+    Returns:
+        (projects, tombstones) where tombstones are TOMBSTONE# items with
+        project_id and deleted_at
+    """
+    query_kwargs = {}
+    if attributes is not None:
+        # SK tells projects and tombstones apart; deleted_at is read for the latter
+        query_kwargs = _projection(tuple(dict.fromkeys((*attributes, "SK", "project_id", "deleted_at"))))
+
+    projects, tombstones = [], []
+    for items, _ in _query_pages(
+        get_projects_table(),
+        100,
+        None,
+        ("PK", "SK", "organization_id", "updated_at"),
+        ("organization_id", org_id),
+        IndexName=ORG_UPDATED_INDEX_NAME,
+        KeyConditionExpression=Key("organization_id").eq(org_id) & Key("updated_at").gt(since),
+        **query_kwargs,
+    ):
+        for item in items:
+            if item["SK"].startswith("TOMBSTONE#"):
+                tombstones.append({"project_id": item["project_id"], "deleted_at": item["deleted_at"]})
+            elif item["SK"].startswith("PROJECT#"):
+                projects.append(project_attributes(item, attributes))
+    return projects, tombstones
+
+
+@_revalidate_tables
 def update_project(project_id: str, updates: dict) -> Optional[dict]:
-    """Update a project."""
+    """
+    Update a project by ID.
+    
+    Resolves the key through the project-id GSI first; callers that know the
+    organization should use update_project_by_key to save that round trip.
+    """
     project = get_project(project_id)
     if not project:
         return None
+    return update_project_by_key(project["organization_id"], project_id, updates)
 
-    table = get_or_create_table()
-    updates["updated_at"] = datetime.utcnow().isoformat()
 
-    update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in updates.keys())
-    expr_names = {f"#{k}": k for k in updates.keys()}
-    expr_values = {f":{k}": v for k, v in updates.items()}
+@_revalidate_tables
+def update_project_by_key(
+    org_id: str,
+    project_id: str,
+    updates: dict,
+    expected_status: Union[str, Tuple[str, ...], None] = None,
+) -> Optional[dict]:
+    """
+    Update a project with a single conditional write.
+    
+    Updates that only touch PROJECT# attributes are one UpdateItem. Updates
+    to config fields (env vars, compute settings) also write the CONFIG#
+    item, in one transaction, and return the full project.
+    
+    Args:
+        org_id: Organization that owns the project
+        project_id: The project ID
+        updates: Attributes to set
+        expected_status: Optional status (or tuple of statuses) the project
+            must currently be in, e.g. ("BUILDING",) for BUILDING -> LIVE
+    
+    Returns:
+        The updated project, or None if the project does not exist or is not
+        in an expected status
+    """
+    table = get_projects_table()
+    hot_updates, config_updates = split_project_fields(updates)
+    hot_updates["updated_at"] = datetime.utcnow().isoformat()
+
+    update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in hot_updates.keys())
+    expr_names = {f"#{k}": k for k in hot_updates.keys()}
+    expr_values = {f":{k}": v for k, v in hot_updates.items()}
+
+    if config_updates:
+        # Drop stale copies left on projects written before the split
+        update_expr += " REMOVE " + ", ".join(f"#{k}" for k in config_updates.keys())
+        expr_names.update({f"#{k}": k for k in config_updates.keys()})
+
+    condition = "attribute_exists(PK)"
+    if expected_status:
+        if isinstance(expected_status, str):
+            expected_status = (expected_status,)
+        placeholders = []
+        for i, status in enumerate(expected_status):
+            placeholders.append(f":expected_status_{i}")
+            expr_values[f":expected_status_{i}"] = status
+        expr_names["#status"] = "status"
+        condition += f" AND #status IN ({', '.join(placeholders)})"
+
+    key = {"PK": f"ORG#{org_id}", "SK": f"PROJECT#{project_id}"}
+
+    if not config_updates:
+        try:
+            response = table.update_item(
+                Key=key,
+                UpdateExpression=update_expr,
+                ConditionExpression=condition,
+                ExpressionAttributeNames=expr_names,
+                ExpressionAttributeValues=expr_values,
+                ReturnValues="ALL_NEW",
+            )
+        except get_dynamodb_resource().meta.client.exceptions.ConditionalCheckFailedException:
+            return None
+        # After the write; reads still in flight won't re-cache the old item
+        _project_cache.invalidate(project_id)
+        return response.get("Attributes")
 
-    response = table.update_item(
-        Key={"PK": project["PK"], "SK": project["SK"]},
-        UpdateExpression=update_expr,
-        ExpressionAttributeNames=expr_names,
-        ExpressionAttributeValues=expr_values,
-        ReturnValues="ALL_NEW",
-    )
-    return response.get("Attributes")
+    config_names = {f"#{k}": k for k in config_updates.keys()}
+    config_values = {f":{k}": v for k, v in config_updates.items()}
+    try:
+        get_dynamodb_resource().meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Update": {
+                        "TableName": table.name,
+                        "Key": key,
+                        "UpdateExpression": update_expr,
+                        "ConditionExpression": condition,
+                        "ExpressionAttributeNames": expr_names,
+                        "ExpressionAttributeValues": expr_values,
+                    }
+                },
+                {
+                    "Update": {
+                        "TableName": table.name,
+                        "Key": project_config_key(org_id, project_id),
+                        "UpdateExpression": "SET " + ", ".join(f"#{k} = :{k}" for k in config_updates.keys()),
+                        "ExpressionAttributeNames": config_names,
+                        "ExpressionAttributeValues": config_values,
+                    }
+                },
+            ]
+        )
+    except ClientError as e:
+        if _first_condition_failed(e):
+            return None
+        raise
+    _project_cache.invalidate(project_id)
+    return _get_project_with_config(org_id, project_id)
 
 
+@_revalidate_tables
 def delete_project(project_id: str) -> bool:
     """Delete a project and its deployments."""
     project = get_project(project_id)
     if not project:
         return False
     
-    projects_table = get_or_create_table()
-    deployments_table = get_or_create_deployments_table()
+    projects_table = get_projects_table()
+    deployments_table = get_deployments_table()
 
     # Delete all deployments for this project from the deployments table
     deployments = list_deployments(project_id)
@@ -333,8 +1051,42 @@ def delete_project(project_id: str) -> bool:
         for d in deployments:
             batch.delete_item(Key={"project_id": d["project_id"], "SK": d["SK"]})
 
-    # Delete project from projects table
-    projects_table.delete_item(Key={"PK": project["PK"], "SK": project["SK"]})
+    # Delete project and its config, leaving a tombstone for delta sync
+    org_id = project["organization_id"]
+    get_dynamodb_resource().meta.client.transact_write_items(
+        TransactItems=[
+            {
+                "Delete": {
+                    "TableName": projects_table.name,
+                    "Key": {"PK": project["PK"], "SK": project["SK"]},
+                }
+            },
+            {
+                "Delete": {
+                    "TableName": projects_table.name,
+                    "Key": project_config_key(org_id, project_id),
+                }
+            },
+            {
+                "Put": {
+                    "TableName": projects_table.name,
+                    "Item": build_project_tombstone(org_id, project_id),
+                }
+            },
+        ]
+    )
+    _project_cache.invalidate(project_id)
+
+    # Release the subdomain, unless the claim belongs to another project
+    if project.get("subdomain"):
+        try:
+            projects_table.delete_item(
+                Key=subdomain_claim_key(project["subdomain"]),
+                ConditionExpression="claimed_by = :pid",
+                ExpressionAttributeValues={":pid": project_id},
+            )
+        except get_dynamodb_resource().meta.client.exceptions.ConditionalCheckFailedException:
+            pass
     return True
 
 
@@ -343,45 +1095,118 @@ def delete_project(project_id: str) -> bool:
 # ─────────────────────────────────────────────────────────────
 
 
+@_revalidate_tables
 def create_deployment(
     project_id: str,
-    build_id: str,
+    build_id: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    request_id: Optional[str] = None,
 ) -> dict:
-    """Create a new deployment record in the deployments table."""
-    table = get_or_create_deployments_table()
-    deploy_id = generate_deploy_id()
-    now = datetime.utcnow().isoformat()
-    timestamp = int(time.time())
-
-    item = {
-        "project_id": project_id,
-        "SK": f"DEPLOY#{timestamp}#{deploy_id}",
-        "deploy_id": deploy_id,
-        "build_id": build_id,
-        "status": "IN_PROGRESS",
-        "logs_url": None,
-        "started_at": now,
-        "finished_at": None,
-    }
+    """
+    Create a new deployment record in the deployments table.
+    
+    Pass organization_id so the deployment shows up in the org-wide feed,
+    and request_id so a retried deploy request can find it again.
+    """
+    table = get_deployments_table()
+    item = build_deployment_item(project_id, build_id, organization_id, request_id)
     table.put_item(Item=item)
     return item
 
 
-def list_deployments(project_id: str) -> list:
-    """List all deployments for a project (newest first)."""
-    table = get_or_create_deployments_table()
-    response = table.query(
+def _unexpired_filter():
+    """Filter hiding rows whose TTL has passed (archived, awaiting deletion)."""
+    return Attr(TTL_ATTRIBUTE).not_exists() | Attr(TTL_ATTRIBUTE).gt(
+        int(time.time())
+    )
+
+
+def iter_deployment_pages(
+    project_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[list, Optional[str]]]:
+    """
+    Lazily yield (deployments, next_cursor) pages for a project (newest first).
+    
+    Rows whose TTL has passed are archived and only waiting for DynamoDB to
+    delete them, so they are filtered out (pages may come back short).
+    """
+    return _query_pages(
+        get_deployments_table(),
+        page_size,
+        cursor,
+        ("project_id", "SK"),
+        ("project_id", project_id),
+        "DEPLOY#",
         KeyConditionExpression=Key("project_id").eq(project_id)
         & Key("SK").begins_with("DEPLOY#"),
+        FilterExpression=_unexpired_filter(),
         ScanIndexForward=False,  # Newest first
     )
-    return response.get("Items", [])
 
 
+@_revalidate_tables
+def list_deployments_page(
+    project_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of a project's deployments (newest first) and the next cursor."""
+    return next(iter_deployment_pages(project_id, limit, cursor))
+
+
+@_revalidate_tables
+def list_org_deployments_page(
+    org_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Get one page of an organization's deployments across all its projects.
+    
+    A single query on the org-deployments index, newest first, regardless
+    of how many projects the organization has.
+    
+    Args:
+        org_id: Organization ID
+        limit: Maximum number of deployments to return
+        cursor: Cursor returned with the previous page
+        
+    Returns:
+        (deployments, next_cursor); next_cursor is None on the last page
+    """
+    return next(_query_pages(
+        get_deployments_table(),
+        limit,
+        cursor,
+        ("organization_id", "started_at", "project_id", "SK"),
+        ("organization_id", org_id),
+        "DEPLOY#",
+        IndexName=ORG_DEPLOYMENTS_INDEX_NAME,
+        KeyConditionExpression=Key("organization_id").eq(org_id),
+        FilterExpression=_unexpired_filter(),
+        ScanIndexForward=False,  # Newest first
+    ))
+
+
+@_revalidate_tables
+def list_deployments(project_id: str) -> list:
+    """List all deployments for a project (newest first)."""
+    deployments = []
+    for items, _ in iter_deployment_pages(project_id, page_size=100):
+        deployments.extend(items)
+    return deployments
+
+
+@_revalidate_tables
 def get_deployment(project_id: str, deploy_id: str) -> Optional[dict]:
     """
     Get a specific deployment by ID.
     
+    Uses a single keyed query on the deploy-id index, so the cost does not
+    depend on how many deployments the project has.
+    
     Args:
         project_id: The project ID
         deploy_id: The deployment ID (e.g., "deploy_abc123")
@@ -389,31 +1214,161 @@ def get_deployment(project_id: str, deploy_id: str) -> Optional[dict]:
     Returns:
         Deployment dict if found, None otherwise
     """
-    deployments = list_deployments(project_id)
-    return next((d for d in deployments if d["deploy_id"] == deploy_id), None)
+    table = get_deployments_table()
+    response = table.query(
+        IndexName=DEPLOY_ID_INDEX_NAME,
+        KeyConditionExpression=Key("project_id").eq(project_id)
+        & Key("deploy_id").eq(deploy_id),
+    )
+    items = response.get("Items", [])
+    return items[0] if items else None
 
 
-def update_deployment(project_id: str, deploy_id: str, updates: dict) -> Optional[dict]:
-    """Update a deployment."""
-    table = get_or_create_deployments_table()
+@_revalidate_tables
+def get_deployment_by_build_id(build_id: str) -> Optional[dict]:
+    """
+    Get the deployment a CodeBuild build belongs to.
+    
+    One keyed query on the build-id index; used when a build completion
+    event resumes a deployment.
+    """
+    table = get_deployments_table()
+    response = table.query(
+        IndexName=BUILD_ID_INDEX_NAME,
+        KeyConditionExpression=Key("build_id").eq(build_id),
+    )
+    items = response.get("Items", [])
+    return items[0] if items else None
 
-    # Find the deployment (by deploy_id within the project's deployments)
-    deployments = list_deployments(project_id)
-    deployment = next((d for d in deployments if d.get("deploy_id") == deploy_id), None)
-    if not deployment:
-        return None
 
-    update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in updates.keys())
-    expr_names = {f"#{k}": k for k in updates.keys()}
-    expr_values = {f":{k}": v for k, v in updates.items()}
+# A retried deploy request is for one of the project's latest deployments
+# (deploy requests are processed in order), so only these are checked
+REQUEST_LOOKUP_DEPLOYMENTS = 5
+
 
-    response = table.update_item(
-        Key={"project_id": deployment["project_id"], "SK": deployment["SK"]},
+@_revalidate_tables
+def get_deployment_by_request_id(project_id: str, request_id: str) -> Optional[dict]:
+    """
+    Get the deployment started by a deploy request, if it was recorded.
+    
+    Reads the project's newest REQUEST_LOOKUP_DEPLOYMENTS deployments (one
+    query) and matches request_id.
+    """
+    table = get_deployments_table()
+    response = table.query(
+        KeyConditionExpression=Key("project_id").eq(project_id)
+        & Key("SK").begins_with("DEPLOY#"),
+        ScanIndexForward=False,
+        Limit=REQUEST_LOOKUP_DEPLOYMENTS,
+    )
+    for item in response.get("Items", []):
+        if item.get("request_id") == request_id:
+            return item
+    return None
+
+
+@_revalidate_tables
+def save_deployment_checkpoint(
+    project_id: str,
+    sk: str,
+    stage: str,
+    output=None,
+    updates: Optional[dict] = None,
+) -> None:
+    """
+    Record that a deploy stage finished, with its output.
+    
+    Each stage writes its own key of the `checkpoints` map, so stages that
+    finish concurrently don't overwrite each other. `updates` sets other
+    attributes in the same write (e.g. build_id once the build started).
+    """
+    table = get_deployments_table()
+    updates = updates or {}
+    update_expr = "SET #checkpoints.#stage = :output" + "".join(
+        f", #{k} = :{k}" for k in updates.keys()
+    )
+    expr_names = {"#checkpoints": "checkpoints", "#stage": stage}
+    expr_names.update({f"#{k}": k for k in updates.keys()})
+    expr_values = {":output": output}
+    expr_values.update({f":{k}": v for k, v in updates.items()})
+    table.update_item(
+        Key={"project_id": project_id, "SK": sk},
         UpdateExpression=update_expr,
+        ConditionExpression="attribute_exists(SK)",
         ExpressionAttributeNames=expr_names,
         ExpressionAttributeValues=expr_values,
-        ReturnValues="ALL_NEW",
     )
+
+
+@_revalidate_tables
+def update_deployment(
+    project_id: str,
+    deploy_id: str,
+    updates: dict,
+    sk: Optional[str] = None,
+    expected_phase: Union[str, Tuple[str, ...], None] = None,
+    lease_seconds: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Update a deployment.
+    
+    Callers that already hold the deployment record should pass its `SK`,
+    which makes this a single UpdateItem. Otherwise the key is resolved
+    through the deploy-id index (one extra keyed query).
+    
+    With expected_phase set (a phase or tuple of phases), the update only
+    applies while the deployment is in that phase (checked in the same
+    write), so a redelivered event can't advance it twice. With
+    lease_seconds set, the update also takes a lease on the deployment: it
+    fails while another caller's lease is unexpired. Returns None if a
+    condition fails.
+    """
+    table = get_deployments_table()
+
+    if sk is None:
+        response = table.query(
+            IndexName=DEPLOY_ID_INDEX_NAME,
+            KeyConditionExpression=Key("project_id").eq(project_id)
+            & Key("deploy_id").eq(deploy_id),
+            ProjectionExpression="SK",
+        )
+        items = response.get("Items", [])
+        if not items:
+            return None
+        sk = items[0]["SK"]
+
+    update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in updates.keys())
+    expr_names = {f"#{k}": k for k in updates.keys()}
+    expr_values = {f":{k}": v for k, v in updates.items()}
+    condition = "attribute_exists(SK)"
+    if expected_phase:
+        if isinstance(expected_phase, str):
+            expected_phase = (expected_phase,)
+        placeholders = []
+        for i, phase in enumerate(expected_phase):
+            placeholders.append(f":expected_phase_{i}")
+            expr_values[f":expected_phase_{i}"] = phase
+        expr_names["#expected_phase"] = "phase"
+        condition += f" AND #expected_phase IN ({', '.join(placeholders)})"
+    if lease_seconds:
+        now = int(time.time())
+        update_expr += ", #lease_until = :lease_until"
+        expr_names["#lease_until"] = "lease_until"
+        expr_values[":lease_until"] = now + lease_seconds
+        expr_values[":now"] = now
+        condition += " AND (attribute_not_exists(#lease_until) OR #lease_until < :now)"
+
+    try:
+        response = table.update_item(
+            Key={"project_id": project_id, "SK": sk},
+            UpdateExpression=update_expr,
+            ConditionExpression=condition,
+            ExpressionAttributeNames=expr_names,
+            ExpressionAttributeValues=expr_values,
+            ReturnValues="ALL_NEW",
+        )
+    except get_dynamodb_resource().meta.client.exceptions.ConditionalCheckFailedException:
+        return None
     return response.get("Attributes")
 
 
@@ -434,14 +1389,14 @@ def get_or_create_org_usage_table():
         - period (RANGE/Sort Key): Billing period in YYYY-MM format
     """
     try:
-        table = dynamodb.Table(ORG_USAGE_TABLE_NAME)
+        table = get_dynamodb_resource().Table(ORG_USAGE_TABLE_NAME)
         table.load()
         return table
-    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
         pass
 
     print(f"📦 Creating DynamoDB table: {ORG_USAGE_TABLE_NAME}")
-    table = dynamodb.create_table(
+    table = get_dynamodb_resource().create_table(
         TableName=ORG_USAGE_TABLE_NAME,
         KeySchema=[
             {"AttributeName": "organization_id", "KeyType": "HASH"},
@@ -459,15 +1414,11 @@ def get_or_create_org_usage_table():
 
 
 def get_usage_table():
-    """Get the organization usage metrics table (creates if needed)."""
-    return get_or_create_org_usage_table()
-
-
-def get_current_period() -> str:
-    """Get current billing period in YYYY-MM format."""
-    return datetime.utcnow().strftime("%Y-%m")
+    """Get the organization usage metrics table handle."""
+    return _get_table(ORG_USAGE_TABLE_NAME)
 
 
+@_revalidate_tables
 def get_org_usage(org_id: str, period: str = None) -> Optional[dict]:
     """
     Get usage metrics for an organization in a specific billing period.
@@ -497,6 +1448,7 @@ def get_org_usage(org_id: str, period: str = None) -> Optional[dict]:
         return None
 
 
+@_revalidate_tables
 def update_org_usage(org_id: str, period: str, metrics: dict) -> dict:
     """
     Update usage metrics for an organization in a specific period.
@@ -525,6 +1477,7 @@ def update_org_usage(org_id: str, period: str, metrics: dict) -> dict:
     return item
 
 
+@_revalidate_tables
 def increment_org_usage(
     org_id: str,
     period: str,
@@ -587,7 +1540,7 @@ def increment_org_usage(
         
         response = table.update_item(**update_params)
         return response.get("Attributes")
-    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
         # Item doesn't exist yet, create it
         return update_org_usage(org_id, period, {
             "requests": requests,
@@ -604,16 +1557,21 @@ GITHUB_CONNECTIONS_TABLE = "org-github-connections"
 
 
 def get_github_connections_table():
-    """Get or create the github-connections DynamoDB table."""
+    """Get the github-connections table handle."""
+    return _get_table(GITHUB_CONNECTIONS_TABLE)
+
+
+def get_or_create_github_connections_table():
+    """Get or create the github-connections DynamoDB table (provisioning only)."""
     try:
-        table = dynamodb.Table(GITHUB_CONNECTIONS_TABLE)
+        table = get_dynamodb_resource().Table(GITHUB_CONNECTIONS_TABLE)
         table.load()
         return table
-    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+    except get_dynamodb_resource().meta.client.exceptions.ResourceNotFoundException:
         pass
 
     print(f"📦 Creating DynamoDB table: {GITHUB_CONNECTIONS_TABLE}")
-    table = dynamodb.create_table(
+    table = get_dynamodb_resource().create_table(
         TableName=GITHUB_CONNECTIONS_TABLE,
         KeySchema=[
             {"AttributeName": "organization_id", "KeyType": "HASH"},
@@ -628,6 +1586,7 @@ def get_github_connections_table():
     return table
 
 
+@_revalidate_tables
 def save_github_token(
     org_id: str,
     user_id: str,
@@ -668,6 +1627,7 @@ def save_github_token(
     return True
 
 
+@_revalidate_tables
 def get_github_token(org_id: str) -> Optional[str]:
     """
     Get GitHub App installation token for an organization from DynamoDB.
@@ -685,6 +1645,7 @@ def get_github_token(org_id: str) -> Optional[str]:
     return None
 
 
+@_revalidate_tables
 def get_github_installation(org_id: str) -> Optional[dict]:
     """
     Get complete GitHub App installation data including installation_id and token expiry.
@@ -714,6 +1675,7 @@ def get_github_installation(org_id: str) -> Optional[dict]:
     return None
 
 
+@_revalidate_tables
 def delete_github_connection(org_id: str) -> bool:
     """
     Delete the GitHub App installation connection for an organization.
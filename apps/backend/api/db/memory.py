@@ -0,0 +1,732 @@
+"""
+In-memory storage backend for Shorlabs projects and deployments.
+
+Mirrors api.db.dynamodb function for function, including its key layout
+(PK=ORG#{org_id} / SK=PROJECT#{project_id}, deployments sorted by
+DEPLOY#{ts}#{deploy_id}), its secondary indexes and its cursor format, so
+the API behaves the same without AWS. Used for local runs and for load
+testing / profiling the API in isolation:
+
+    STORAGE_BACKEND=memory uvicorn api.main:app
+
+Data lives in this process only and is lost on restart.
+"""
+import copy
+import itertools
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+from api.db.common import (
+    DEFAULT_PAGE_SIZE,
+    encode_cursor,
+    decode_cursor,
+    is_expired,
+    generate_project_id,
+    get_current_period,
+    SubdomainUnavailableError,
+    subdomain_candidates,
+    project_config_key,
+    org_version,
+    build_project_tombstone,
+    split_project_fields,
+    merge_project_config,
+    project_attributes,
+    build_project_item,
+    build_deployment_item,
+)
+
+# One lock guards every table and index; operations are short and never
+# block on I/O, so contention stays low even under heavy load.
+_lock = threading.RLock()
+
+# Projects table: PK -> {SK -> item}
+_projects: dict = {}
+# project-id-index: project_id -> (PK, SK)
+_project_id_index: dict = {}
+# subdomain-index: subdomain -> (PK, SK)
+_subdomain_index: dict = {}
+# SUBDOMAIN#<name> claim items: subdomain -> project_id
+_subdomain_claims: dict = {}
+
+# Deployments table: project_id -> {SK -> item}
+_deployments: dict = {}
+# deploy-id-index: (project_id, deploy_id) -> SK
+_deploy_id_index: dict = {}
+# org-deployments-index: organization_id -> {(project_id, SK)}
+_org_deployments_index: dict = {}
+
+# org-usage-metrics: (organization_id, period) -> item
+_org_usage: dict = {}
+
+# org-github-connections: organization_id -> item
+_github_connections: dict = {}
+
+
+def _copy(item: Optional[dict]) -> Optional[dict]:
+    """Return a private copy so callers can't mutate stored items."""
+    return copy.deepcopy(item) if item is not None else None
+
+
+def provision_tables() -> None:
+    """Nothing to provision; tables exist as soon as the module is imported."""
+
+
+def reset() -> None:
+    """Drop all stored data (e.g. between benchmark runs)."""
+    with _lock:
+        for store in (
+            _projects,
+            _project_id_index,
+            _subdomain_index,
+            _subdomain_claims,
+            _deployments,
+            _deploy_id_index,
+            _org_deployments_index,
+            _org_usage,
+            _github_connections,
+        ):
+            store.clear()
+
+
+# ─────────────────────────────────────────────────────────────
+# PAGINATION
+# ─────────────────────────────────────────────────────────────
+
+
+def _unindex_deployment(item: dict) -> None:
+    """Drop a deployment from the secondary indexes (caller holds _lock)."""
+    _deploy_id_index.pop((item["project_id"], item["deploy_id"]), None)
+    if item.get("organization_id"):
+        _org_deployments_index.get(item["organization_id"], set()).discard(
+            (item["project_id"], item["SK"])
+        )
+
+
+def _purge_expired(rows: dict) -> None:
+    """Delete rows whose TTL has passed (DynamoDB TTL does this eventually)."""
+    now = time.time()
+    for sk in [sk for sk, item in rows.items() if is_expired(item, now)]:
+        item = rows.pop(sk)
+        if "deploy_id" in item:
+            _unindex_deployment(item)
+
+
+def _query_pages(
+    partition: dict,
+    key_attrs: Tuple[str, str],
+    hash_value: str,
+    sk_prefix: str,
+    page_size: int,
+    cursor: Optional[str] = None,
+    newest_first: bool = False,
+    attributes: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[list, Optional[str]]]:
+    """
+    Lazily yield (items, next_cursor) pages over one partition.
+
+    Same contract as the DynamoDB backend: items are ordered by sort key,
+    cursors encode the last returned key and expired rows are not returned.
+    """
+    hash_attr, range_attr = key_attrs
+    start_key = decode_cursor(cursor, key_attrs, (hash_attr, hash_value), sk_prefix)
+    while True:
+        with _lock:
+            rows = partition.get(hash_value, {})
+            _purge_expired(rows)
+            sort_keys = sorted(
+                (sk for sk in rows if sk.startswith(sk_prefix)),
+                reverse=newest_first,
+            )
+            if start_key:
+                last_sk = start_key.get(range_attr)
+                if newest_first:
+                    sort_keys = [sk for sk in sort_keys if sk < last_sk]
+                else:
+                    sort_keys = [sk for sk in sort_keys if sk > last_sk]
+            page_keys = sort_keys[:page_size]
+            items = [
+                _copy(project_attributes(partition[hash_value][sk], attributes))
+                for sk in page_keys
+            ]
+
+        start_key = None
+        if len(sort_keys) > page_size:
+            start_key = {hash_attr: hash_value, range_attr: page_keys[-1]}
+        yield items, encode_cursor(start_key)
+        if not start_key:
+            return
+
+
+# ─────────────────────────────────────────────────────────────
+# PROJECT OPERATIONS
+# ─────────────────────────────────────────────────────────────
+
+
+def claim_subdomain(project_id: str, project_name: str, subdomain: str = None) -> str:
+    """Reserve a subdomain for an existing project (idempotent)."""
+    candidates = subdomain_candidates(project_name)
+    if subdomain:
+        candidates = itertools.chain([subdomain], candidates)
+
+    with _lock:
+        for candidate in candidates:
+            if _subdomain_claims.setdefault(candidate, project_id) == project_id:
+                return candidate
+    raise SubdomainUnavailableError(f"No subdomain available for {project_name!r}")
+
+
+def get_project_by_subdomain(subdomain: str) -> Optional[dict]:
+    """
+    Look up a project by its subdomain.
+
+    Args:
+        subdomain: The subdomain to look up (e.g., "my-project")
+
+    Returns:
+        Project dict if found, None otherwise
+    """
+    with _lock:
+        key = _subdomain_index.get(subdomain)
+        if key is None:
+            return None
+        pk, sk = key
+        return _copy(_projects[pk][sk])
+
+
+def create_project(
+    user_id: str,
+    organization_id: str,
+    name: str,
+    github_url: str,
+    github_repo: str,
+    env_vars: dict = None,
+    root_directory: str = "./",
+    start_command: str = "uvicorn main:app --host 0.0.0.0 --port 8080",
+    subdomain: str = None,
+    memory: int = 1024,
+    timeout: int = 30,
+    ephemeral_storage: int = 512,
+) -> dict:
+    """
+    Create a new project owned by an organization.
+
+    The subdomain claim and the project are written atomically, like the
+    DynamoDB backend's transaction.
+
+    Raises:
+        SubdomainUnavailableError: If the subdomain (or every candidate
+            derived from the name) is already claimed
+    """
+    project_id = generate_project_id()
+    candidates = [subdomain] if subdomain else subdomain_candidates(name)
+
+    with _lock:
+        for candidate in candidates:
+            if candidate in _subdomain_claims:
+                continue
+            item = build_project_item(
+                project_id=project_id,
+                user_id=user_id,
+                organization_id=organization_id,
+                name=name,
+                github_url=github_url,
+                github_repo=github_repo,
+                env_vars=env_vars,
+                root_directory=root_directory,
+                start_command=start_command,
+                subdomain=candidate,
+                memory=memory,
+                timeout=timeout,
+                ephemeral_storage=ephemeral_storage,
+            )
+            hot, config = split_project_fields(_copy(item))
+            config_key = project_config_key(organization_id, project_id)
+            _subdomain_claims[candidate] = project_id
+            _projects.setdefault(item["PK"], {})[item["SK"]] = hot
+            _projects[config_key["PK"]][config_key["SK"]] = dict(config_key, **config)
+            _project_id_index[project_id] = (item["PK"], item["SK"])
+            _subdomain_index.setdefault(candidate, (item["PK"], item["SK"]))
+            return item
+
+    raise SubdomainUnavailableError(
+        f"Subdomain {subdomain!r} is already taken" if subdomain
+        else f"No subdomain available for {name!r}"
+    )
+
+
+def get_org_version(org_id: str) -> str:
+    """Get an organization's project version (changes on every project write)."""
+    with _lock:
+        return org_version(
+            item for sk, item in _projects.get(f"ORG#{org_id}", {}).items()
+            if sk.startswith(("PROJECT#", "TOMBSTONE#"))
+        )
+
+
+def _with_config(item: dict, include_config: bool) -> dict:
+    """Merge in the project's CONFIG# item when requested (caller holds _lock)."""
+    if not include_config:
+        return item
+    config_key = project_config_key(item["organization_id"], item["project_id"])
+    return merge_project_config(item, _projects.get(config_key["PK"], {}).get(config_key["SK"]))
+
+
+def get_project(
+    project_id: str,
+    cached: bool = False,
+    include_config: bool = False,
+) -> Optional[dict]:
+    """Get a project by ID (`cached` is accepted for API parity)."""
+    with _lock:
+        key = _project_id_index.get(project_id)
+        if key is None:
+            return None
+        pk, sk = key
+        return _copy(_with_config(_projects[pk][sk], include_config))
+
+
+def get_project_by_key(
+    org_id: str,
+    project_id: str,
+    cached: bool = False,
+    include_config: bool = False,
+    attributes: Optional[Sequence[str]] = None,
+) -> Optional[dict]:
+    """Get a project by Organization ID and Project ID."""
+    with _lock:
+        item = _projects.get(f"ORG#{org_id}", {}).get(f"PROJECT#{project_id}")
+        if item is None:
+            return None
+        if include_config:
+            return _copy(_with_config(item, True))
+        return _copy(project_attributes(item, attributes))
+
+
+def get_project_cache_stats() -> dict:
+    """The in-memory backend has no read cache; reported for API parity."""
+    return {"hits": 0, "misses": 0, "hit_ratio": 0.0, "size": 0}
+
+
+def iter_project_pages(
+    org_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    attributes: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[list, Optional[str]]]:
+    """Lazily yield (projects, next_cursor) pages for an organization."""
+    return _query_pages(
+        _projects,
+        ("PK", "SK"),
+        f"ORG#{org_id}",
+        "PROJECT#",
+        page_size,
+        cursor,
+        attributes=attributes,
+    )
+
+
+def list_projects_page(
+    org_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    attributes: Optional[Sequence[str]] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of an organization's projects and the cursor for the next."""
+    return next(iter_project_pages(org_id, limit, cursor, attributes))
+
+
+def list_projects(org_id: str, attributes: Optional[Sequence[str]] = None) -> list:
+    """List all projects for an organization."""
+    projects = []
+    for items, _ in iter_project_pages(org_id, page_size=100, attributes=attributes):
+        projects.extend(items)
+    return projects
+
+
+def list_all_projects(include_config: bool = False) -> list:
+    """List every project across all organizations."""
+    with _lock:
+        return [
+            _copy(_with_config(item, include_config))
+            for partition in _projects.values()
+            for sk, item in partition.items()
+            if sk.startswith("PROJECT#")
+        ]
+
+
+def list_projects_changed_since(
+    org_id: str,
+    since: str,
+    attributes: Optional[Sequence[str]] = None,
+) -> Tuple[list, list]:
+    """Get an organization's projects written, and deleted, after a timestamp."""
+    projects, tombstones = [], []
+    with _lock:
+        partition = _projects.get(f"ORG#{org_id}", {})
+        _purge_expired(partition)
+        for sk, item in sorted(partition.items(), key=lambda kv: kv[1].get("updated_at", "")):
+            if item.get("updated_at", "") <= since:
+                continue
+            if sk.startswith("TOMBSTONE#"):
+                tombstones.append({"project_id": item["project_id"], "deleted_at": item["deleted_at"]})
+            elif sk.startswith("PROJECT#"):
+                projects.append(_copy(project_attributes(item, attributes)))
+    return projects, tombstones
+
+
+def update_project(project_id: str, updates: dict) -> Optional[dict]:
+    """Update a project by ID."""
+    project = get_project(project_id)
+    if not project:
+        return None
+    return update_project_by_key(project["organization_id"], project_id, updates)
+
+
+def update_project_by_key(
+    org_id: str,
+    project_id: str,
+    updates: dict,
+    expected_status: Union[str, Tuple[str, ...], None] = None,
+) -> Optional[dict]:
+    """
+    Update a project atomically, optionally only from an expected status.
+
+    Returns:
+        The updated project, or None if the project does not exist or is not
+        in an expected status
+    """
+    if isinstance(expected_status, str):
+        expected_status = (expected_status,)
+
+    with _lock:
+        item = _projects.get(f"ORG#{org_id}", {}).get(f"PROJECT#{project_id}")
+        if item is None:
+            return None
+        if expected_status and item.get("status") not in expected_status:
+            return None
+
+        hot_updates, config_updates = split_project_fields(copy.deepcopy(updates))
+        old_subdomain = item.get("subdomain")
+        item.update(hot_updates)
+        item["updated_at"] = datetime.utcnow().isoformat()
+        if config_updates:
+            for field in config_updates:
+                item.pop(field, None)
+            config_key = project_config_key(org_id, project_id)
+            _projects[config_key["PK"]].setdefault(config_key["SK"], dict(config_key)).update(config_updates)
+
+        new_subdomain = item.get("subdomain")
+        if new_subdomain != old_subdomain:
+            if _subdomain_index.get(old_subdomain) == (item["PK"], item["SK"]):
+                del _subdomain_index[old_subdomain]
+            if new_subdomain:
+                _subdomain_index.setdefault(new_subdomain, (item["PK"], item["SK"]))
+        return _copy(_with_config(item, bool(config_updates)))
+
+
+def delete_project(project_id: str) -> bool:
+    """Delete a project and its deployments."""
+    with _lock:
+        key = _project_id_index.pop(project_id, None)
+        if key is None:
+            return False
+        pk, sk = key
+        item = _projects[pk].pop(sk)
+        _projects[pk].pop(project_config_key(item["organization_id"], project_id)["SK"], None)
+        if _subdomain_index.get(item.get("subdomain")) == key:
+            del _subdomain_index[item["subdomain"]]
+        if _subdomain_claims.get(item.get("subdomain")) == project_id:
+            del _subdomain_claims[item["subdomain"]]
+
+        for deployment in _deployments.pop(project_id, {}).values():
+            _unindex_deployment(deployment)
+        tombstone = build_project_tombstone(item["organization_id"], project_id)
+        _projects[pk][tombstone["SK"]] = tombstone
+    return True
+
+
+# ─────────────────────────────────────────────────────────────
+# DEPLOYMENT OPERATIONS
+# ─────────────────────────────────────────────────────────────
+
+
+def create_deployment(
+    project_id: str,
+    build_id: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+) -> dict:
+    """Create a new deployment record (in the org feed when organization_id is set)."""
+    item = build_deployment_item(project_id, build_id, organization_id, request_id)
+    with _lock:
+        _deployments.setdefault(project_id, {})[item["SK"]] = _copy(item)
+        _deploy_id_index[(project_id, item["deploy_id"])] = item["SK"]
+        if organization_id:
+            _org_deployments_index.setdefault(organization_id, set()).add((project_id, item["SK"]))
+    return item
+
+
+def iter_deployment_pages(
+    project_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[list, Optional[str]]]:
+    """Lazily yield (deployments, next_cursor) pages for a project (newest first)."""
+    return _query_pages(
+        _deployments,
+        ("project_id", "SK"),
+        project_id,
+        "DEPLOY#",
+        page_size,
+        cursor,
+        newest_first=True,
+    )
+
+
+def list_deployments_page(
+    project_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of a project's deployments (newest first) and the next cursor."""
+    return next(iter_deployment_pages(project_id, limit, cursor))
+
+
+def list_org_deployments_page(
+    org_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of an organization's deployments across all its projects (newest first)."""
+    def sort_key(d):
+        return (d["started_at"], d["project_id"], d["SK"])
+
+    start_key = decode_cursor(
+        cursor, ("organization_id", "started_at", "project_id", "SK"), ("organization_id", org_id), "DEPLOY#"
+    )
+    now = time.time()
+    with _lock:
+        rows = []
+        for project_id, sk in _org_deployments_index.get(org_id, ()):
+            item = _deployments.get(project_id, {}).get(sk)
+            if item is not None and not is_expired(item, now):
+                rows.append(item)
+        rows.sort(key=sort_key, reverse=True)
+        if start_key:
+            last = sort_key(start_key)
+            rows = [d for d in rows if sort_key(d) < last]
+        page = [_copy(d) for d in rows[:limit]]
+
+    next_key = None
+    if len(rows) > limit:
+        last_item = page[-1]
+        next_key = {
+            "organization_id": org_id,
+            "started_at": last_item["started_at"],
+            "project_id": last_item["project_id"],
+            "SK": last_item["SK"],
+        }
+    return page, encode_cursor(next_key)
+
+
+def list_deployments(project_id: str) -> list:
+    """List all deployments for a project (newest first)."""
+    deployments = []
+    for items, _ in iter_deployment_pages(project_id, page_size=100):
+        deployments.extend(items)
+    return deployments
+
+
+def get_deployment(project_id: str, deploy_id: str) -> Optional[dict]:
+    """Get a specific deployment by ID."""
+    with _lock:
+        sk = _deploy_id_index.get((project_id, deploy_id))
+        if sk is None:
+            return None
+        return _copy(_deployments[project_id][sk])
+
+
+def get_deployment_by_build_id(build_id: str) -> Optional[dict]:
+    """Get the deployment a CodeBuild build belongs to."""
+    with _lock:
+        for deployments in _deployments.values():
+            for item in deployments.values():
+                if item.get("build_id") == build_id:
+                    return _copy(item)
+    return None
+
+
+# Same window as the DynamoDB backend
+REQUEST_LOOKUP_DEPLOYMENTS = 5
+
+
+def get_deployment_by_request_id(project_id: str, request_id: str) -> Optional[dict]:
+    """Get the deployment started by a deploy request, among the project's newest ones."""
+    with _lock:
+        deployments = _deployments.get(project_id, {})
+        for sk in sorted(deployments, reverse=True)[:REQUEST_LOOKUP_DEPLOYMENTS]:
+            if deployments[sk].get("request_id") == request_id:
+                return _copy(deployments[sk])
+    return None
+
+
+def save_deployment_checkpoint(
+    project_id: str,
+    sk: str,
+    stage: str,
+    output=None,
+    updates: Optional[dict] = None,
+) -> None:
+    """Record a finished deploy stage's output (and set `updates`) on a deployment."""
+    with _lock:
+        item = _deployments.get(project_id, {}).get(sk)
+        if item is None:
+            raise KeyError(f"Deployment {sk} not found")
+        item["checkpoints"][stage] = copy.deepcopy(output)
+        item.update(copy.deepcopy(updates or {}))
+
+
+def update_deployment(
+    project_id: str,
+    deploy_id: str,
+    updates: dict,
+    sk: Optional[str] = None,
+    expected_phase: Union[str, Tuple[str, ...], None] = None,
+    lease_seconds: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Update a deployment; returns None if it does not exist, is not in
+    expected_phase, or (with lease_seconds) is leased by another caller.
+    """
+    with _lock:
+        if sk is None:
+            sk = _deploy_id_index.get((project_id, deploy_id))
+        item = _deployments.get(project_id, {}).get(sk)
+        if item is None:
+            return None
+        if isinstance(expected_phase, str):
+            expected_phase = (expected_phase,)
+        if expected_phase and item.get("phase") not in expected_phase:
+            return None
+        if lease_seconds:
+            now = int(time.time())
+            if item.get("lease_until", 0) >= now:
+                return None
+            item["lease_until"] = now + lease_seconds
+        item.update(copy.deepcopy(updates))
+        return _copy(item)
+
+
+# ─────────────────────────────────────────────────────────────
+# USAGE METRICS OPERATIONS (Organization-level billing)
+# ─────────────────────────────────────────────────────────────
+
+
+def get_org_usage(org_id: str, period: str = None) -> Optional[dict]:
+    """Get usage metrics for an organization in a billing period."""
+    if period is None:
+        period = get_current_period()
+    with _lock:
+        return _copy(_org_usage.get((org_id, period)))
+
+
+def update_org_usage(org_id: str, period: str, metrics: dict) -> dict:
+    """Replace usage metrics for an organization in a specific period."""
+    item = {
+        "organization_id": org_id,
+        "period": period,
+        "requests": metrics.get("requests", 0),
+        "gb_seconds": Decimal(str(metrics.get("gb_seconds", 0.0))),
+        "last_updated": datetime.utcnow().isoformat(),
+        "functions": metrics.get("functions", {}),
+    }
+    with _lock:
+        _org_usage[(org_id, period)] = _copy(item)
+    return item
+
+
+def increment_org_usage(
+    org_id: str,
+    period: str,
+    requests: int,
+    gb_seconds: float,
+    function_name: str = None
+) -> dict:
+    """Increment usage metrics for an organization atomically."""
+    with _lock:
+        item = _org_usage.setdefault(
+            (org_id, period),
+            {"organization_id": org_id, "period": period, "requests": 0, "gb_seconds": Decimal("0")},
+        )
+        item["requests"] = item.get("requests", 0) + requests
+        item["gb_seconds"] = item.get("gb_seconds", Decimal("0")) + Decimal(str(gb_seconds))
+        item["last_updated"] = datetime.utcnow().isoformat()
+        if function_name:
+            function_usage = item.setdefault("functions", {}).setdefault(
+                function_name, {"requests": 0, "gb_seconds": 0.0}
+            )
+            function_usage["requests"] += requests
+            function_usage["gb_seconds"] += float(gb_seconds)
+        return _copy(item)
+
+
+# ─────────────────────────────────────────────────────────────
+# GITHUB CONNECTIONS (Organization-based)
+# ─────────────────────────────────────────────────────────────
+
+
+def save_github_token(
+    org_id: str,
+    user_id: str,
+    token: str,
+    metadata: dict = None,
+    installation_id: str = None,
+    expires_at: str = None
+) -> bool:
+    """Save or update GitHub App installation token for an organization."""
+    item = {
+        "organization_id": org_id,
+        "connected_by": user_id,
+        "token": token,
+        "metadata": metadata or {},
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    if installation_id:
+        item["installation_id"] = installation_id
+    if expires_at:
+        item["expires_at"] = expires_at
+
+    with _lock:
+        _github_connections[org_id] = _copy(item)
+    return True
+
+
+def get_github_token(org_id: str) -> Optional[str]:
+    """Get GitHub App installation token for an organization, or None."""
+    with _lock:
+        item = _github_connections.get(org_id)
+        return item.get("token") if item else None
+
+
+def get_github_installation(org_id: str) -> Optional[dict]:
+    """Get complete GitHub App installation data for an organization, or None."""
+    with _lock:
+        item = _copy(_github_connections.get(org_id))
+    if item:
+        return {
+            "token": item.get("token"),
+            "installation_id": item.get("installation_id"),
+            "expires_at": item.get("expires_at"),
+            "metadata": item.get("metadata", {}),
+            "connected_by": item.get("connected_by"),
+        }
+    return None
+
+
+def delete_github_connection(org_id: str) -> bool:
+    """Delete the GitHub connection for an organization; False if not found."""
+    with _lock:
+        return _github_connections.pop(org_id, None) is not None
@@ -0,0 +1,24 @@
+"""
+Provision the tables used by the Shorlabs API.
+
+The API never creates tables on the request path; run this once per
+environment (and after adding new tables or indexes):
+
+    python -m api.db.provision
+"""
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from api.db.storage import STORAGE_BACKEND, provision_tables
+
+
+def main():
+    """CLI entry point for table provisioning."""
+    provision_tables()
+    print(f"✅ Tables provisioned ({STORAGE_BACKEND})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Deployment history retention.
+
+A project's newest DEPLOYMENT_RETENTION_COUNT deployments, and any started in
+the last DEPLOYMENT_RETENTION_DAYS days, stay hot in the deployments table,
+up to a hard cap of DEPLOYMENT_RETENTION_MAX_COUNT per project regardless of
+age. Older ones are archived (api.db.archive) and then given a TTL, so
+DynamoDB deletes them and per-project partitions stay small. That keeps
+list_deployments and delete_project bounded, even for projects that deploy
+many times a day.
+
+The policy runs after every deployment finishes. To sweep every project
+(e.g. after changing the policy), run:
+
+    python -m api.db.retention
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables (policy and backend settings, when run as a script)
+load_dotenv()
+
+from api.db import storage
+from api.db.archive import ArchiveNotConfiguredError, write_deployment_archive
+from api.db.common import TTL_ATTRIBUTE
+
+DEPLOYMENT_RETENTION_COUNT = int(os.environ.get("DEPLOYMENT_RETENTION_COUNT", "50"))
+DEPLOYMENT_RETENTION_DAYS = int(os.environ.get("DEPLOYMENT_RETENTION_DAYS", "30"))
+# Deployments kept hot per project however recent they are
+DEPLOYMENT_RETENTION_MAX_COUNT = int(os.environ.get("DEPLOYMENT_RETENTION_MAX_COUNT", "200"))
+
+
+def select_expired_deployments(
+    deployments: List[dict],
+    keep_count: int = DEPLOYMENT_RETENTION_COUNT,
+    keep_days: int = DEPLOYMENT_RETENTION_DAYS,
+    max_count: int = DEPLOYMENT_RETENTION_MAX_COUNT,
+) -> List[dict]:
+    """
+    Pick the deployments that fall outside the retention window.
+
+    Args:
+        deployments: A project's deployments, newest first
+        keep_count: Number of newest deployments always kept
+        keep_days: Deployments started within this many days are kept
+        max_count: Deployments beyond this many are expired regardless of age
+            (never fewer than keep_count)
+
+    Returns:
+        Deployments to archive and expire (in-progress ones are never expired)
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=keep_days)).isoformat()
+    max_count = max(max_count, keep_count)
+    return [
+        d for i, d in enumerate(deployments)
+        if i >= keep_count
+        and d.get("status") != "IN_PROGRESS"
+        and (i >= max_count or (d.get("started_at") or "") < cutoff)
+    ]
+
+
+def apply_deployment_retention(project_id: str, organization_id: Optional[str] = None) -> int:
+    """
+    Archive and expire a project's deployments outside the retention window.
+
+    The archive is written before any row is expired, so a failure part-way
+    never loses history (at worst a row is archived twice).
+
+    With organization_id, the project is touched afterwards so its
+    updated_at (and ETag) reflect the shortened deployment history.
+
+    Returns:
+        Number of deployments archived
+    """
+    deployments = storage.list_deployments(project_id)
+    expired = select_expired_deployments(deployments)
+    if not expired:
+        return 0
+
+    key = write_deployment_archive(project_id, expired)
+
+    expires_at = int(time.time())
+    for d in expired:
+        storage.update_deployment(
+            project_id, d["deploy_id"], {TTL_ATTRIBUTE: expires_at}, sk=d["SK"],
+        )
+    if organization_id:
+        storage.update_project_by_key(organization_id, project_id, {})
+
+    print(f"🗄️ Archived {len(expired)} deployments of {project_id} to {key}")
+    return len(expired)
+
+
+def apply_retention_to_all_projects() -> int:
+    """Apply the retention policy to every project; returns deployments archived."""
+    archived = 0
+    for project in storage.list_all_projects():
+        try:
+            archived += apply_deployment_retention(project["project_id"], project["organization_id"])
+        except ArchiveNotConfiguredError:
+            raise  # Same for every project: stop the sweep
+        except Exception as e:
+            print(f"⚠️ Retention failed for {project['project_id']}: {e}")
+    return archived
+
+
+def main():
+    """CLI entry point for a retention sweep over all projects."""
+    archived = apply_retention_to_all_projects()
+    print(f"✅ Retention sweep complete: {archived} deployments archived")
+
+
+if __name__ == "__main__":
+    main()
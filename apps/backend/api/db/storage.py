@@ -0,0 +1,149 @@
+"""
+Storage backend selection.
+
+Every backend module implements the same set of functions (OPERATIONS) with
+the same signatures, key layout and index semantics. The backend is chosen
+once per process with the STORAGE_BACKEND environment variable:
+
+    STORAGE_BACKEND=dynamodb   (default) api.db.dynamodb, backed by AWS
+    STORAGE_BACKEND=memory     api.db.memory, process-local, no AWS needed
+
+Application code imports operations from here (or awaitable versions from
+api.db.aio) rather than from a specific backend. Project writes made through
+this module are published to the change feed (api.db.changes).
+"""
+import os
+import functools
+import importlib
+
+from api.db import changes
+
+BACKENDS = {
+    "dynamodb": "api.db.dynamodb",
+    "memory": "api.db.memory",
+}
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "dynamodb").lower()
+
+# The storage interface every backend provides
+OPERATIONS = (
+    "provision_tables",
+    # Projects
+    "create_project",
+    "claim_subdomain",
+    "get_project",
+    "get_project_by_key",
+    "get_project_by_subdomain",
+    "get_project_cache_stats",
+    "get_org_version",
+    "list_projects",
+    "list_projects_page",
+    "list_all_projects",
+    "list_projects_changed_since",
+    "update_project",
+    "update_project_by_key",
+    "delete_project",
+    # Deployments
+    "create_deployment",
+    "get_deployment",
+    "get_deployment_by_build_id",
+    "get_deployment_by_request_id",
+    "list_deployments",
+    "list_deployments_page",
+    "list_org_deployments_page",
+    "update_deployment",
+    "save_deployment_checkpoint",
+    # Usage
+    "get_org_usage",
+    "update_org_usage",
+    "increment_org_usage",
+    # GitHub connections
+    "save_github_token",
+    "get_github_token",
+    "get_github_installation",
+    "delete_github_connection",
+)
+
+
+def load_backend(name: str = STORAGE_BACKEND):
+    """
+    Import a storage backend module by name and check it is complete.
+
+    Raises:
+        ValueError: If the backend name is unknown
+        RuntimeError: If the backend is missing part of the interface
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown STORAGE_BACKEND {name!r}; expected one of: {', '.join(BACKENDS)}"
+        )
+    module = importlib.import_module(BACKENDS[name])
+    missing = [op for op in OPERATIONS if not callable(getattr(module, op, None))]
+    if missing:
+        raise RuntimeError(f"Storage backend {name!r} is missing: {', '.join(missing)}")
+    return module
+
+
+def _publish_project(func):
+    """Publish the project returned by a write to the change feed."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        project = func(*args, **kwargs)
+        if project:
+            changes.publish(project)
+        return project
+    return wrapper
+
+
+def _publish_deletion(func):
+    """Publish a project deletion to the change feed."""
+    @functools.wraps(func)
+    def wrapper(project_id, *args, **kwargs):
+        deleted = func(project_id, *args, **kwargs)
+        if deleted:
+            changes.publish({"project_id": project_id, "deleted": True})
+        return deleted
+    return wrapper
+
+
+backend = load_backend()
+
+provision_tables = backend.provision_tables
+
+# Projects
+create_project = _publish_project(backend.create_project)
+claim_subdomain = backend.claim_subdomain
+get_project = backend.get_project
+get_project_by_key = backend.get_project_by_key
+get_project_by_subdomain = backend.get_project_by_subdomain
+get_project_cache_stats = backend.get_project_cache_stats
+get_org_version = backend.get_org_version
+list_projects = backend.list_projects
+list_projects_page = backend.list_projects_page
+list_all_projects = backend.list_all_projects
+list_projects_changed_since = backend.list_projects_changed_since
+update_project = _publish_project(backend.update_project)
+update_project_by_key = _publish_project(backend.update_project_by_key)
+delete_project = _publish_deletion(backend.delete_project)
+
+# Deployments
+create_deployment = backend.create_deployment
+get_deployment = backend.get_deployment
+get_deployment_by_build_id = backend.get_deployment_by_build_id
+get_deployment_by_request_id = backend.get_deployment_by_request_id
+list_deployments = backend.list_deployments
+list_deployments_page = backend.list_deployments_page
+list_org_deployments_page = backend.list_org_deployments_page
+update_deployment = backend.update_deployment
+save_deployment_checkpoint = backend.save_deployment_checkpoint
+
+# Usage
+get_org_usage = backend.get_org_usage
+update_org_usage = backend.update_org_usage
+increment_org_usage = backend.increment_org_usage
+
+# GitHub connections
+save_github_token = backend.save_github_token
+get_github_token = backend.get_github_token
+get_github_installation = backend.get_github_installation
+delete_github_connection = backend.delete_github_connection
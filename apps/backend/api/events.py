@@ -0,0 +1,158 @@
+"""
+Project status events for Server-Sent Events viewers.
+
+The hub fans project status transitions out to every connected viewer of a
+project. Changes arrive from the in-process change feed (api.db.changes):
+writes made through api.db.storage in this process, plus DynamoDB Streams
+records delivered to /events. When writes can also happen in processes that
+don't feed this one, a poller re-reads the project every
+PROJECT_EVENTS_POLL_SECONDS; there is at most one poller per project, no
+matter how many viewers it has.
+"""
+import asyncio
+import os
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from api.db import changes
+
+# Fallback polling interval per watched project (0 disables polling)
+PROJECT_EVENTS_POLL_SECONDS = float(os.environ.get("PROJECT_EVENTS_POLL_SECONDS", "5"))
+
+# Events buffered per viewer; a slow viewer only needs the latest status
+VIEWER_QUEUE_SIZE = 16
+
+Viewer = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+
+def status_event(change: dict) -> dict:
+    """Build the event sent to viewers from a project change."""
+    if change.get("deleted"):
+        return {"project_id": change["project_id"], "deleted": True}
+    return {
+        "project_id": change["project_id"],
+        "status": change.get("status"),
+        "function_url": change.get("function_url"),
+        "updated_at": change.get("updated_at"),
+    }
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    """Queue an event for a viewer, dropping its oldest event if it is behind."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class _Topic:
+    """Viewers of one project and the shared upstream subscription."""
+
+    def __init__(self):
+        self.viewers: Set[Viewer] = set()
+        self.last_status: Optional[str] = None
+        self.poller: Optional[asyncio.Task] = None
+
+
+class ProjectEventHub:
+    """In-process pub/sub of project status transitions."""
+
+    def __init__(self, poll_interval: float = PROJECT_EVENTS_POLL_SECONDS):
+        self.poll_interval = poll_interval
+        self._topics: Dict[str, _Topic] = {}
+        self._lock = threading.Lock()
+        self._unsubscribe_feed = None
+
+    def subscribe(self, project_id: str, current: Optional[dict] = None) -> asyncio.Queue:
+        """
+        Start watching a project from the running event loop.
+
+        Args:
+            project_id: Project to watch
+            current: The project as the viewer last saw it, so only later
+                transitions are sent
+
+        Returns:
+            Queue receiving status events; pass it to unsubscribe when done
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=VIEWER_QUEUE_SIZE)
+
+        with self._lock:
+            if self._unsubscribe_feed is None:
+                self._unsubscribe_feed = changes.subscribe(self.publish)
+
+            topic = self._topics.get(project_id)
+            if topic is None:
+                topic = self._topics[project_id] = _Topic()
+                if self.poll_interval > 0:
+                    topic.poller = loop.create_task(self._poll(project_id))
+            if current and topic.last_status is None:
+                topic.last_status = current.get("status")
+            topic.viewers.add((loop, queue))
+        return queue
+
+    def unsubscribe(self, project_id: str, queue: asyncio.Queue) -> None:
+        """Stop watching; the last viewer of a project also stops its poller."""
+        with self._lock:
+            topic = self._topics.get(project_id)
+            if topic is None:
+                return
+            topic.viewers = {v for v in topic.viewers if v[1] is not queue}
+            if topic.viewers:
+                return
+            del self._topics[project_id]
+
+        if topic.poller is not None:
+            topic.poller.cancel()
+
+    def publish(self, change: dict) -> None:
+        """
+        Deliver a project change to the project's viewers.
+
+        Thread-safe. Only status transitions (and deletions) are delivered;
+        repeated writes with the same status are dropped.
+        """
+        project_id = change.get("project_id")
+        event = status_event(change) if project_id else None
+        if event is None:
+            return
+
+        with self._lock:
+            topic = self._topics.get(project_id)
+            if topic is None:
+                return
+            if not event.get("deleted"):
+                if event["status"] == topic.last_status:
+                    return
+                topic.last_status = event["status"]
+            viewers = list(topic.viewers)
+
+        for loop, queue in viewers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # The viewer's event loop is closed; it will unsubscribe itself
+                pass
+
+    def viewer_count(self, project_id: str) -> int:
+        """Number of viewers currently watching a project."""
+        with self._lock:
+            topic = self._topics.get(project_id)
+            return len(topic.viewers) if topic else 0
+
+    async def _poll(self, project_id: str) -> None:
+        """Re-read a watched project periodically and publish what changed."""
+        from api.db.aio import get_project
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                project = await get_project(project_id)
+            except Exception as e:
+                print(f"⚠️ Status poll failed for {project_id}: {e}")
+                continue
+            self.publish(project or {"project_id": project_id, "deleted": True})
+
+
+# Process-wide hub used by the API routes
+project_events = ProjectEventHub()
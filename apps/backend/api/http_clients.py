@@ -0,0 +1,137 @@
+"""
+Shared, pooled HTTP clients for outbound calls (GitHub, Autumn, Clerk).
+
+Creating an httpx client per request means every call pays a new TCP and
+TLS handshake. Instead each upstream service gets one long-lived client per
+process with keep-alive pooling, HTTP/2 and its own timeouts. The clients
+are opened in the FastAPI lifespan and closed on shutdown; they are also
+created on first use, since the Mangum handler runs with lifespan="off".
+
+Async clients are bound to the event loop that created them. If the loop
+changes (e.g. a new loop per Lambda invocation), the clients are recreated,
+and the old ones are closed on their own loop: right away if it is still
+running in another thread, otherwise when it shuts down.
+"""
+import asyncio
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+import httpx
+
+from api.timing import async_event_hooks, sync_event_hooks
+
+# Autumn billing API
+AUTUMN_BASE_URL = os.environ.get("AUTUMN_BASE_URL", "https://api.useautumn.com/v1").rstrip("/")
+
+# Pool sizing, shared by every service client
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "true").lower() != "false"
+
+# Per-service timeouts: (overall read/write/pool timeout, connect timeout)
+SERVICE_TIMEOUTS = {
+    "github": httpx.Timeout(10.0, connect=5.0),
+    "autumn": httpx.Timeout(15.0, connect=5.0),
+    "clerk": httpx.Timeout(5.0, connect=3.0),
+}
+
+
+def client_options(service: str) -> dict:
+    """Keyword arguments shared by the async and sync client of a service."""
+    if service not in SERVICE_TIMEOUTS:
+        raise ValueError(f"Unknown HTTP service {service!r}; expected one of: {', '.join(SERVICE_TIMEOUTS)}")
+    return {
+        "http2": HTTP2_ENABLED,
+        "timeout": SERVICE_TIMEOUTS[service],
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    }
+
+
+def _close_on_loop(clients: Dict[str, httpx.AsyncClient], loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close a previous loop's clients there, if that loop still runs (in another thread)."""
+    if loop is not None and loop.is_running():
+        for client in clients.values():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+async def _close_at_loop_shutdown(clients: Dict[str, httpx.AsyncClient]) -> None:
+    """
+    Close a loop's clients when the loop shuts down.
+
+    asyncio.run() cancels the tasks still pending before it closes the loop;
+    this one waits for that, so the clients are closed while their loop can
+    still close the pooled connections.
+    """
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for client in list(clients.values()):
+            await client.aclose()
+
+
+class HTTPClients:
+    """Application-scoped async clients, one pooled client per service."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown_task: Optional[asyncio.Task] = None
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for a service, creating it on first use.
+
+        Must be called from a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections can't be reused across loops; start a fresh set
+            _close_on_loop(self._clients, self._loop)
+            self._clients = {}
+            self._loop = loop
+            self._shutdown_task = loop.create_task(_close_at_loop_shutdown(self._clients))
+
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            client = self._clients[service] = httpx.AsyncClient(
+                **client_options(service),
+                event_hooks=async_event_hooks(service),
+            )
+        return client
+
+    def github(self) -> httpx.AsyncClient:
+        """Client for api.github.com."""
+        return self.get("github")
+
+    def autumn(self) -> httpx.AsyncClient:
+        """Client for the Autumn billing API."""
+        return self.get("autumn")
+
+    async def start(self) -> None:
+        """Create every service client (called from the FastAPI lifespan)."""
+        for service in SERVICE_TIMEOUTS:
+            self.get(service)
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections."""
+        # Emptied in place: the loop's shutdown task watches this dict
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+# Process-wide clients used by the API routes
+http_clients = HTTPClients()
+
+
+@lru_cache(maxsize=None)
+def get_sync_client(service: str) -> httpx.Client:
+    """Pooled blocking client for a service, for jobs outside the event loop."""
+    return httpx.Client(**client_options(service), event_hooks=sync_event_hooks(service))
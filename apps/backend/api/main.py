@@ -5,19 +5,58 @@ This single Lambda handles:
 1. HTTP requests (via Mangum/Lambda Web Adapter)
 2. SQS deployment events (background tasks)
 """
+import hmac
 import os
 import json
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from mangum import Mangum
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
 from api.routes import github, projects, deployments
+from api.auth import CLERK_ISSUER, get_auth_cache_stats, jwks_cache
+from api.concurrency import run_sync
+from api.db.storage import get_project_cache_stats
+from api.http_clients import http_clients
+from api.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    flush_emf,
+    flush_emf_async,
+    observe_deploy_stage,
+    register_cache,
+    registry,
+)
+from api.timing import ServerTimingMiddleware, install_botocore_hooks
+from deployer.stages import add_stage_listener
+
+# Time AWS calls per request; must precede the first (lazily created) boto3 client
+install_botocore_hooks()
+
+# Cache and deploy-stage metrics
+register_cache("auth_tokens", get_auth_cache_stats)
+register_cache("autumn_customers", projects.get_autumn_cache_stats)
+register_cache("projects", get_project_cache_stats)
+add_stage_listener(observe_deploy_stage)
+
+# Optional bearer token required to read /metrics
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Shared secret (X-Events-Secret header) required for events posted to
+# /events by a sender other than the Lambda's SQS queue: CodeBuild events
+# delivered directly and DynamoDB Streams batches (e.g. relayed by an
+# EventBridge Pipe). Unset, such events are rejected.
+EVENTS_SECRET = os.environ.get("EVENTS_SECRET", "")
+
+# ARNs of the SQS queues the Lambda consumes (deploy requests, build
+# events), comma-separated. SQS records naming any other source are
+# rejected unless they carry the events secret.
+EVENT_QUEUE_ARNS = {arn.strip() for arn in os.environ.get("EVENT_QUEUE_ARNS", "").split(",") if arn.strip()}
 
 
 # CORS allowed origins
@@ -35,11 +74,16 @@ ALLOWED_ORIGINS = [o for o in ALLOWED_ORIGINS if o]
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup: ensure DynamoDB tables exist
-    from api.db.dynamodb import get_or_create_table
-    get_or_create_table()  # Projects table
+    # Startup does no network I/O, so it adds nothing to a cold start beyond
+    # imports. Tables are created by `python -m api.db.provision` and table
+    # handles are bootstrapped lazily; Clerk's signing keys are fetched by
+    # a background thread.
+    await http_clients.start()
+    if CLERK_ISSUER:
+        jwks_cache.start()
     yield
-    # Shutdown: nothing to do
+    # Shutdown: close pooled connections
+    await http_clients.aclose()
 
 
 app = FastAPI(
@@ -56,8 +100,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+# Outermost, so the reported totals cover the whole request
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(github.router)
 app.include_router(projects.router)
@@ -76,16 +125,40 @@ async def health():
     return {"status": "ok"}
 
 
-# Lambda handler (for AWS Lambda deployment)
-_mangum_handler = Mangum(app, lifespan="off")
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Process metrics in the OpenMetrics text format."""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    # Gauge callbacks may call AWS (deploy queue depth), so render off the loop
+    body = await run_sync(registry.render_openmetrics)
+    return Response(content=body, media_type=OPENMETRICS_CONTENT_TYPE)
+
+
+@lru_cache()
+def _get_mangum_handler():
+    """Mangum adapter, built on first use: the container runs under the Lambda Web Adapter."""
+    from mangum import Mangum
+
+    return Mangum(app, lifespan="off")
+
+
+def handler(event, context):
+    """Lambda handler for running the API without the Lambda Web Adapter."""
+    try:
+        return _get_mangum_handler()(event, context)
+    finally:
+        flush_emf()
 
 
 def _handle_sqs_event(event: dict) -> dict:
     """
     Handle SQS deployment events.
-    Processes each message in the batch and runs the deployment.
+    Processes each message in the batch: deployment requests start a
+    deployment, CodeBuild state-change events (forwarded by EventBridge)
+    resume one.
     """
-    from api.routes.projects import _run_deployment_sync
+    from api.routes.projects import _run_deployment_sync, handle_codebuild_event
     
     records = event.get("Records", [])
     print(f"📥 Received {len(records)} SQS message(s)")
@@ -97,6 +170,12 @@ def _handle_sqs_event(event: dict) -> dict:
         try:
             # Parse the message body
             body = json.loads(record.get("body", "{}"))
+            
+            if _is_codebuild_event(body):
+                handle_codebuild_event(body)
+                print(f"✅ Message {message_id} processed successfully")
+                continue
+            
             print(f"📦 Processing message {message_id}: {body}")
             
             # Run the deployment synchronously
@@ -110,6 +189,9 @@ def _handle_sqs_event(event: dict) -> dict:
                 memory=body.get("memory", 1024),
                 timeout=body.get("timeout", 30),
                 ephemeral_storage=body.get("ephemeral_storage", 512),
+                organization_id=body.get("organization_id"),
+                # The SQS message id is stable across redeliveries (older messages have no request_id)
+                request_id=body.get("request_id") or message_id,
             )
             print(f"✅ Message {message_id} processed successfully")
             
@@ -142,6 +224,16 @@ def _is_sqs_event(event: dict) -> bool:
     return records[0].get("eventSource") == "aws:sqs"
 
 
+def _is_dynamodb_stream_event(event: dict) -> bool:
+    """Check if the event is a batch of DynamoDB Streams records."""
+    if not isinstance(event, dict):
+        return False
+    records = event.get("Records", [])
+    if not records:
+        return False
+    return records[0].get("eventSource") == "aws:dynamodb"
+
+
 def _is_eventbridge_event(event: dict) -> bool:
     """Check if the event is from EventBridge."""
     if not isinstance(event, dict):
@@ -150,6 +242,54 @@ def _is_eventbridge_event(event: dict) -> bool:
     return event.get("source") == "aws.events"
 
 
+def _is_codebuild_event(event: dict) -> bool:
+    """Check if the event is a CodeBuild state change (build finished)."""
+    return isinstance(event, dict) and event.get("source") == "aws.codebuild"
+
+
+def _require_events_secret(request: Request) -> None:
+    """
+    Reject an event that does not carry the shared events secret.
+
+    /events is reachable through the function URL like any other route, so
+    an event whose shape anyone can forge must prove where it came from.
+
+    Raises:
+        HTTPException: 401 if EVENTS_SECRET is unset or the header differs
+    """
+    if not _has_events_secret(request):
+        raise HTTPException(status_code=401, detail="Invalid events secret")
+
+
+def _has_events_secret(request: Request) -> bool:
+    """Whether the request carries the shared events secret (never, if unset)."""
+    secret = request.headers.get("x-events-secret", "")
+    return bool(EVENTS_SECRET) and hmac.compare_digest(secret.encode(), EVENTS_SECRET.encode())
+
+
+def _require_queue_delivery(request: Request, records: list) -> None:
+    """
+    Reject SQS records that the Lambda did not receive from its own queues.
+
+    The Lambda Web Adapter posts events from the function's event sources to
+    /events without an HTTP request context, while it adds one
+    (x-amzn-request-context) to every request made through the function
+    URL. Relayed records must also name one of EVENT_QUEUE_ARNS as their
+    source. Senders holding the events secret may post records directly.
+
+    Raises:
+        HTTPException: 401 if the records may have been forged
+    """
+    if _has_events_secret(request):
+        return
+    if (
+        "x-amzn-request-context" in request.headers
+        or not EVENT_QUEUE_ARNS
+        or any(record.get("eventSourceARN") not in EVENT_QUEUE_ARNS for record in records)
+    ):
+        raise HTTPException(status_code=401, detail="Records not delivered by an event queue")
+
+
 def _handle_eventbridge_event(event: dict) -> dict:
     """
     Handle EventBridge scheduled events.
@@ -181,7 +321,9 @@ async def handle_events(request: Request):
     Handle incoming events from Lambda Web Adapter.
     LWA converts SQS events into HTTP POST requests to this endpoint (default path /events).
     
-    Also handles EventBridge scheduled events for usage aggregation.
+    Also handles EventBridge scheduled events for usage aggregation,
+    CodeBuild build state changes (deployment phase two), and DynamoDB
+    Streams records from the projects table (status change feed).
     """
     try:
         event = await request.json()
@@ -190,21 +332,45 @@ async def handle_events(request: Request):
         # Check if this is an EventBridge event
         if _is_eventbridge_event(event):
             print("📅 Routing to EventBridge handler (scheduled task)")
-            return _handle_eventbridge_event(event)
+            return await run_sync(_handle_eventbridge_event, event)
+        
+        # A CodeBuild event delivered directly (e.g. the local stand-in)
+        if _is_codebuild_event(event):
+            from api.routes.projects import handle_codebuild_event
+            _require_events_secret(request)
+            print("🔔 Routing to CodeBuild handler (build finished)")
+            try:
+                await run_sync(handle_codebuild_event, event)
+            except LookupError as e:
+                # No deployment is waiting on the build yet: the sender retries
+                raise HTTPException(status_code=409, detail=str(e))
+            return {"statusCode": 200, "body": "Build event processed"}
         
         # Check if this is an SQS event
         if _is_sqs_event(event):
+            _require_queue_delivery(request, event["Records"])
             print("🔄 Routing to SQS handler (deployment task)")
-            # Run the synchronous handler
-            # Since this is a dedicated Lambda for handling this batch, blocking is acceptable/expected
-            return _handle_sqs_event(event)
+            # Deploys and build completions block on AWS: keep them off the event loop
+            return await run_sync(_handle_sqs_event, event)
+        
+        # Check if this is a DynamoDB Streams batch (project changes)
+        if _is_dynamodb_stream_event(event):
+            from api.db.changes import handle_stream_records
+            _require_events_secret(request)
+            published = handle_stream_records(event["Records"])
+            return {"statusCode": 200, "body": f"Published {published} project changes"}
         
         # Other event types?
         print("⚠️ Received non-SQS/non-EventBridge event, ignoring")
         return {"status": "ignored", "reason": "unknown_event_type"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error handling event: {e}")
         import traceback
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
+    finally:
+        # Deploys run here; emit their stage metrics before Lambda freezes
+        await flush_emf_async(force=True)
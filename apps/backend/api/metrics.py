@@ -0,0 +1,480 @@
+"""
+In-process metrics: counters, gauges and histograms with OpenMetrics and
+CloudWatch EMF (embedded metric format) exporters.
+
+Recording is lock-light: each metric keeps one value shard per thread, so an
+observation is a thread-local lookup and an add, with no shared lock. A lock
+is only taken the first time a thread touches a label set, and at export
+time, when the shards are summed.
+
+- `/metrics` (api/main.py) renders the registry as OpenMetrics text for a
+  Prometheus-compatible scraper (e.g. when running as a container).
+- On Lambda there is nothing to scrape, so `flush_emf()` prints the deltas
+  since the last flush as EMF log lines, which CloudWatch turns into metrics.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from api.concurrency import run_sync
+
+# Prefix of every metric name
+METRICS_PREFIX = "shorlabs"
+
+# CloudWatch namespace for EMF output
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Shorlabs")
+
+# EMF is on by default on Lambda, where the /metrics endpoint can't be scraped
+METRICS_EMF_ENABLED = os.environ.get(
+    "METRICS_EMF_ENABLED", "true" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "false"
+).lower() == "true"
+
+# Minimum gap between EMF flushes from the request path
+METRICS_EMF_FLUSH_SECONDS = float(os.environ.get("METRICS_EMF_FLUSH_SECONDS", "60"))
+
+# Latency buckets (seconds) for API requests and outbound calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Duration buckets (seconds) for deploy stages, which run from seconds to minutes
+STAGE_BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class _Sharded:
+    """Per-thread value shards of one labelled series, summed on read."""
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> list:
+        """The calling thread's shard (created on first use)."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * self._width
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def totals(self) -> list:
+        """Element-wise sum of every thread's shard."""
+        totals = [0] * self._width
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    """A metric family: one series per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _callback_values(self) -> Dict[Tuple[str, ...], float]:
+        """Values read from the metric's callback at export (empty on failure)."""
+        try:
+            return self.callback()
+        except Exception as e:
+            print(f"⚠️ Metric callback for {self.name} failed: {e}")
+            return {}
+
+    def labels(self, *values: str):
+        """The series for these label values (created on first use)."""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                series = self._series.setdefault(tuple(str(v) for v in values), self._new_series())
+        return series
+
+    def series(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """Snapshot of (label values, series) pairs."""
+        with self._lock:
+            return list(self._series.items())
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. calls or errors, either counted here or read from a callback at export."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_series(self):
+        return _Sharded(1)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increment the series for `labels`."""
+        self.labels(*labels).shard()[0] += amount
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        """(name, labels, value) samples for export."""
+        if self.callback is not None:
+            for values, value in self._callback_values().items():
+                yield f"{self.name}_total", dict(zip(self.labelnames, values)), value
+            return
+        for values, series in self.series():
+            yield f"{self.name}_total", dict(zip(self.labelnames, values)), series.totals()[0]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        # One count per bucket, one for +Inf, then the count and the sum
+        return _Sharded(len(self.buckets) + 3)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for `labels`."""
+        shard = self.labels(*labels).shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-2] += 1
+        shard[-1] += value
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        """(name, labels, value) samples for export (cumulative buckets)."""
+        for values, series in self.series():
+            labels = dict(zip(self.labelnames, values))
+            totals = series.totals()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), totals):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", dict(labels, le=le), cumulative
+            yield f"{self.name}_count", labels, totals[-2]
+            yield f"{self.name}_sum", labels, totals[-1]
+
+
+class Gauge(_Metric):
+    """Current value, either set directly or read from a callback at export."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_series(self):
+        return [0.0]
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the series for `labels`."""
+        self.labels(*labels)[0] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add to the series for `labels` (gauges move rarely, so this locks)."""
+        series = self.labels(*labels)
+        with self._lock:
+            series[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Subtract from the series for `labels`."""
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        """(name, labels, value) samples for export."""
+        if self.callback is not None:
+            for label_values, value in self._callback_values().items():
+                yield self.name, dict(zip(self.labelnames, label_values)), value
+            return
+        for label_values, series in self.series():
+            yield self.name, dict(zip(self.labelnames, label_values)), series[0]
+
+
+# ─────────────────────────────────────────────────────────────
+# REGISTRY
+# ─────────────────────────────────────────────────────────────
+
+
+class Registry:
+    """The set of metrics exported by this process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._emf_last: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._emf_flushed_at = time.monotonic()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric (returns the existing one if the name is taken)."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None) -> Counter:
+        """Create and register a counter (optionally read from `callback`)."""
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None) -> Gauge:
+        """Create and register a gauge (optionally read from `callback`)."""
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def metrics(self) -> List[_Metric]:
+        """Registered metrics, sorted by name."""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render_openmetrics(self) -> str:
+        """Render every metric in the OpenMetrics text format."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def emf_flush_due(self) -> bool:
+        """Whether METRICS_EMF_FLUSH_SECONDS have passed since the last flush."""
+        return time.monotonic() - self._emf_flushed_at >= METRICS_EMF_FLUSH_SECONDS
+
+    def flush_emf(self, force: bool = False) -> int:
+        """
+        Print the changes since the last flush as EMF log lines.
+
+        Counters and histogram counts/sums are reported as deltas (histograms
+        as `<name>_count` and `<name>_sum`, so CloudWatch can derive averages);
+        gauges as their current value. Unless `force`, does nothing until
+        METRICS_EMF_FLUSH_SECONDS have passed. Returns the lines printed.
+
+        Callback metrics are read here and may block (e.g. an AWS call), so
+        callers on the event loop must offload this.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._emf_flushed_at < METRICS_EMF_FLUSH_SECONDS:
+                return 0
+            self._emf_flushed_at = now
+
+        timestamp = int(time.time() * 1000)
+        printed = 0
+        for metric in self.metrics():
+            for name, labels, value in metric.samples():
+                if name.endswith("_bucket"):
+                    continue
+                if metric.kind != "gauge":
+                    key = (name, tuple(sorted(labels.items())))
+                    with self._lock:
+                        previous = self._emf_last.get(key, 0)
+                        self._emf_last[key] = value
+                    value -= previous
+                    if not value:
+                        continue
+                print(json.dumps(dict(
+                    labels,
+                    _aws={
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [{
+                            "Namespace": METRICS_NAMESPACE,
+                            "Dimensions": [sorted(labels)],
+                            "Metrics": [{"Name": name, "Unit": _emf_unit(name)}],
+                        }],
+                    },
+                    **{name: value},
+                )))
+                printed += 1
+        return printed
+
+
+def _escape(text: str) -> str:
+    """Escape a HELP text or label value."""
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    """Render `{name="value",...}` (empty for no labels)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value (integers without a decimal point)."""
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _emf_unit(name: str) -> str:
+    """CloudWatch unit for a sample name."""
+    if name.endswith("_seconds_sum"):
+        return "Seconds"
+    if name.endswith("_total") or name.endswith("_count"):
+        return "Count"
+    return "None"
+
+
+registry = Registry()
+
+
+def flush_emf(force: bool = False) -> int:
+    """Print EMF lines for the process registry if EMF output is enabled."""
+    if not METRICS_EMF_ENABLED:
+        return 0
+    return registry.flush_emf(force=force)
+
+
+async def flush_emf_async(force: bool = False) -> int:
+    """flush_emf() for the event loop: runs on the I/O pool, and only when due."""
+    if not METRICS_EMF_ENABLED or not (force or registry.emf_flush_due()):
+        return 0
+    return await run_sync(registry.flush_emf, force)
+
+
+# ─────────────────────────────────────────────────────────────
+# STANDARD METRICS
+# ─────────────────────────────────────────────────────────────
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template.",
+    ("method", "route", "status"),
+)
+
+dependency_calls = registry.counter(
+    "dependency_calls",
+    "Outbound calls (DynamoDB, CloudWatch, GitHub, ...) by dependency.",
+    ("dependency",),
+)
+
+dependency_errors = registry.counter(
+    "dependency_errors",
+    "Outbound calls that raised or returned an error status.",
+    ("dependency",),
+)
+
+dependency_duration = registry.histogram(
+    "dependency_duration_seconds",
+    "Outbound call latency by dependency.",
+    ("dependency",),
+)
+
+deploy_stage_duration = registry.histogram(
+    "deploy_stage_duration_seconds",
+    "Deploy pipeline stage durations.",
+    ("stage", "outcome"),
+    buckets=STAGE_BUCKETS,
+)
+
+deployments_in_flight = registry.gauge(
+    "deployments_in_flight",
+    "Deployments currently running in this process.",
+)
+
+
+def observe_dependency(dependency: str, seconds: float, error: bool = False) -> None:
+    """Record one outbound call."""
+    dependency_calls.inc(dependency)
+    dependency_duration.observe(seconds, dependency)
+    if error:
+        dependency_errors.inc(dependency)
+
+
+def observe_deploy_stage(stage: str, seconds: float, succeeded: bool) -> None:
+    """Deploy stage listener (see deployer.stages)."""
+    deploy_stage_duration.observe(seconds, stage, "success" if succeeded else "failure")
+
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+    """Export a cache's stats(): hits and misses as counters, size as a gauge, labelled by cache."""
+    for field in ("hits", "misses"):
+        counter = registry.counter(
+            f"cache_{field}",
+            f"Cache {field} as reported by the cache's stats().",
+            ("cache",),
+            callback=_CacheStatsCallback(field),
+        )
+        counter.callback.caches[name] = stats
+    gauge = registry.gauge(
+        "cache_size",
+        "Cache entries as reported by the cache's stats().",
+        ("cache",),
+        callback=_CacheStatsCallback("size"),
+    )
+    gauge.callback.caches[name] = stats
+
+
+class _CacheStatsCallback:
+    """Metric callback reading one field from every registered cache's stats()."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.caches: Dict[str, Callable[[], dict]] = {}
+
+    def __call__(self) -> Dict[Tuple[str, ...], float]:
+        return {(name,): stats().get(self.field, 0) for name, stats in self.caches.items()}
+
+
+# ─────────────────────────────────────────────────────────────
+# MIDDLEWARE
+# ─────────────────────────────────────────────────────────────
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Unmatched paths share one series so scanners can't blow up cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(
+                time.perf_counter() - start, scope["method"], route, str(status)
+            )
+            # Off the loop: gauge callbacks may call AWS (deploy queue depth)
+            await flush_emf_async()
@@ -1,18 +1,54 @@
 """
-Deployments API routes - Deployment logs and streaming.
+Deployments API routes - Org-wide feed, deployment logs and streaming.
 """
 import asyncio
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
-from api.db.dynamodb import get_project_by_key, get_deployment
-from deployer.aws.cloudwatch import get_build_logs, get_build_logs_stream
+from api.auth import get_current_user_id
+from api.concurrency import run_sync
+from api.db.aio import get_project_by_key, get_deployment, list_org_deployments_page
+from api.db.common import InvalidCursorError, DEFAULT_PAGE_SIZE
 
 router = APIRouter(prefix="/api/deployments", tags=["deployments"])
 
 
+@router.get("")
+async def get_org_deployments(
+    user_id: str = Depends(get_current_user_id),  # For auth
+    org_id: str = Query(...),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Recent deployments across all of the organization's projects, newest first.
+
+    Pass `next_cursor` back as `cursor` to fetch older deployments.
+    """
+    try:
+        deployments, next_cursor = await list_org_deployments_page(org_id, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "deployments": [
+            {
+                "deploy_id": d["deploy_id"],
+                "project_id": d["project_id"],
+                "build_id": d.get("build_id"),
+                "status": d["status"],
+                "started_at": d["started_at"],
+                "finished_at": d.get("finished_at"),
+            }
+            for d in deployments
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/{project_id}/{deploy_id}/logs")
 async def get_deployment_logs(
     project_id: str,
@@ -25,14 +61,14 @@ async def get_deployment_logs(
     Returns build logs from CloudWatch for the associated CodeBuild build.
     """
     # Verify project belongs to organization
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id, cached=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.get("organization_id") != org_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Get the deployment to find the build_id
-    deployment = get_deployment(project_id, deploy_id)
+    deployment = await get_deployment(project_id, deploy_id)
     if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
@@ -45,7 +81,8 @@ async def get_deployment_logs(
         }
     
     # Fetch logs from CloudWatch
-    logs = get_build_logs(build_id)
+    from deployer.aws.cloudwatch import get_build_logs
+    logs = await run_sync(get_build_logs, build_id)
     
     return {
         "logs": logs,
@@ -67,14 +104,14 @@ async def stream_deployment_logs(
     Streams log events as they happen until the build completes.
     """
     # Verify project belongs to organization
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id, cached=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.get("organization_id") != org_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Get the deployment
-    deployment = get_deployment(project_id, deploy_id)
+    deployment = await get_deployment(project_id, deploy_id)
     if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
@@ -82,6 +119,8 @@ async def stream_deployment_logs(
     if not build_id:
         raise HTTPException(status_code=400, detail="No build ID for this deployment")
     
+    from deployer.aws.cloudwatch import get_build_logs_stream
+
     async def log_generator():
         """Generate SSE events for log streaming."""
         import json
@@ -92,7 +131,7 @@ async def stream_deployment_logs(
         while True:
             try:
                 # Fetch logs with pagination
-                result = get_build_logs_stream(build_id, next_token)
+                result = await run_sync(get_build_logs_stream, build_id, next_token)
                 
                 logs = result.get("logs", [])
                 new_token = result.get("next_token")
@@ -3,7 +3,6 @@ GitHub API routes - fetch organization's repositories and handle GitHub App inst
 """
 import os
 import time
-import httpx
 import jwt
 from typing import Optional
 from datetime import datetime, timedelta
@@ -11,7 +10,8 @@ from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from pydantic import BaseModel
 
 from api.auth import get_current_user_id
-from api.db.dynamodb import save_github_token, get_github_token, get_github_installation, delete_github_connection
+from api.http_clients import http_clients
+from api.db.aio import save_github_token, get_github_token, get_github_installation, delete_github_connection
 from deployer.utils.frameworks import detect_framework
 
 router = APIRouter(prefix="/api/github", tags=["github"])
@@ -63,27 +63,27 @@ async def generate_installation_token(installation_id: str) -> dict:
     """
     app_jwt = generate_github_app_jwt()
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://api.github.com/app/installations/{installation_id}/access_tokens",
-            headers={
-                "Authorization": f"Bearer {app_jwt}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
+    client = http_clients.github()
+    response = await client.post(
+        f"https://api.github.com/app/installations/{installation_id}/access_tokens",
+        headers={
+            "Authorization": f"Bearer {app_jwt}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        },
+    )
+
+    if response.status_code != 201:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Failed to generate installation token: {response.text}"
         )
 
-        if response.status_code != 201:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to generate installation token: {response.text}"
-            )
-
-        data = response.json()
-        return {
-            "token": data["token"],
-            "expires_at": data["expires_at"],  # ISO 8601 format
-        }
+    data = response.json()
+    return {
+        "token": data["token"],
+        "expires_at": data["expires_at"],  # ISO 8601 format
+    }
 
 
 async def get_or_refresh_token(org_id: str, user_id: str) -> Optional[str]:
@@ -100,7 +100,7 @@ async def get_or_refresh_token(org_id: str, user_id: str) -> Optional[str]:
     Raises:
         HTTPException: If token refresh fails due to installation removal
     """
-    installation = get_github_installation(org_id)
+    installation = await get_github_installation(org_id)
     if not installation:
         print(f"[GitHub] No installation found for org {org_id}")
         return None
@@ -117,7 +117,7 @@ async def get_or_refresh_token(org_id: str, user_id: str) -> Optional[str]:
                     try:
                         # Refresh token
                         token_data = await generate_installation_token(installation_id)
-                        save_github_token(
+                        await save_github_token(
                             org_id,
                             user_id,
                             token_data["token"],
@@ -186,55 +186,54 @@ async def connect_github(
         # This gives us the account info (username, avatar, etc.)
         app_jwt = generate_github_app_jwt()
 
-        async with httpx.AsyncClient() as client:
-            install_resp = await client.get(
-                f"https://api.github.com/app/installations/{payload.installation_id}",
-                headers={
-                    "Authorization": f"Bearer {app_jwt}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                },
-            )
+        client = http_clients.github()
+        install_resp = await client.get(
+            f"https://api.github.com/app/installations/{payload.installation_id}",
+            headers={
+                "Authorization": f"Bearer {app_jwt}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+        )
 
-            if install_resp.status_code != 200:
-                print(f"[GitHub] Failed to get installation info: {install_resp.status_code} - {install_resp.text}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Failed to get installation info: {install_resp.text}"
-                )
+        if install_resp.status_code != 200:
+            print(f"[GitHub] Failed to get installation info: {install_resp.status_code} - {install_resp.text}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to get installation info: {install_resp.text}"
+            )
 
-            install_data = install_resp.json()
-            account = install_data.get("account", {})
-            print(f"[GitHub] Installation found for account: {account.get('login')}")
+        install_data = install_resp.json()
+        account = install_data.get("account", {})
+        print(f"[GitHub] Installation found for account: {account.get('login')}")
 
         # Step 2: Generate installation access token
         token_data = await generate_installation_token(payload.installation_id)
 
         # Step 3: Validate that we can actually access repositories
-        async with httpx.AsyncClient() as client:
-            repos_resp = await client.get(
-                "https://api.github.com/installation/repositories",
-                headers={
-                    "Authorization": f"Bearer {token_data['token']}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                },
-                params={"per_page": 1},  # Just check access, don't fetch all
-            )
+        repos_resp = await client.get(
+            "https://api.github.com/installation/repositories",
+            headers={
+                "Authorization": f"Bearer {token_data['token']}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            params={"per_page": 1},  # Just check access, don't fetch all
+        )
 
-            if repos_resp.status_code != 200:
-                print(f"[GitHub] Token cannot access repos: {repos_resp.status_code} - {repos_resp.text}")
-                raise HTTPException(
-                    status_code=400,
-                    detail="Installation token cannot access repositories. Please check app permissions."
-                )
+        if repos_resp.status_code != 200:
+            print(f"[GitHub] Token cannot access repos: {repos_resp.status_code} - {repos_resp.text}")
+            raise HTTPException(
+                status_code=400,
+                detail="Installation token cannot access repositories. Please check app permissions."
+            )
 
-            repos_data = repos_resp.json()
-            total_count = repos_data.get("total_count", 0)
-            print(f"[GitHub] Successfully validated access to {total_count} repositories")
+        repos_data = repos_resp.json()
+        total_count = repos_data.get("total_count", 0)
+        print(f"[GitHub] Successfully validated access to {total_count} repositories")
 
         # Step 4: Save installation data to DynamoDB with org-based key
-        save_github_token(
+        await save_github_token(
             org_id,
             user_id,
             token_data["token"],
@@ -277,19 +276,19 @@ async def list_github_repos(
             detail="GitHub account not connected. Please connect GitHub first.",
         )
 
-    async with httpx.AsyncClient() as client:
-        # For GitHub App installations, use the installation/repositories endpoint
-        response = await client.get(
-            "https://api.github.com/installation/repositories",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-            params={
-                "per_page": 100,
-            },
-        )
+    client = http_clients.github()
+    # For GitHub App installations, use the installation/repositories endpoint
+    response = await client.get(
+        "https://api.github.com/installation/repositories",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        },
+        params={
+            "per_page": 100,
+        },
+    )
 
     if response.status_code != 200:
         # If 401, token might be revoked or installation removed
@@ -326,7 +325,7 @@ async def github_connection_status(
     org_id: str = Query(..., description="Organization ID"),
 ):
     """Check if organization has connected their GitHub App."""
-    installation = get_github_installation(org_id)
+    installation = await get_github_installation(org_id)
 
     if not installation:
         return {"connected": False}
@@ -347,7 +346,7 @@ async def disconnect_github(
     org_id: str = Query(..., description="Organization ID"),
 ):
     """Disconnect GitHub App installation for the organization."""
-    installation = get_github_installation(org_id)
+    installation = await get_github_installation(org_id)
 
     if not installation:
         raise HTTPException(status_code=404, detail="No GitHub connection found")
@@ -357,20 +356,20 @@ async def disconnect_github(
     if installation_id:
         try:
             app_jwt = generate_github_app_jwt()
-            async with httpx.AsyncClient() as client:
-                await client.delete(
-                    f"https://api.github.com/app/installations/{installation_id}",
-                    headers={
-                        "Authorization": f"Bearer {app_jwt}",
-                        "Accept": "application/vnd.github+json",
-                        "X-GitHub-Api-Version": "2022-11-28",
-                    },
-                )
+            client = http_clients.github()
+            await client.delete(
+                f"https://api.github.com/app/installations/{installation_id}",
+                headers={
+                    "Authorization": f"Bearer {app_jwt}",
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                },
+            )
         except Exception as e:
             # Log but don't fail - we still want to remove our local record
             print(f"[GitHub] Failed to revoke installation on GitHub: {e}")
 
-    deleted = delete_github_connection(org_id)
+    deleted = await delete_github_connection(org_id)
 
     return {"disconnected": deleted}
 
@@ -397,15 +396,15 @@ async def get_repo_contents(
     if path:
         url = f"{url}/{path}"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-        )
+    client = http_clients.github()
+    response = await client.get(
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        },
+    )
 
     if response.status_code == 404:
         return []
@@ -451,6 +450,6 @@ async def detect_framework_endpoint(
     
     github_url = f"https://github.com/{repo}"
     
-    result = await detect_framework(github_url, root_directory, token)
+    result = await detect_framework(github_url, root_directory, token, client=http_clients.github())
     
     return result
@@ -3,51 +3,74 @@ Projects API routes - CRUD operations for projects.
 """
 import os
 import json
+import hashlib
+import asyncio
 import threading
 from typing import Optional
-from datetime import datetime
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 
-import boto3
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import httpx
 
 from api.auth import get_current_user_id
-from api.db.dynamodb import (
+from api.cache import AsyncTTLCache, TTLCache
+from api.http_clients import AUTUMN_BASE_URL, http_clients
+from api.concurrency import run_sync
+from api.db import storage as db
+from api.db.aio import (
     create_project,
     get_project,
     get_project_by_key,
+    get_org_version,
     list_projects,
-    update_project,
+    list_projects_page,
+    list_projects_changed_since,
+    update_project_by_key,
     delete_project,
-    create_deployment,
-    list_deployments,
-    update_deployment,
+    list_deployments_page,
 )
-
-# Import from deployer package
-from deployer import deploy_project, delete_project_resources, extract_project_name
-from deployer.aws import (
-    get_lambda_logs,
+from api.db.archive import ArchiveNotConfiguredError
+from api.db.retention import apply_deployment_retention
+from api.events import project_events, status_event
+from api.metrics import deployments_in_flight, registry
+from api.db.common import (
+    InvalidCursorError,
+    SubdomainUnavailableError,
+    DEFAULT_PAGE_SIZE,
+    PROJECT_LIST_ATTRIBUTES,
+    PROJECT_TOMBSTONE_RETENTION_DAYS,
 )
-from deployer.aws.ecr import get_ecr_repo_name
+
+# The deployer package (and through it most of boto3's service models) is
+# imported inside the routes that use it, keeping it off the cold-start path.
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
-AUTUMN_BASE_URL = os.environ.get("AUTUMN_BASE_URL", "https://api.useautumn.com/v1").rstrip("/")
+# Autumn customer lookups: served from cache for the TTL, then served stale
+# while a background refresh runs, so a slow Autumn doesn't slow the panel
+AUTUMN_CUSTOMER_CACHE_TTL_SECONDS = float(os.environ.get("AUTUMN_CUSTOMER_CACHE_TTL_SECONDS", "30"))
+AUTUMN_CUSTOMER_STALE_SECONDS = float(os.environ.get("AUTUMN_CUSTOMER_STALE_SECONDS", "300"))
+
+_autumn_customer_cache = AsyncTTLCache(
+    maxsize=1024,
+    ttl=AUTUMN_CUSTOMER_CACHE_TTL_SECONDS,
+    stale_ttl=AUTUMN_CUSTOMER_STALE_SECONDS,
+    name="Autumn customers",
+)
 
 
-def _fetch_autumn_customer(org_id: str) -> dict:
+async def _fetch_autumn_customer(org_id: str) -> dict:
     autumn_key = os.environ.get("AUTUMN_API_KEY")
     if not autumn_key:
         raise HTTPException(status_code=500, detail="AUTUMN_API_KEY not configured")
 
     url = f"{AUTUMN_BASE_URL}/customers/{org_id}"
     try:
-        resp = httpx.get(
+        resp = await http_clients.autumn().get(
             url,
             headers={"Authorization": f"Bearer {autumn_key}"},
-            timeout=15.0,
         )
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Failed to reach Autumn: {e}")
@@ -61,6 +84,16 @@ def _fetch_autumn_customer(org_id: str) -> dict:
     return data
 
 
+async def get_autumn_customer(org_id: str) -> dict:
+    """Get an Autumn customer through the cache (one upstream call per org at a time)."""
+    return await _autumn_customer_cache.get(org_id, lambda: _fetch_autumn_customer(org_id))
+
+
+def get_autumn_cache_stats() -> dict:
+    """Hit/miss counters and Autumn latency for the customer cache."""
+    return _autumn_customer_cache.stats()
+
+
 class CreateProjectRequest(BaseModel):
     name: str
     organization_id: str
@@ -93,6 +126,67 @@ class ProjectResponse(BaseModel):
 # ─────────────────────────────────────────────────────────────
 
 
+# Build completion arrives as a CodeBuild state-change event (EventBridge ->
+# SQS -> /events). Without that wiring (local development) a background
+# thread polls the build and dispatches the same event itself.
+BUILD_EVENTS_ENABLED = os.environ.get(
+    "BUILD_EVENTS_ENABLED", "true" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "false"
+).lower() in ("1", "true", "yes")
+
+# CodeBuild's terminal build states
+BUILD_TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "FAULT", "STOPPED", "TIMED_OUT")
+
+# How long a rollout owns its deployment. A build event redelivered after
+# the rollout crashed (SQS visibility timeout: 900s) takes over once this
+# has passed; duplicates arriving earlier are ignored.
+ROLLOUT_LEASE_SECONDS = int(os.environ.get("DEPLOY_ROLLOUT_LEASE_SECONDS", "600"))
+
+# Deployment phases: START (phase one running) -> BUILD (build running)
+# -> ROLLOUT (phase two running) -> DONE. Stage outputs are checkpointed on
+# the record, so a deploy that crashed or timed out resumes at its first
+# incomplete stage when its message is redelivered.
+
+
+def _fail_deployment(project_id: str, organization_id: str, deployment: Optional[dict]) -> Optional[dict]:
+    """Mark a deployment (if it was created) and its project FAILED; returns the deployment."""
+    # The project first: if the worker dies in between, the deployment is
+    # still open and a redelivered message finishes the job
+    failed = db.update_project_by_key(
+        organization_id, project_id, {"status": "FAILED"},
+        expected_status=("PENDING", "BUILDING"),
+    )
+    if not failed and deployment:
+        db.update_project_by_key(organization_id, project_id, {})
+    
+    if deployment:
+        deployment = db.update_deployment(project_id, deployment["deploy_id"], {
+            "status": "FAILED",
+            "phase": "DONE",
+            "finished_at": datetime.utcnow().isoformat(),
+        }, sk=deployment["SK"])
+    return deployment
+
+
+def _apply_retention(project_id: str, organization_id: str) -> None:
+    """Archive and expire deployment history outside the retention window."""
+    try:
+        apply_deployment_retention(project_id, organization_id)
+    except ArchiveNotConfiguredError as e:
+        # A deployment setting, not a transient failure: history grows until it's fixed
+        print(f"❌ Deployment retention is disabled: {e}")
+    except Exception as e:
+        print(f"⚠️ Deployment retention failed for {project_id}: {e}")
+
+
+def _checkpointer(deployment: dict):
+    """Stage callback saving each stage's output on the deployment record."""
+    def checkpoint(stage: str, output) -> None:
+        # build_id is set with its checkpoint: build events look it up
+        updates = {"build_id": output} if stage == "start_build" else None
+        db.save_deployment_checkpoint(deployment["project_id"], deployment["SK"], stage, output, updates)
+    return checkpoint
+
+
 def _run_deployment_sync(
     project_id: str,
     github_url: str,
@@ -103,70 +197,281 @@ def _run_deployment_sync(
     memory: int = 1024,
     timeout: int = 30,
     ephemeral_storage: int = 512,
+    organization_id: Optional[str] = None,
+    request_id: Optional[str] = None,
 ):
-    """Synchronous deployment function - runs in thread pool using new deployer."""
-    from datetime import datetime
+    """
+    Phase one of a deployment: prepare infrastructure and start the build.
+    
+    Returns once the build has started. The deployment record keeps what the
+    rollout needs (phase BUILD); `_complete_deployment_sync` picks it up
+    when the build finishes. memory, timeout and ephemeral_storage are read
+    from the project at rollout and kept here for queued-message
+    compatibility.
+    
+    When the same request_id is retried (the message is redelivered after a
+    crash or timeout), the deployment it recorded is resumed: checkpointed
+    stages are skipped, so the build is not started twice.
+    """
+    from deployer import start_deployment
     
-    deployment = None
-    build_id_holder = [None]  # Use list to allow mutation in nested function
+    if not organization_id:
+        # Messages queued before organization_id was included: resolve it once
+        project = db.get_project(project_id)
+        if not project:
+            print(f"❌ Project {project_id} not found, skipping deployment")
+            return
+        organization_id = project["organization_id"]
     
-    def on_build_start(build_id: str):
-        """Callback called when build starts - creates deployment record immediately."""
-        nonlocal deployment
-        build_id_holder[0] = build_id
-        deployment = create_deployment(project_id, build_id)
-        print(f"📝 Deployment record created: {deployment['deploy_id']} (build: {build_id})")
+    deployment = db.get_deployment_by_request_id(project_id, request_id) if request_id else None
+    if deployment and deployment.get("phase") != "START":
+        print(f"⏭️ Deployment {deployment['deploy_id']} already past phase one ({deployment.get('phase')})")
+        if deployment.get("phase") == "BUILD":
+            _complete_if_build_finished(deployment["build_id"])
+        return
     
+    deployments_in_flight.inc()
     try:
-        # Update status to building
-        update_project(project_id, {"status": "BUILDING"})
+        if deployment:
+            print(f"🔁 Resuming deployment {deployment['deploy_id']} (request {request_id})")
+        else:
+            deployment = db.create_deployment(project_id, organization_id=organization_id, request_id=request_id)
+            print(f"📝 Deployment record created: {deployment['deploy_id']}")
+        
+        # Update status to building (allowed from any state, e.g. a redeploy);
+        # this also touches updated_at, so the ETag covers the new deployment
+        db.update_project_by_key(organization_id, project_id, {"status": "BUILDING"})
         
-        # Use the new deploy_project from deployer with callback
         # Pass project_id to ensure unique Lambda function per deployment
-        result = deploy_project(
+        completed = deployment.get("checkpoints") or {}
+        started = start_deployment(
             github_url=github_url,
             github_token=github_token,
             root_directory=root_directory,
             start_command=start_command,
-            env_vars=env_vars,  # Pass env vars to Lambda configuration
-            memory=memory,
-            timeout=timeout,
-            ephemeral_storage=ephemeral_storage,
-            on_build_start=on_build_start,  # Create deployment record immediately
+            env_vars=env_vars,
             project_id=project_id,  # Pass project_id for unique Lambda naming
+            completed=completed,
+            on_stage_complete=_checkpointer(deployment),
         )
         
-        function_url = result["function_url"]
-        function_name = result.get("function_name")  # Get the actual Lambda function name
+        # Everything the rollout needs lives on the deployment record
+        db.update_deployment(project_id, deployment["deploy_id"], {
+            "phase": "BUILD",
+            "function_name": started["function_name"],
+            "image_uri": started["image_uri"],
+            "role_arn": started["role_arn"],
+        }, sk=deployment["SK"], expected_phase="START")
+        print(f"⏳ Build {started['build_id']} running, rollout resumes on completion")
+    
+    except Exception as e:
+        _fail_deployment(project_id, organization_id, deployment)
+        print(f"❌ Deployment failed: {e}")
+        import traceback
+        traceback.print_exc()
+        _apply_retention(project_id, organization_id)
+        return
+    finally:
+        deployments_in_flight.dec()
+    
+    if "start_build" in completed:
+        # Started on an earlier attempt: the build may be done already, and
+        # its event may have been given up on while phase one was unfinished
+        _complete_if_build_finished(started["build_id"])
+    elif not BUILD_EVENTS_ENABLED:
+        threading.Thread(
+            target=_wait_and_complete_build, args=(started["build_id"],), daemon=True
+        ).start()
+
+
+def _complete_if_build_finished(build_id: str) -> None:
+    """Run phase two now if the build has already finished."""
+    from deployer.aws import get_build_status
+    
+    build_status = get_build_status(build_id)["status"]
+    if build_status in BUILD_TERMINAL_STATUSES:
+        _complete_deployment_sync(build_id, build_status)
+    elif not BUILD_EVENTS_ENABLED:
+        threading.Thread(target=_wait_and_complete_build, args=(build_id,), daemon=True).start()
+
+
+def _complete_deployment_sync(build_id: str, build_status: str) -> Optional[dict]:
+    """
+    Phase two of a deployment: handle a finished build.
+    
+    On SUCCEEDED the image is rolled out to Lambda and the project goes
+    LIVE; any other terminal status fails the deployment. The deployment is
+    claimed with a conditional write (phase BUILD, or ROLLOUT whose lease has
+    expired), so a duplicate event is a no-op while a redelivered one
+    resumes a rollout that crashed, skipping its checkpointed stages.
+    
+    Returns:
+        The updated deployment, or None if the event was a duplicate
+        
+    Raises:
+        LookupError: If no deployment is waiting on the build (yet); the
+            event is retried
+    """
+    from deployer import finish_deployment
+    
+    deployment = db.get_deployment_by_build_id(build_id)
+    if not deployment or (deployment["status"] == "IN_PROGRESS" and deployment.get("phase") == "START"):
+        # The event can beat phase one's final write; SQS redelivers it
+        raise LookupError(f"No deployment waiting on build {build_id}")
+    
+    project_id = deployment["project_id"]
+    organization_id = deployment["organization_id"]
+    claimed = db.update_deployment(
+        project_id, deployment["deploy_id"], {"phase": "ROLLOUT"},
+        sk=deployment["SK"], expected_phase=("BUILD", "ROLLOUT"),
+        lease_seconds=ROLLOUT_LEASE_SECONDS,
+    )
+    if not claimed:
+        print(f"⏭️ Build {build_id} already handled ({deployment.get('phase') or deployment['status']})")
+        return None
+    if deployment.get("phase") == "ROLLOUT":
+        print(f"🔁 Resuming rollout of deployment {claimed['deploy_id']}")
+    
+    deployments_in_flight.inc()
+    try:
+        if build_status != "SUCCEEDED":
+            raise Exception(f"Build {build_status.lower()}")
+        print("✅ Build completed")
+        checkpoint = _checkpointer(claimed)
+        if "build" not in claimed["checkpoints"]:
+            checkpoint("build", build_status)
         
-        # Update deployment as successful
-        if deployment:
-            update_deployment(project_id, deployment["deploy_id"], {
-                "status": "SUCCEEDED",
-                "finished_at": datetime.utcnow().isoformat(),
-            })
+        project = db.get_project(project_id, include_config=True)
+        if not project:
+            raise Exception(f"Project {project_id} no longer exists")
+        
+        function_url = finish_deployment(
+            function_name=claimed["function_name"],
+            image_uri=claimed["image_uri"],
+            role_arn=claimed["role_arn"],
+            env_vars=project.get("env_vars"),
+            memory=project.get("memory"),
+            timeout=project.get("timeout"),
+            ephemeral_storage=project.get("ephemeral_storage"),
+            completed=claimed["checkpoints"],
+            on_stage_complete=checkpoint,
+        )
         
-        # Update project as complete, including the function_name for usage tracking
-        update_project(project_id, {
+        # Update project as complete, including the function_name for usage tracking.
+        # Only BUILDING -> LIVE is valid; the condition is checked in the same write.
+        # The deployment is closed last, so a crash in between is resumed.
+        live = db.update_project_by_key(organization_id, project_id, {
             "status": "LIVE",
             "function_url": function_url,
-            "function_name": function_name,  # Store for usage aggregation
-        })
+            "function_name": claimed["function_name"],  # Store for usage aggregation
+        }, expected_status="BUILDING")
+        if not live:
+            print(f"⚠️ Project {project_id} was not BUILDING, LIVE transition skipped")
+            db.update_project_by_key(organization_id, project_id, {})
+        
+        deployment = db.update_deployment(project_id, claimed["deploy_id"], {
+            "status": "SUCCEEDED",
+            "phase": "DONE",
+            "finished_at": datetime.utcnow().isoformat(),
+        }, sk=claimed["SK"])
         
         print(f"✅ Deployment complete: {function_url}")
         
     except Exception as e:
-        # Update deployment as failed if it was created
-        if deployment:
-            update_deployment(project_id, deployment["deploy_id"], {
-                "status": "FAILED",
-                "finished_at": datetime.utcnow().isoformat(),
-            })
-        
-        update_project(project_id, {"status": "FAILED"})
+        deployment = _fail_deployment(project_id, organization_id, claimed)
         print(f"❌ Deployment failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        deployments_in_flight.dec()
+    
+    _apply_retention(project_id, organization_id)
+    return deployment
+
+
+def build_state_change_event(build_id: str, build_status: str) -> dict:
+    """A CodeBuild "Build State Change" event, as EventBridge delivers it."""
+    from deployer.config import CODEBUILD_PROJECT_NAME
+
+    return {
+        "source": "aws.codebuild",
+        "detail-type": "CodeBuild Build State Change",
+        "detail": {
+            "build-status": build_status,
+            "project-name": CODEBUILD_PROJECT_NAME,
+            "build-id": f"arn:aws:codebuild:local:000000000000:build/{build_id}",
+        },
+    }
+
+
+def handle_codebuild_event(event: dict) -> Optional[dict]:
+    """
+    Resume the deployment a CodeBuild state-change event belongs to.
+    
+    Non-terminal states are ignored. Raises if the deployment isn't ready
+    for the event yet, so the message is retried.
+    """
+    detail = event.get("detail", {})
+    build_status = detail.get("build-status")
+    # build-id is the build ARN; the deployment stores "project:uuid"
+    build_id = detail.get("build-id", "").split(":build/")[-1]
+    if build_status not in BUILD_TERMINAL_STATUSES or not build_id:
+        print(f"⏭️ Ignoring build event {build_id or '?'} ({build_status})")
+        return None
+    print(f"🔔 Build {build_id} finished: {build_status}")
+    return _complete_deployment_sync(build_id, build_status)
+
+
+def _wait_and_complete_build(build_id: str) -> None:
+    """Local stand-in for the build event: poll the build, then dispatch it."""
+    from deployer.aws import wait_for_build
+    
+    try:
+        succeeded = wait_for_build(build_id)
+    except Exception as e:
+        print(f"❌ Waiting for build {build_id} failed: {e}")
+        succeeded = False
+    handle_codebuild_event(build_state_change_event(build_id, "SUCCEEDED" if succeeded else "FAILED"))
+
+
+@lru_cache()
+def _get_sqs_client():
+    """SQS client for the deploy queue (created on first deploy, then reused)."""
+    import boto3
+
+    return boto3.client("sqs")
+
+
+# Deploy queue depth is read from SQS at most this often (on metrics export)
+DEPLOY_QUEUE_DEPTH_TTL_SECONDS = 15.0
+_deploy_queue_depth_cache = TTLCache(maxsize=1, ttl=DEPLOY_QUEUE_DEPTH_TTL_SECONDS)
+
+
+def _deploy_queue_depth() -> dict:
+    """Approximate deploy queue depth from SQS: {(state,): messages}."""
+    queue_url = os.environ.get("DEPLOY_QUEUE_URL")
+    if not queue_url:
+        return {}
+    depth = _deploy_queue_depth_cache.get(queue_url)
+    if depth is None:
+        attributes = _get_sqs_client().get_queue_attributes(
+            QueueUrl=queue_url,
+            AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+        )["Attributes"]
+        depth = {
+            ("queued",): int(attributes["ApproximateNumberOfMessages"]),
+            ("in_flight",): int(attributes["ApproximateNumberOfMessagesNotVisible"]),
+        }
+        _deploy_queue_depth_cache.set(queue_url, depth)
+    return depth
+
+
+registry.gauge(
+    "deploy_queue_messages",
+    "Approximate deploy queue depth (queued, or received and in flight).",
+    ("state",),
+    callback=_deploy_queue_depth,
+)
 
 
 def send_deployment_to_sqs(
@@ -179,6 +484,7 @@ def send_deployment_to_sqs(
     memory: int = 1024,
     timeout: int = 30,
     ephemeral_storage: int = 512,
+    organization_id: Optional[str] = None,
 ):
     """
     Send deployment task to SQS queue for background processing.
@@ -190,26 +496,31 @@ def send_deployment_to_sqs(
     - No risk of recursive invocation loops
     """
     import time
+    import uuid
+    
+    # Identifies this deploy request across retries, so a redelivered
+    # message resumes the deployment it started instead of starting over
+    request_id = uuid.uuid4().hex
     
     # Check if running on Lambda
     if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
         # Running locally - use thread pool fallback
         def run_in_thread():
-            _run_deployment_sync(project_id, github_url, github_token, root_directory, start_command, env_vars, memory, timeout, ephemeral_storage)
+            _run_deployment_sync(project_id, github_url, github_token, root_directory, start_command, env_vars, memory, timeout, ephemeral_storage, organization_id, request_id)
         thread = threading.Thread(target=run_in_thread)
         thread.start()
         print(f"📤 Local: Deployment started in background thread for project {project_id}")
         return
     
     # Running on Lambda - send message to SQS queue
-    sqs_client = boto3.client("sqs")
+    sqs_client = _get_sqs_client()
     
     # Get queue URL from environment
     queue_url = os.environ.get("DEPLOY_QUEUE_URL")
     if not queue_url:
         print("⚠️ DEPLOY_QUEUE_URL not set, falling back to thread-based execution")
         def run_in_thread():
-            _run_deployment_sync(project_id, github_url, github_token, root_directory, start_command, env_vars, memory, timeout, ephemeral_storage)
+            _run_deployment_sync(project_id, github_url, github_token, root_directory, start_command, env_vars, memory, timeout, ephemeral_storage, organization_id, request_id)
         thread = threading.Thread(target=run_in_thread)
         thread.start()
         return
@@ -224,6 +535,8 @@ def send_deployment_to_sqs(
         "memory": memory,
         "timeout": timeout,
         "ephemeral_storage": ephemeral_storage,
+        "organization_id": organization_id,
+        "request_id": request_id,
     }
     
     response = sqs_client.send_message(
@@ -238,6 +551,45 @@ def send_deployment_to_sqs(
 
 
 
+# ─────────────────────────────────────────────────────────────
+# CONDITIONAL REQUESTS
+# ─────────────────────────────────────────────────────────────
+
+# Part of every ETag; bump when a response shape changes so clients refetch
+ETAG_SCHEMA_VERSION = 1
+
+
+def _etag(*parts) -> str:
+    """Strong ETag over the values a response is derived from."""
+    digest = hashlib.sha256(
+        "|".join(str(p) for p in (ETAG_SCHEMA_VERSION, *parts)).encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header matches an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: ignore W/ prefixes
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in tags
+
+
+def _not_modified(etag: str) -> Response:
+    """304 response carrying the validator."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def _set_validator(response: Response, etag: str) -> None:
+    """Attach an ETag and make clients revalidate before reusing the response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
 # ─────────────────────────────────────────────────────────────
 # API ENDPOINTS
 # ─────────────────────────────────────────────────────────────
@@ -277,23 +629,27 @@ async def create_new_project(
     timeout = request.timeout or 30
     ephemeral_storage = request.ephemeral_storage or 512
     
-    # Create project in DynamoDB
-    project = create_project(
-        user_id=user_id,
-        organization_id=request.organization_id,
-        name=request.name,
-        github_url=github_url,
-        github_repo=request.github_repo,
-        env_vars=request.env_vars,
-        root_directory=root_directory,
-        start_command=request.start_command,
-        memory=memory,
-        timeout=timeout,
-        ephemeral_storage=ephemeral_storage,
-    )
+    # Create project (claims its subdomain in the same write)
+    try:
+        project = await create_project(
+            user_id=user_id,
+            organization_id=request.organization_id,
+            name=request.name,
+            github_url=github_url,
+            github_repo=request.github_repo,
+            env_vars=request.env_vars,
+            root_directory=root_directory,
+            start_command=request.start_command,
+            memory=memory,
+            timeout=timeout,
+            ephemeral_storage=ephemeral_storage,
+        )
+    except SubdomainUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
     # Start deployment via SQS queue (industry-standard background task pattern)
-    send_deployment_to_sqs(
+    await run_sync(
+        send_deployment_to_sqs,
         project["project_id"],
         github_url,
         github_token,
@@ -303,6 +659,7 @@ async def create_new_project(
         memory,
         timeout,
         ephemeral_storage,
+        organization_id=request.organization_id,
     )
     
     return {
@@ -316,29 +673,108 @@ async def create_new_project(
     }
 
 
+# Delta sync re-reads this much history before `since`: the updated-at
+# index is eventually consistent and writers stamp updated_at before writing
+DELTA_SYNC_OVERLAP_SECONDS = 5
+
+
+def _project_summary(p: dict) -> dict:
+    """Project fields returned by the listing endpoint."""
+    return {
+        "project_id": p["project_id"],
+        "organization_id": p.get("organization_id"),
+        "name": p["name"],
+        "github_url": p["github_url"],
+        "github_repo": p["github_repo"],
+        "status": p["status"],
+        "function_url": p.get("function_url"),
+        "subdomain": p.get("subdomain"),
+        "custom_url": p.get("custom_url"),
+        "created_at": p["created_at"],
+        "updated_at": p["updated_at"],
+    }
+
+
+def _parse_since(since: str) -> datetime:
+    """Parse a delta sync timestamp as naive UTC (the format of updated_at)."""
+    try:
+        parsed = datetime.fromisoformat(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
 @router.get("")
 async def get_projects(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),  # For auth
     org_id: str = Query(...),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    since: Optional[str] = Query(None),
 ):
-    """List all projects for the organization."""
-    projects = list_projects(org_id)
-    return [
-        {
-            "project_id": p["project_id"],
-            "organization_id": p.get("organization_id"),
-            "name": p["name"],
-            "github_url": p["github_url"],
-            "github_repo": p["github_repo"],
-            "status": p["status"],
-            "function_url": p.get("function_url"),
-            "subdomain": p.get("subdomain"),
-            "custom_url": p.get("custom_url"),
-            "created_at": p["created_at"],
-            "updated_at": p["updated_at"],
+    """
+    List projects for the organization.
+
+    Without `limit`/`cursor` the full list is returned. With them, one page is
+    returned and the cursor for the next page is sent in `X-Next-Cursor`.
+
+    With `since` (an ISO timestamp, normally the `synced_at` of the previous
+    sync) only the changes are returned, as
+    `{"projects": [...], "deleted": [...], "synced_at": ...}`: projects
+    updated after `since` and tombstones of projects deleted after it.
+    Clients that last synced before the tombstone retention window get 410
+    and must refetch the full list.
+
+    The ETag is derived from the org's project version (a digest of its
+    projects' and tombstones' updated_at), which changes on every project
+    write, so `If-None-Match` is answered with 304 after a strongly
+    consistent read of those two attributes, without listing any projects.
+    """
+    # Read the version before the listing: a write in between only makes the
+    # ETag older than the body, which costs a refetch
+    if since is not None and (limit is not None or cursor is not None):
+        raise HTTPException(status_code=400, detail="since cannot be combined with limit or cursor")
+
+    version = await get_org_version(org_id)
+    etag = _etag("projects", org_id, version, limit, cursor, since)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    if since is not None:
+        since_at = _parse_since(since)
+        if since_at < datetime.utcnow() - timedelta(days=PROJECT_TOMBSTONE_RETENTION_DAYS):
+            raise HTTPException(status_code=410, detail="since is older than the sync window; refetch the full list")
+        # Taken before the query, so changes racing it are picked up next time
+        synced_at = datetime.utcnow().isoformat()
+        projects, tombstones = await list_projects_changed_since(
+            org_id,
+            (since_at - timedelta(seconds=DELTA_SYNC_OVERLAP_SECONDS)).isoformat(),
+            attributes=PROJECT_LIST_ATTRIBUTES,
+        )
+        _set_validator(response, etag)
+        return {
+            "projects": [_project_summary(p) for p in projects],
+            "deleted": tombstones,
+            "synced_at": synced_at,
         }
-        for p in projects
-    ]
+
+    _set_validator(response, etag)
+    if limit is None and cursor is None:
+        projects = await list_projects(org_id, attributes=PROJECT_LIST_ATTRIBUTES)
+    else:
+        try:
+            projects, next_cursor = await list_projects_page(
+                org_id, limit or DEFAULT_PAGE_SIZE, cursor, attributes=PROJECT_LIST_ATTRIBUTES
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    return [_project_summary(p) for p in projects]
 
 
 @router.get("/usage")
@@ -355,7 +791,7 @@ async def get_org_usage_endpoint(
     For Pro users (credit system): returns dollar-based credit usage with breakdown.
     For Hobby users (raw features): returns raw invocation/compute counts.
     """
-    customer = _fetch_autumn_customer(org_id)
+    customer = await get_autumn_customer(org_id)
     features = customer.get("features") or {}
 
     inv = features.get("invocations") or {}
@@ -500,18 +936,66 @@ async def get_org_usage_endpoint(
 @router.get("/{project_id}")
 async def get_project_details(
     project_id: str,
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     org_id: str = Query(...),
+    deployments_limit: int = Query(20, ge=1, le=100),
+    deployments_cursor: Optional[str] = Query(None),
 ):
-    """Get project details with deployment history."""
+    """
+    Get project details with the most recent page of deployment history.
 
-    project = get_project_by_key(org_id, project_id)
-    
+    Older deployments are fetched by passing `deployments_next_cursor` back
+    as `deployments_cursor`.
+
+    The ETag is derived from the project's updated_at, which every project
+    write advances, and from the deployments on the returned page, whose
+    writes (build_id checkpoints, completion) leave updated_at alone. With
+    `If-None-Match`, only updated_at and the deployment page are read to
+    validate; the project's config is read only when the response is
+    actually sent.
+    """
+
+    conditional = bool(request.headers.get("if-none-match"))
+    if conditional:
+        project = await get_project_by_key(org_id, project_id, attributes=("updated_at",))
+    else:
+        project = await get_project_by_key(org_id, project_id, include_config=True)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    deployments = list_deployments(project_id)
-    
+
+    try:
+        deployments, deployments_next_cursor = await list_deployments_page(
+            project_id, deployments_limit, deployments_cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    deployments = [
+        {
+            "deploy_id": d["deploy_id"],
+            "build_id": d.get("build_id"),
+            "status": d["status"],
+            "started_at": d["started_at"],
+            "finished_at": d.get("finished_at"),
+        }
+        for d in deployments
+    ]
+
+    etag = _etag("project", org_id, project_id, project["updated_at"], deployments_limit, deployments_cursor, deployments)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    if conditional:
+        # Validated on updated_at only: read the whole project to send it
+        project = await get_project_by_key(org_id, project_id, include_config=True)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        etag = _etag(
+            "project", org_id, project_id, project["updated_at"], deployments_limit, deployments_cursor, deployments,
+        )
+    _set_validator(response, etag)
+
     return {
         "project": {
             "project_id": project["project_id"],
@@ -533,16 +1017,8 @@ async def get_project_details(
             "created_at": project["created_at"],
             "updated_at": project["updated_at"],
         },
-        "deployments": [
-            {
-                "deploy_id": d["deploy_id"],
-                "build_id": d["build_id"],
-                "status": d["status"],
-                "started_at": d["started_at"],
-                "finished_at": d.get("finished_at"),
-            }
-            for d in deployments
-        ],
+        "deployments": deployments,
+        "deployments_next_cursor": deployments_next_cursor,
     }
 
 
@@ -553,7 +1029,8 @@ async def get_project_status(
     org_id: str = Query(...),
 ):
     """Get current project status (for polling)."""
-    project = get_project(project_id)
+    # Polled by the dashboard: a few seconds of staleness is fine here
+    project = await get_project(project_id, cached=True)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -569,6 +1046,54 @@ async def get_project_status(
     }
 
 
+# Seconds between SSE keep-alive comments on an idle status stream
+PROJECT_EVENTS_KEEPALIVE_SECONDS = 15
+
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: str,
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    org_id: str = Query(...),
+):
+    """
+    Server-Sent Events stream of project status transitions.
+
+    Sends the current status first, then one `status` event per transition
+    (PENDING -> BUILDING -> LIVE/FAILED). Replaces polling /status.
+    """
+    # Strongly consistent: the hub only sends transitions away from the status
+    # its viewers already have, so a stale snapshot would never be corrected
+    project = await get_project_by_key(org_id, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    async def event_generator():
+        """Generate SSE events from the project's event hub subscription."""
+        queue = project_events.subscribe(project_id, current=project)
+        try:
+            yield f"event: status\ndata: {json.dumps(status_event(project))}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), PROJECT_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get("deleted"):
+                    yield f"event: deleted\ndata: {json.dumps(event)}\n\n"
+                    break
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            project_events.unsubscribe(project_id, queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{project_id}/runtime")
 async def get_runtime_logs(
     project_id: str,
@@ -576,7 +1101,7 @@ async def get_runtime_logs(
     org_id: str = Query(...),
 ):
     """Fetch runtime logs for a project's Lambda function."""
-    project = get_project(project_id)
+    project = await get_project(project_id, cached=True)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -585,6 +1110,9 @@ async def get_runtime_logs(
     if project.get("organization_id") != org_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    from deployer import extract_project_name
+    from deployer.aws.cloudwatch import get_lambda_logs
+
     # Use stored function_name if available (new deployments), otherwise derive from github_url (old deployments)
     project_name = project.get("function_name")
     print(f"🔍 RUNTIME LOGS: project_id={project_id}")
@@ -593,7 +1121,7 @@ async def get_runtime_logs(
     if not project_name:
         project_name = extract_project_name(project["github_url"])
         print(f"🔍 RUNTIME LOGS: derived project_name = '{project_name}'")
-    logs = get_lambda_logs(project_name)
+    logs = await run_sync(get_lambda_logs, project_name)
     print(f"🔍 RUNTIME LOGS: got {len(logs)} log entries")
 
     return {
@@ -614,12 +1142,12 @@ async def update_project_env_vars(
     org_id: str = Query(...),
 ):
     """Update project environment variables."""
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    updated = update_project(project_id, {"env_vars": request.env_vars})
+    updated = await update_project_by_key(org_id, project_id, {"env_vars": request.env_vars})
     
     return {
         "project_id": project_id,
@@ -646,7 +1174,7 @@ async def update_project_fields(
 ):
     """Update project fields like start_command, root_directory, name."""
 
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -669,7 +1197,7 @@ async def update_project_fields(
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    updated = update_project(project_id, updates)
+    updated = await update_project_by_key(org_id, project_id, updates)
     
     return {
         "project_id": project_id,
@@ -689,7 +1217,7 @@ async def redeploy_project(
 
     # Use get_project_by_key for strong consistency to ensure we get the latest
     # compute settings (memory, timeout) if they were just updated.
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id, include_config=True)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -707,7 +1235,8 @@ async def redeploy_project(
     ephemeral_storage = int(project.get("ephemeral_storage", 512))
     
     # Start redeployment via SQS queue
-    send_deployment_to_sqs(
+    await run_sync(
+        send_deployment_to_sqs,
         project_id,
         project["github_url"],
         github_token,
@@ -717,6 +1246,7 @@ async def redeploy_project(
         memory,
         timeout,
         ephemeral_storage,
+        organization_id=org_id,
     )
     
     return {
@@ -734,7 +1264,7 @@ async def delete_project_endpoint(
 ):
     """Delete a project and all associated AWS resources."""
 
-    project = get_project_by_key(org_id, project_id)
+    project = await get_project_by_key(org_id, project_id)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -747,10 +1277,11 @@ async def delete_project_endpoint(
     print(f"🗑️ DELETE PROJECT: github_url = '{project.get('github_url')}'")
 
     # Delete AWS resources (Lambda, ECR, and CloudWatch log group)
-    result = delete_project_resources(project["github_url"], function_name=function_name)
+    from deployer import delete_project_resources
+    result = await run_sync(delete_project_resources, project["github_url"], function_name=function_name)
     
     # Delete from DynamoDB (includes deployments)
-    delete_project(project_id)
+    await delete_project(project_id)
     
     return {
         "deleted": True,
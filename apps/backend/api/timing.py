@@ -0,0 +1,268 @@
+"""
+Per-request timing of the API's dependencies (DynamoDB, AWS, GitHub, ...).
+
+For a sampled request, every outbound call made on its behalf is recorded
+(count and total duration per dependency) and reported two ways:
+
+- a `Server-Timing` response header, shown in the browser's network panel:
+  `dynamodb;dur=12.4;desc="3 calls", github;dur=88.0;desc="1 call", app;dur=120.1`
+- one structured JSON log line with the per-operation breakdown
+
+Calls are recorded by botocore event hooks (every boto3 client created from
+the default session) and httpx event hooks (the pooled clients in
+api.http_clients); in-process work such as JWT verification uses `span()`.
+The recorder lives in a contextvar, which run_sync and FastAPI's threadpool
+copy into worker threads, so offloaded calls are attributed to the request.
+
+Every call is also counted in api.metrics (calls, errors and latency per
+dependency); unsampled requests skip only the per-request recorder.
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from api.metrics import observe_dependency
+
+# Fraction of requests that are timed and reported (0 disables, 1 times all)
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", "0.1"))
+
+# Server-Timing metric names for AWS services; others are reported as aws-<service>
+_AWS_DEPENDENCY_NAMES = {
+    "dynamodb": "dynamodb",
+    "logs": "cloudwatch",
+}
+
+
+class RequestTimings:
+    """Call counts and durations per (dependency, operation) for one request."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._calls: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, dependency: str, operation: str, seconds: float) -> None:
+        """Add one call (offloaded calls may record from several threads)."""
+        with self._lock:
+            entry = self._calls.get((dependency, operation))
+            if entry is None:
+                self._calls[(dependency, operation)] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def by_dependency(self) -> Dict[str, list]:
+        """Totals per dependency: {dependency: [count, seconds]}."""
+        totals: Dict[str, list] = {}
+        with self._lock:
+            for (dependency, _), (count, seconds) in self._calls.items():
+                total = totals.setdefault(dependency, [0, 0.0])
+                total[0] += count
+                total[1] += seconds
+        return totals
+
+    def by_operation(self) -> Dict[str, dict]:
+        """Totals per `dependency.operation`, for the log line."""
+        with self._lock:
+            return {
+                f"{dependency}.{operation}": {"count": count, "ms": round(seconds * 1000, 1)}
+                for (dependency, operation), (count, seconds) in self._calls.items()
+            }
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Render the Server-Timing header value."""
+        metrics = []
+        for dependency, (count, seconds) in sorted(self.by_dependency().items()):
+            calls = "call" if count == 1 else "calls"
+            metrics.append(f'{dependency};dur={seconds * 1000:.1f};desc="{count} {calls}"')
+        metrics.append(f"app;dur={total_seconds * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """The recorder for the current request, or None if it isn't sampled."""
+    return _current.get()
+
+
+def record(dependency: str, operation: str, seconds: float) -> None:
+    """Record a call against the current request, if it is being timed."""
+    timings = _current.get()
+    if timings is not None:
+        timings.record(dependency, operation, seconds)
+
+
+@contextmanager
+def span(dependency: str, operation: str = "call"):
+    """Time a block of in-process work (e.g. token verification)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(dependency, operation, time.perf_counter() - start)
+
+
+@contextmanager
+def recording():
+    """Record every call made in a block outside a request (scripts, benchmarks)."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+# ─────────────────────────────────────────────────────────────
+# BOTOCORE HOOKS
+# ─────────────────────────────────────────────────────────────
+
+_CONTEXT_START_KEY = "shorlabs_timing_start"
+
+
+def _before_aws_call(model, context, **kwargs) -> None:
+    """botocore `before-call`: stamp the call's start and name on the request context."""
+    service = model.service_model.service_name
+    context[_CONTEXT_START_KEY] = (
+        time.perf_counter(),
+        _AWS_DEPENDENCY_NAMES.get(service, f"aws-{service}"),
+        model.name,
+    )
+
+
+def _after_aws_call(context, http_response=None, exception=None, **kwargs) -> None:
+    """botocore `after-call` / `after-call-error` (which gets no model): record the call."""
+    started = context.pop(_CONTEXT_START_KEY, None)
+    if started is None:
+        return
+    start, dependency, operation = started
+    seconds = time.perf_counter() - start
+    error = exception is not None or (http_response is not None and http_response.status_code >= 400)
+    observe_dependency(dependency, seconds, error)
+    record(dependency, operation, seconds)
+
+
+def install_botocore_hooks() -> None:
+    """
+    Time every AWS call made through boto3's default session.
+
+    Clients copy the session's event handlers when they are created, so this
+    must run before the first client is built (clients here are created lazily
+    on first use). Retries are included in the recorded duration.
+    """
+    import boto3
+
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    events = boto3.DEFAULT_SESSION.events
+    events.register("before-call", _before_aws_call, unique_id="shorlabs-timing-before")
+    events.register("after-call", _after_aws_call, unique_id="shorlabs-timing-after")
+    events.register("after-call-error", _after_aws_call, unique_id="shorlabs-timing-error")
+
+
+# ─────────────────────────────────────────────────────────────
+# HTTPX HOOKS
+# ─────────────────────────────────────────────────────────────
+
+_EXTENSION_START_KEY = "shorlabs_timing_start"
+
+
+def _stamp_request(request) -> None:
+    """Stamp the start time on an outgoing request."""
+    request.extensions[_EXTENSION_START_KEY] = time.perf_counter()
+
+
+def _record_response(service: str, response) -> None:
+    """Record a call, measured to the response headers (bodies here are small)."""
+    start = response.request.extensions.get(_EXTENSION_START_KEY)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    observe_dependency(service, seconds, response.status_code >= 400)
+    record(service, response.request.method, seconds)
+
+
+def async_event_hooks(service: str) -> dict:
+    """httpx `event_hooks` timing an AsyncClient's calls as `service`."""
+    async def on_request(request):
+        _stamp_request(request)
+
+    async def on_response(response):
+        _record_response(service, response)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def sync_event_hooks(service: str) -> dict:
+    """httpx `event_hooks` timing a Client's calls as `service`."""
+    def on_request(request):
+        _stamp_request(request)
+
+    def on_response(response):
+        _record_response(service, response)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+# ─────────────────────────────────────────────────────────────
+# MIDDLEWARE
+# ─────────────────────────────────────────────────────────────
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that times a sample of HTTP requests.
+
+    The header is added when the response starts, so calls made while a
+    streaming response is being sent only appear in the log line.
+    """
+
+    def __init__(self, app, sample_rate: float = SERVER_TIMING_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = 500
+
+        async def send_with_header(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - timings.started_at
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(total).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            print(json.dumps({
+                "event": "request_timing",
+                "method": scope["method"],
+                "route": getattr(route, "path", scope["path"]),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - timings.started_at) * 1000, 1),
+                "dependencies": timings.by_operation(),
+            }))
@@ -13,12 +13,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 import boto3
-import httpx
 from boto3.dynamodb.conditions import Key
 
-from api.db.dynamodb import (
-    get_or_create_table,
-)
+from api.db.storage import list_all_projects
+from api.http_clients import AUTUMN_BASE_URL, get_sync_client
 from deployer import extract_project_name
 from deployer.aws.lambda_service import get_lambda_function_name
 
@@ -26,9 +24,6 @@ from deployer.aws.lambda_service import get_lambda_function_name
 # CloudWatch client
 cloudwatch = boto3.client("cloudwatch")
 
-AUTUMN_BASE_URL = os.environ.get("AUTUMN_BASE_URL", "https://api.useautumn.com/v1").rstrip("/")
-
-
 def _get_aggregation_window_seconds() -> int:
     """
     Aggregation window size.
@@ -84,11 +79,10 @@ def _autumn_track_usage(
         payload["idempotency_key"] = idempotency_key
 
     try:
-        resp = httpx.post(
+        resp = get_sync_client("autumn").post(
             url,
             headers={"Authorization": f"Bearer {autumn_key}"},
             json=payload,
-            timeout=15.0,
         )
         if resp.status_code == 409:
             # Duplicate idempotency key / already recorded – safe to ignore.
@@ -216,19 +210,8 @@ def get_gb_seconds(
 
 
 def get_all_projects() -> List[Dict]:
-    """Get all projects from DynamoDB."""
-    table = get_or_create_table()
-    
-    # Scan for all project items
-    # In production with many users, use pagination
-    response = table.scan(
-        FilterExpression="begins_with(SK, :sk_prefix)",
-        ExpressionAttributeValues={
-            ":sk_prefix": "PROJECT#",
-        },
-    )
-    
-    return response.get("Items", [])
+    """Get all projects from storage, with compute settings (memory)."""
+    return list_all_projects(include_config=True)
 
 
 def aggregate_usage_metrics():
@@ -14,11 +14,25 @@ Usage:
     )
 """
 
-from .orchestrator import deploy_project, delete_project_resources
-from .utils import extract_project_name
+import importlib
 
-__all__ = [
-    "deploy_project",
-    "delete_project_resources",
-    "extract_project_name",
-]
+# Exports are imported on first access (PEP 562): importing a submodule such
+# as deployer.utils.frameworks must not pull in the orchestrator and boto3,
+# which would slow the API's cold start.
+_EXPORTS = {
+    "deploy_project": ".orchestrator",
+    "start_deployment": ".orchestrator",
+    "finish_deployment": ".orchestrator",
+    "delete_project_resources": ".orchestrator",
+    "extract_project_name": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -4,28 +4,40 @@ AWS Services Module
 AWS service operations for deployment.
 """
 
-from .ecr import create_ecr_repository, delete_ecr_repository
-from .iam import get_or_create_codebuild_role, get_or_create_lambda_role
-from .codebuild import create_or_update_codebuild_project, start_build, wait_for_build
-from .lambda_service import create_or_update_lambda, delete_lambda
-from .cloudwatch import get_build_logs, get_lambda_logs, delete_lambda_logs
+import importlib
 
-__all__ = [
+# Exports are imported on first access (PEP 562), so importing one service
+# module (e.g. deployer.aws.cloudwatch) doesn't load all of them.
+_EXPORTS = {
     # ECR
-    "create_ecr_repository",
-    "delete_ecr_repository",
+    "create_ecr_repository": ".ecr",
+    "delete_ecr_repository": ".ecr",
+    "get_image_digest": ".ecr",
     # IAM
-    "get_or_create_codebuild_role",
-    "get_or_create_lambda_role",
+    "get_or_create_codebuild_role": ".iam",
+    "get_or_create_lambda_role": ".iam",
     # CodeBuild
-    "create_or_update_codebuild_project",
-    "start_build",
-    "wait_for_build",
+    "create_or_update_codebuild_project": ".codebuild",
+    "start_build": ".codebuild",
+    "wait_for_build": ".codebuild",
+    "get_build_status": ".codebuild",
     # Lambda
-    "create_or_update_lambda",
-    "delete_lambda",
+    "create_or_update_lambda": ".lambda_service",
+    "update_lambda_function": ".lambda_service",
+    "get_or_create_function_url": ".lambda_service",
+    "delete_lambda": ".lambda_service",
     # CloudWatch Logs
-    "get_build_logs",
-    "get_lambda_logs",
-    "delete_lambda_logs",
-]
+    "get_build_logs": ".cloudwatch",
+    "get_lambda_logs": ".cloudwatch",
+    "delete_lambda_logs": ".cloudwatch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
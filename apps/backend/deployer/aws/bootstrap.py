@@ -0,0 +1,111 @@
+"""
+Bootstrap Caching
+
+The shared infrastructure every deploy relies on (IAM roles, the CodeBuild
+project) rarely changes, so it is verified once per process and reused for a
+TTL instead of being re-checked on every deploy. Entries are also keyed by
+BOOTSTRAP_VERSION, which changes whenever the desired configuration does.
+
+IAM changes take a few seconds to propagate. Instead of a fixed sleep after
+creating a role, callers retry the first call that uses it with backoff.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+from ..config import CODEBUILD_PROJECT_NAME, CODEBUILD_ROLE_NAME, LAMBDA_ROLE_NAME
+
+T = TypeVar("T")
+
+# How long verified infrastructure is trusted before it is checked again
+BOOTSTRAP_CACHE_TTL_SECONDS = float(os.environ.get("BOOTSTRAP_CACHE_TTL_SECONDS", "3600"))
+
+# Longest wait for a freshly created IAM role to become usable
+IAM_PROPAGATION_TIMEOUT_SECONDS = 60.0
+
+
+def config_version(*parts) -> str:
+    """Short fingerprint of a desired configuration."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:12]
+
+
+# Changes whenever the names of the shared resources do; modules add the
+# rest of their desired configuration to their own cache keys
+BOOTSTRAP_VERSION = config_version(CODEBUILD_PROJECT_NAME, CODEBUILD_ROLE_NAME, LAMBDA_ROLE_NAME)
+
+_cache: dict = {}
+_cache_lock = threading.Lock()
+_key_locks: dict = {}
+
+
+def bootstrap_cached(version: str = "") -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Memoize a get-or-create function for BOOTSTRAP_CACHE_TTL_SECONDS.
+
+    Calls with the same arguments share one result; concurrent callers wait
+    for the first one rather than repeating its AWS calls. Failures are not
+    cached.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, BOOTSTRAP_VERSION, version, args, tuple(sorted(kwargs.items())))
+            with _cache_lock:
+                lock = _key_locks.setdefault(key, threading.Lock())
+            with lock:
+                entry = _cache.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    return entry[0]
+                value = func(*args, **kwargs)
+                _cache[key] = (value, time.monotonic() + BOOTSTRAP_CACHE_TTL_SECONDS)
+                return value
+        return wrapper
+    return decorator
+
+
+def invalidate_bootstrap() -> None:
+    """Forget all verified infrastructure (e.g. after it was found missing)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    retry_if: Callable[[Exception], bool],
+    timeout: float = IAM_PROPAGATION_TIMEOUT_SECONDS,
+    initial_delay: float = 0.5,
+    max_delay: float = 8.0,
+    description: Optional[str] = None,
+) -> T:
+    """
+    Call `func` until it succeeds, retrying errors accepted by `retry_if`.
+
+    Delays double from `initial_delay` up to `max_delay`, with jitter; the
+    last error is raised once `timeout` has passed.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if not retry_if(e) or time.monotonic() + delay > deadline:
+                raise
+            print(f"⏳ Waiting for {description or 'resource'} to be ready, retrying in {delay:.1f}s...")
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, max_delay)
+
+
+def is_role_not_ready_error(error: Exception) -> bool:
+    """Whether an AWS error means a new IAM role hasn't propagated yet."""
+    response = getattr(error, "response", None) or {}
+    code = response.get("Error", {}).get("Code", "")
+    message = response.get("Error", {}).get("Message", "").lower()
+    return code in ("InvalidInputException", "InvalidParameterValueException") and "assume" in message
@@ -2,16 +2,45 @@
 CodeBuild Operations
 
 CodeBuild project and build management.
+
+The project is verified once per process (see bootstrap.py), and the
+Dockerfile and buildspec templates are read from disk once.
 """
 
 import time
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
 from ..clients import get_codebuild_client
 from ..config import CODEBUILD_PROJECT_NAME
+from .bootstrap import (
+    bootstrap_cached,
+    config_version,
+    invalidate_bootstrap,
+    is_role_not_ready_error,
+    retry_with_backoff,
+)
 from .lambda_service import filter_env_vars
 
+TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
+
+# Build environment of the shared CodeBuild project
+CODEBUILD_ENVIRONMENT = {
+    "type": "LINUX_CONTAINER",
+    "image": "aws/codebuild/standard:7.0",
+    "computeType": "BUILD_GENERAL1_LARGE",
+    "privilegedMode": True,  # Required for Docker builds
+}
+
 
+@lru_cache(maxsize=None)
+def _read_template(name: str) -> str:
+    """Read a build template (cached; templates ship with the code)."""
+    return (TEMPLATES_DIR / name).read_text()
+
+
+@bootstrap_cached(version=config_version(CODEBUILD_ENVIRONMENT))
 def create_or_update_codebuild_project(role_arn: str) -> None:
     """
     Create or update the CodeBuild project.
@@ -21,12 +50,7 @@ def create_or_update_codebuild_project(role_arn: str) -> None:
     """
     codebuild_client = get_codebuild_client()
 
-    desired_environment = {
-        "type": "LINUX_CONTAINER",
-        "image": "aws/codebuild/standard:7.0",
-        "computeType": "BUILD_GENERAL1_LARGE",
-        "privilegedMode": True,  # Required for Docker builds
-    }
+    desired_environment = CODEBUILD_ENVIRONMENT
 
     try:
         projects = codebuild_client.batch_get_projects(names=[CODEBUILD_PROJECT_NAME])
@@ -35,10 +59,14 @@ def create_or_update_codebuild_project(role_arn: str) -> None:
             current_compute = existing["environment"].get("computeType")
             if current_compute != desired_environment["computeType"]:
                 print(f"🔄 Updating CodeBuild project compute: {current_compute} → {desired_environment['computeType']}")
-                codebuild_client.update_project(
-                    name=CODEBUILD_PROJECT_NAME,
-                    environment=desired_environment,
-                    serviceRole=role_arn,
+                retry_with_backoff(
+                    lambda: codebuild_client.update_project(
+                        name=CODEBUILD_PROJECT_NAME,
+                        environment=desired_environment,
+                        serviceRole=role_arn,
+                    ),
+                    retry_if=is_role_not_ready_error,
+                    description="CodeBuild role",
                 )
                 print(f"✅ Updated CodeBuild project")
             else:
@@ -49,15 +77,20 @@ def create_or_update_codebuild_project(role_arn: str) -> None:
 
     print(f"🔨 Creating CodeBuild project: {CODEBUILD_PROJECT_NAME}")
 
-    codebuild_client.create_project(
-        name=CODEBUILD_PROJECT_NAME,
-        source={
-            "type": "NO_SOURCE",
-            "buildspec": "version: 0.2\nphases:\n  build:\n    commands:\n      - echo 'Buildspec will be provided inline'"
-        },
-        artifacts={"type": "NO_ARTIFACTS"},
-        environment=desired_environment,
-        serviceRole=role_arn,
+    # A just-created role may not be assumable by CodeBuild yet
+    retry_with_backoff(
+        lambda: codebuild_client.create_project(
+            name=CODEBUILD_PROJECT_NAME,
+            source={
+                "type": "NO_SOURCE",
+                "buildspec": "version: 0.2\nphases:\n  build:\n    commands:\n      - echo 'Buildspec will be provided inline'"
+            },
+            artifacts={"type": "NO_ARTIFACTS"},
+            environment=desired_environment,
+            serviceRole=role_arn,
+        ),
+        retry_if=is_role_not_ready_error,
+        description="CodeBuild role",
     )
 
     print(f"✅ Created CodeBuild project")
@@ -106,16 +139,10 @@ def start_build(
     repo_path = github_url.replace("https://github.com/", "").replace(".git", "")
     
     # Read Dockerfile template
-    from pathlib import Path
-    templates_dir = Path(__file__).parent.parent.parent / "templates"
-    
     if runtime == "nodejs":
-        template_path = templates_dir / "Dockerfile.node"
+        dockerfile_template = _read_template("Dockerfile.node")
     else:  # python
-        template_path = templates_dir / "Dockerfile"
-    
-    #Read template content
-    dockerfile_template = template_path.read_text()
+        dockerfile_template = _read_template("Dockerfile")
 
     # Replace CMD with appropriate start command
     if runtime == "nodejs":
@@ -149,11 +176,9 @@ def start_build(
 
     # Read buildspec template
     if runtime == "nodejs":
-        buildspec_template_path = templates_dir / "buildspec.node.yml"
+        buildspec_template = _read_template("buildspec.node.yml")
     else:  # python
-        buildspec_template_path = templates_dir / "buildspec.yml"
-
-    buildspec_template = buildspec_template_path.read_text()
+        buildspec_template = _read_template("buildspec.yml")
 
     # Replace placeholders in buildspec
     # The Dockerfile content needs to be indented to match the YAML block scalar
@@ -186,11 +211,16 @@ def start_build(
             "type": "PLAINTEXT"
         })
 
-    response = codebuild_client.start_build(
-        projectName=CODEBUILD_PROJECT_NAME,
-        buildspecOverride=buildspec,
-        environmentVariablesOverride=env_overrides,
-    )
+    try:
+        response = codebuild_client.start_build(
+            projectName=CODEBUILD_PROJECT_NAME,
+            buildspecOverride=buildspec,
+            environmentVariablesOverride=env_overrides,
+        )
+    except codebuild_client.exceptions.ResourceNotFoundException:
+        # The project was deleted behind our back; verify it again next deploy
+        invalidate_bootstrap()
+        raise
     
     build_id = response["build"]["id"]
     print(f"✅ Build started: {build_id}")
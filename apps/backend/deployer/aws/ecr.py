@@ -33,6 +33,26 @@ def create_ecr_repository(repo_name: str) -> str:
         return repo_uri
 
 
+def get_image_digest(repo_name: str, tag: str = "latest") -> str:
+    """
+    Get the digest of a tagged image.
+    
+    Args:
+        repo_name: Name of the repository
+        tag: Image tag
+        
+    Returns:
+        The image digest (e.g. "sha256:...")
+    """
+    ecr_client = get_ecr_client()
+    
+    response = ecr_client.describe_images(
+        repositoryName=repo_name,
+        imageIds=[{"imageTag": tag}],
+    )
+    return response["imageDetails"][0]["imageDigest"]
+
+
 def delete_ecr_repository(repo_name: str) -> bool:
     """
     Delete an ECR repository and all its images.
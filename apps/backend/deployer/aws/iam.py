@@ -2,15 +2,87 @@
 IAM Operations
 
 IAM role management for CodeBuild and Lambda.
+
+Both roles are verified once per process (see bootstrap.py): later deploys
+reuse the cached ARN instead of re-reading the role and re-attaching its
+policies.
 """
 
 import json
-import time
 
 from ..clients import get_iam_client
 from ..config import CODEBUILD_ROLE_NAME, LAMBDA_ROLE_NAME
+from .bootstrap import bootstrap_cached, config_version
+
+# Managed policies for the CodeBuild service role
+CODEBUILD_ROLE_POLICIES = (
+    "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryPowerUser",
+    "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess",
+    "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess",
+)
+
+# All policies needed for Shorlabs platform to deploy other projects
+LAMBDA_ROLE_POLICIES = (
+    "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole",  # CloudWatch Logs
+    "arn:aws:iam::aws:policy/AmazonDynamoDBFullAccess",                   # Project data
+    "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryFullAccess",       # ECR repos
+    "arn:aws:iam::aws:policy/AWSLambda_FullAccess",                       # Lambda functions
+    "arn:aws:iam::aws:policy/AmazonS3FullAccess",                         # Build artifacts
+    "arn:aws:iam::aws:policy/AWSCodeBuildAdminAccess",                    # CodeBuild
+    "arn:aws:iam::aws:policy/IAMFullAccess",                              # Create roles
+)
+
+
+def _trust_policy(service: str) -> str:
+    """Trust policy letting an AWS service assume the role."""
+    return json.dumps({
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"Service": service},
+                "Action": "sts:AssumeRole"
+            }
+        ]
+    })
+
+
+def _create_role(role_name: str, service: str, policies: tuple) -> str:
+    """Create a role, attach its policies and wait until IAM reports it."""
+    iam_client = get_iam_client()
+    response = iam_client.create_role(
+        RoleName=role_name,
+        AssumeRolePolicyDocument=_trust_policy(service),
+    )
+    role_arn = response["Role"]["Arn"]
+
+    for policy_arn in policies:
+        iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
 
+    # Propagation to the consuming service can lag further; the first call
+    # using the role retries with backoff (see bootstrap.retry_with_backoff)
+    iam_client.get_waiter("role_exists").wait(
+        RoleName=role_name,
+        WaiterConfig={"Delay": 1, "MaxAttempts": 20},
+    )
+    return role_arn
 
+
+def _attach_missing_policies(role_name: str, policies: tuple) -> None:
+    """Attach only the policies the role doesn't already have."""
+    iam_client = get_iam_client()
+    attached = set()
+    paginator = iam_client.get_paginator("list_attached_role_policies")
+    for page in paginator.paginate(RoleName=role_name):
+        attached.update(p["PolicyArn"] for p in page["AttachedPolicies"])
+
+    for policy_arn in policies:
+        if policy_arn not in attached:
+            print(f"🔐 Attaching missing policy to {role_name}: {policy_arn}")
+            iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
+
+
+@bootstrap_cached(version=config_version(CODEBUILD_ROLE_POLICIES))
 def get_or_create_codebuild_role() -> str:
     """
     Get or create the CodeBuild service role.
@@ -27,40 +99,10 @@ def get_or_create_codebuild_role() -> str:
         pass
     
     print(f"🔐 Creating CodeBuild IAM role...")
-    
-    trust_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Principal": {"Service": "codebuild.amazonaws.com"},
-                "Action": "sts:AssumeRole"
-            }
-        ]
-    }
-    
-    response = iam_client.create_role(
-        RoleName=CODEBUILD_ROLE_NAME,
-        AssumeRolePolicyDocument=json.dumps(trust_policy),
-    )
-    role_arn = response["Role"]["Arn"]
-    
-    # Attach policies for CodeBuild
-    policies = [
-        "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryPowerUser",
-        "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess",
-        "arn:aws:iam::aws:policy/CloudWatchLogsFullAccess",
-    ]
-    
-    for policy in policies:
-        iam_client.attach_role_policy(RoleName=CODEBUILD_ROLE_NAME, PolicyArn=policy)
-    
-    print("⏳ Waiting for IAM role to propagate...")
-    time.sleep(10)
-    
-    return role_arn
+    return _create_role(CODEBUILD_ROLE_NAME, "codebuild.amazonaws.com", CODEBUILD_ROLE_POLICIES)
 
 
+@bootstrap_cached(version=config_version(LAMBDA_ROLE_POLICIES))
 def get_or_create_lambda_role() -> str:
     """
     Get or create the Lambda execution role.
@@ -70,60 +112,17 @@ def get_or_create_lambda_role() -> str:
     """
     iam_client = get_iam_client()
     
-    # All policies needed for Shorlabs platform to deploy other projects
-    REQUIRED_POLICIES = [
-        "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole",  # CloudWatch Logs
-        "arn:aws:iam::aws:policy/AmazonDynamoDBFullAccess",                   # Project data
-        "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryFullAccess",       # ECR repos
-        "arn:aws:iam::aws:policy/AWSLambda_FullAccess",                       # Lambda functions
-        "arn:aws:iam::aws:policy/AmazonS3FullAccess",                         # Build artifacts
-        "arn:aws:iam::aws:policy/AWSCodeBuildAdminAccess",                    # CodeBuild
-        "arn:aws:iam::aws:policy/IAMFullAccess",                              # Create roles
-    ]
-    
     try:
         response = iam_client.get_role(RoleName=LAMBDA_ROLE_NAME)
         role_arn = response["Role"]["Arn"]
         
         # Ensure all policies are attached (for existing roles)
         print("🔐 Ensuring Lambda role has all required policies...")
-        for policy_arn in REQUIRED_POLICIES:
-            try:
-                iam_client.attach_role_policy(
-                    RoleName=LAMBDA_ROLE_NAME,
-                    PolicyArn=policy_arn
-                )
-            except Exception:
-                pass  # Already attached or error
+        _attach_missing_policies(LAMBDA_ROLE_NAME, LAMBDA_ROLE_POLICIES)
         
         return role_arn
     except iam_client.exceptions.NoSuchEntityException:
         pass
     
     print(f"🔐 Creating Lambda IAM role...")
-    
-    trust_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Principal": {"Service": "lambda.amazonaws.com"},
-                "Action": "sts:AssumeRole"
-            }
-        ]
-    }
-    
-    response = iam_client.create_role(
-        RoleName=LAMBDA_ROLE_NAME,
-        AssumeRolePolicyDocument=json.dumps(trust_policy),
-    )
-    role_arn = response["Role"]["Arn"]
-    
-    # Attach all required policies
-    for policy_arn in REQUIRED_POLICIES:
-        iam_client.attach_role_policy(RoleName=LAMBDA_ROLE_NAME, PolicyArn=policy_arn)
-    
-    print("⏳ Waiting for IAM role to propagate...")
-    time.sleep(10)
-    
-    return role_arn
+    return _create_role(LAMBDA_ROLE_NAME, "lambda.amazonaws.com", LAMBDA_ROLE_POLICIES)
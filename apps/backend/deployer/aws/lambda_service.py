@@ -13,6 +13,7 @@ from ..config import (
     RESERVED_ENV_PREFIXES,
     RESERVED_ENV_VARS,
 )
+from .bootstrap import is_role_not_ready_error, retry_with_backoff
 
 
 def get_lambda_function_name(project_name: str) -> str:
@@ -63,7 +64,7 @@ def create_or_update_lambda(
     ephemeral_storage: int = None,
 ) -> str:
     """
-    Create or update Lambda function.
+    Create or update Lambda function and its function URL.
     
     Args:
         function_name: Name of the function (without prefix)
@@ -77,6 +78,35 @@ def create_or_update_lambda(
     Returns:
         The function URL
     """
+    update_lambda_function(
+        function_name, image_uri, role_arn, env_vars, memory, timeout, ephemeral_storage
+    )
+    return get_or_create_function_url(function_name)
+
+
+def update_lambda_function(
+    function_name: str,
+    image_uri: str,
+    role_arn: str,
+    env_vars: dict = None,
+    memory: int = None,
+    timeout: int = None,
+    ephemeral_storage: int = None,
+) -> None:
+    """
+    Create the Lambda function, or update its image and configuration.
+    
+    Safe to repeat: updating to the same image and settings changes nothing.
+    
+    Args:
+        function_name: Name of the function (without prefix)
+        image_uri: ECR image URI
+        role_arn: Lambda execution role ARN
+        env_vars: Environment variables
+        memory: Memory in MB (default: DEFAULT_MEMORY)
+        timeout: Timeout in seconds (default: DEFAULT_TIMEOUT)
+        ephemeral_storage: Ephemeral storage in MB (default: DEFAULT_EPHEMERAL_STORAGE)
+    """
     full_name = get_lambda_function_name(function_name)
     memory = memory or DEFAULT_MEMORY
     timeout = timeout or DEFAULT_TIMEOUT
@@ -131,14 +161,29 @@ def create_or_update_lambda(
         if environment:
             create_params["Environment"] = environment
         
-        lambda_client.create_function(**create_params)
+        # A just-created execution role may not be assumable by Lambda yet
+        retry_with_backoff(
+            lambda: lambda_client.create_function(**create_params),
+            retry_if=is_role_not_ready_error,
+            description="Lambda execution role",
+        )
         
         print("⏳ Waiting for function to be active...")
         waiter = lambda_client.get_waiter("function_active")
         waiter.wait(FunctionName=full_name)
+
+
+def get_or_create_function_url(function_name: str) -> str:
+    """
+    Get the function URL of a deployed function, creating it if needed.
     
-    # Get or create function URL
-    return _ensure_function_url(full_name)
+    Args:
+        function_name: Name of the function (without prefix)
+        
+    Returns:
+        The function URL
+    """
+    return _ensure_function_url(get_lambda_function_name(function_name))
 
 
 def _ensure_function_url(function_name: str) -> str:
@@ -4,49 +4,67 @@ AWS Client Management
 Provides lazy-loaded AWS clients for better testing and resource management.
 """
 
+import os
+import threading
+
 import boto3
+from botocore.config import Config
 from functools import lru_cache
 
+# Size connection pools to the API's I/O pool (IO_EXECUTOR_WORKERS) so log
+# fetches offloaded from request handlers don't queue for a connection.
+_CLIENT_CONFIG = Config(max_pool_connections=int(os.environ.get("IO_EXECUTOR_WORKERS", "32")))
+
+# boto3's default session isn't safe for concurrent client creation, and
+# deploy stages run in parallel; clients themselves are thread-safe.
+_client_lock = threading.Lock()
+
+
+def _create_client(service: str):
+    """Create a client from the default session, one at a time."""
+    with _client_lock:
+        return boto3.client(service, config=_CLIENT_CONFIG)
 
 
 @lru_cache()
 def get_ecr_client():
     """Get the ECR client (cached)."""
-    return boto3.client("ecr")
+    return _create_client("ecr")
 
 
 @lru_cache()
 def get_lambda_client():
     """Get the Lambda client (cached)."""
-    return boto3.client("lambda")
+    return _create_client("lambda")
 
 
 @lru_cache()
 def get_iam_client():
     """Get the IAM client (cached)."""
-    return boto3.client("iam")
+    return _create_client("iam")
 
 
 @lru_cache()
 def get_sts_client():
     """Get the STS client (cached)."""
-    return boto3.client("sts")
+    return _create_client("sts")
 
 
 @lru_cache()
 def get_codebuild_client():
     """Get the CodeBuild client (cached)."""
-    return boto3.client("codebuild")
+    return _create_client("codebuild")
 
 
 @lru_cache()
 def get_logs_client():
     """Get the CloudWatch Logs client (cached)."""
-    return boto3.client("logs")
+    return _create_client("logs")
 
 
+@lru_cache()
 def get_aws_account_id() -> str:
-    """Get the AWS account ID."""
+    """Get the AWS account ID (cached: it never changes for a process)."""
     return get_sts_client().get_caller_identity()["Account"]
 
 
@@ -10,19 +10,197 @@ from .utils import extract_project_name  # From utils.py file
 from .utils import detect_runtime_from_github  # From utils/ module
 from .aws import (
     create_ecr_repository,
+    get_image_digest,
     get_or_create_codebuild_role,
     create_or_update_codebuild_project,
     start_build,
     wait_for_build,
     get_or_create_lambda_role,
-    create_or_update_lambda,
+    update_lambda_function,
+    get_or_create_function_url,
     delete_lambda,
     delete_ecr_repository,
     delete_lambda_logs,
 )
 from .aws.ecr import get_ecr_repo_name
+from .stages import Stage, StageCheckpoint, run_stages, stage
 
 
+def get_function_name(github_url: str, project_id: Optional[str] = None) -> str:
+    """Lambda function name (without prefix) for a project."""
+    # Use project_id for unique naming if provided, otherwise fall back to repo name
+    repo_name = extract_project_name(github_url)
+    if project_id:
+        # Use project_id to ensure unique Lambda per deployment
+        return f"{repo_name}-{project_id[:8]}"  # e.g., "fast-api-dockerfile-efe76c65"
+    return repo_name
+
+
+def start_deployment(
+    github_url: str,
+    github_token: Optional[str] = None,
+    root_directory: str = "./",
+    start_command: str = "uvicorn main:app --host 0.0.0.0 --port 8080",
+    env_vars: Optional[dict] = None,
+    on_build_start: Optional[callable] = None,
+    project_id: Optional[str] = None,
+    completed: Optional[dict] = None,
+    on_stage_complete: Optional[StageCheckpoint] = None,
+) -> dict:
+    """
+    Phase one of a deployment: prepare the infrastructure and start the build.
+    
+    Returns as soon as CodeBuild has accepted the build. Phase two
+    (`finish_deployment`) runs once the build has succeeded, typically on a
+    CodeBuild state-change event, so no worker is held for the build.
+    
+    Stages listed in `completed` (checkpointed by `on_stage_complete` on an
+    earlier attempt) are not run again, so a retried deployment doesn't
+    start a second build.
+    
+    Args:
+        github_url: GitHub repository URL
+        github_token: OAuth token for private repos
+        root_directory: Root directory for monorepos
+        start_command: Command to start the application
+        env_vars: Environment variables for the build
+        on_build_start: Optional callback(build_id) called immediately when build starts
+        project_id: Unique project identifier for Lambda naming
+        completed: Outputs of stages finished on an earlier attempt
+        on_stage_complete: Optional callback(stage, output) to checkpoint each stage
+        
+    Returns:
+        Dict with 'build_id', 'function_name', 'image_uri' and 'role_arn',
+        everything `finish_deployment` needs
+    """
+    if not github_token:
+        raise ValueError("github_token is required for authentication")
+    
+    project_name = get_function_name(github_url, project_id)
+    
+    print(f"\n🔧 Shorlabs Deployer (Lambda Web Adapter)")
+    print(f"   Repository: {github_url}")
+    print(f"   Project Name: {project_name}")
+    print(f"   Start Command: {start_command}\n")
+    
+    # Steps run as a graph: runtime detection, the ECR repository and both IAM
+    # roles are independent, so they overlap; the build starts once its inputs
+    # are ready. The Lambda role is resolved now, off the critical path, so
+    # phase two only has to roll out the image.
+    ecr_repo_name = get_ecr_repo_name(project_name)
+    
+    def detect_runtime(results):
+        print("🔍 Detecting runtime...")
+        runtime = detect_runtime_from_github(github_url, github_token, root_directory)
+        print(f"✅ Detected runtime: {runtime}")
+        return runtime
+    
+    def ecr_repository(results):
+        ecr_repo_uri = create_ecr_repository(ecr_repo_name)
+        print(f"✅ ECR repository ready: {ecr_repo_name}")
+        return ecr_repo_uri
+    
+    def codebuild_project(results):
+        print("🏗️ Setting up build environment...")
+        create_or_update_codebuild_project(results["codebuild_role"])
+    
+    def build(results):
+        print("🚀 Starting build from GitHub...")
+        build_id = start_build(
+            github_url=github_url,
+            github_token=github_token,
+            ecr_repo_uri=results["ecr_repository"],
+            project_name=project_name,
+            start_command=start_command,
+            runtime=results["detect_runtime"],
+            root_directory=root_directory,
+            env_vars=env_vars,
+        )
+        print(f"🔨 Build started: {build_id}")
+        
+        # Call the callback immediately so deployment record can be created
+        if on_build_start:
+            on_build_start(build_id)
+        return build_id
+    
+    results = run_stages([
+        Stage("detect_runtime", detect_runtime),
+        Stage("ecr_repository", ecr_repository),
+        Stage("codebuild_role", lambda results: get_or_create_codebuild_role()),
+        Stage("lambda_role", lambda results: get_or_create_lambda_role()),
+        Stage("codebuild_project", codebuild_project, after=("codebuild_role",)),
+        Stage("start_build", build, after=("detect_runtime", "ecr_repository", "codebuild_project")),
+    ], completed=completed, on_complete=on_stage_complete)
+    
+    return {
+        "build_id": results["start_build"],
+        "function_name": project_name,
+        "image_uri": f"{results['ecr_repository']}:latest",
+        "role_arn": results["lambda_role"],
+    }
+
+
+def finish_deployment(
+    function_name: str,
+    image_uri: str,
+    role_arn: str,
+    env_vars: Optional[dict] = None,
+    memory: Optional[int] = None,
+    timeout: Optional[int] = None,
+    ephemeral_storage: Optional[int] = None,
+    completed: Optional[dict] = None,
+    on_stage_complete: Optional[StageCheckpoint] = None,
+) -> str:
+    """
+    Phase two of a deployment: roll the built image out to Lambda.
+    
+    The image is pinned by digest first, so a resumed rollout deploys
+    exactly the image that was built. Every stage is safe to repeat;
+    stages listed in `completed` are skipped.
+    
+    Args:
+        function_name: Function name returned by `start_deployment`
+        image_uri: Image URI returned by `start_deployment`
+        role_arn: Lambda execution role returned by `start_deployment`
+        env_vars: Environment variables for the Lambda function
+        memory: Memory in MB (optional, uses default)
+        timeout: Timeout in seconds (optional, uses default)
+        ephemeral_storage: Ephemeral storage in MB (optional, uses default)
+        completed: Outputs of stages finished on an earlier attempt
+        on_stage_complete: Optional callback(stage, output) to checkpoint each stage
+        
+    Returns:
+        The function URL
+    """
+    repo_uri, tag = image_uri.rsplit(":", 1)
+    
+    def image(results):
+        digest = get_image_digest(get_ecr_repo_name(function_name), tag)
+        print(f"📦 Built image: {digest}")
+        return {"image_digest": digest, "image_uri": f"{repo_uri}@{digest}"}
+    
+    def lambda_update(results):
+        print("🚀 Deploying to Lambda...")
+        update_lambda_function(
+            function_name=function_name,
+            image_uri=results["image"]["image_uri"],
+            role_arn=role_arn,
+            env_vars=env_vars,
+            memory=memory,
+            timeout=timeout,
+            ephemeral_storage=ephemeral_storage,
+        )
+    
+    results = run_stages([
+        Stage("image", image),
+        Stage("lambda_update", lambda_update, after=("image",)),
+        Stage("function_url", lambda results: get_or_create_function_url(function_name), after=("lambda_update",)),
+    ], completed=completed, on_complete=on_stage_complete)
+    function_url = results["function_url"]
+    
+    print(f"\n✅ Deployment successful!")
+    print(f"🌐 Your API is live at: {function_url}")
+    return function_url
 
 
 def deploy_project(
@@ -40,7 +218,8 @@ def deploy_project(
     """
     Deploy a project from GitHub to AWS Lambda using Lambda Web Adapter.
     
-    This is the main entry point for deployments.
+    Runs both phases in one call, polling CodeBuild until the build is done
+    (used by the CLI; the API resumes on build events instead).
     
     Args:
         github_url: GitHub repository URL
@@ -60,82 +239,35 @@ def deploy_project(
     Raises:
         Exception: If deployment fails
     """
-    if not github_token:
-        raise ValueError("github_token is required for authentication")
-    
-    # Use project_id for unique naming if provided, otherwise fall back to repo name
-    repo_name = extract_project_name(github_url)
-    if project_id:
-        # Use project_id to ensure unique Lambda per deployment
-        project_name = f"{repo_name}-{project_id[:8]}"  # e.g., "fast-api-dockerfile-efe76c65"
-    else:
-        project_name = repo_name
-    
-    print(f"\n🔧 Shorlabs Deployer (Lambda Web Adapter)")
-    print(f"   Repository: {github_url}")
-    print(f"   Project Name: {project_name}")
-    print(f"   Start Command: {start_command}\n")
-    
-    # Step 1: Detect runtime via GitHub API
-    print("🔍 Detecting runtime...")
-    runtime = detect_runtime_from_github(github_url, github_token, root_directory)
-    print(f"✅ Detected runtime: {runtime}")
-    
-    # Step 2: Create ECR repository
-    ecr_repo_name = get_ecr_repo_name(project_name)
-    ecr_repo_uri = create_ecr_repository(ecr_repo_name)
-    print(f"✅ ECR repository ready: {ecr_repo_name}")
-    
-    # Step 3: Setup CodeBuild
-    print("🏗️ Setting up build environment...")
-    codebuild_role = get_or_create_codebuild_role()
-    create_or_update_codebuild_project(codebuild_role)
-    
-    # Step 4: Start build directly from GitHub with detected runtime
-    print("🚀 Starting build from GitHub...")
-    build_id = start_build(
+    started = start_deployment(
         github_url=github_url,
         github_token=github_token,
-        ecr_repo_uri=ecr_repo_uri,
-        project_name=project_name,
-        start_command=start_command,
-        runtime=runtime,
         root_directory=root_directory,
+        start_command=start_command,
         env_vars=env_vars,
+        on_build_start=on_build_start,
+        project_id=project_id,
     )
-    print(f"🔨 Build started: {build_id}")
     
-    # Call the callback immediately so deployment record can be created
-    if on_build_start:
-        on_build_start(build_id)
-    
-    # Step 5: Wait for build
-    if not wait_for_build(build_id):
-        raise Exception("Build failed")
+    with stage("build"):
+        if not wait_for_build(started["build_id"]):
+            raise Exception("Build failed")
     print("✅ Build completed")
     
-    # Step 6: Deploy to Lambda
-    print("🚀 Deploying to Lambda...")
-    lambda_role = get_or_create_lambda_role()
-    image_uri = f"{ecr_repo_uri}:latest"
-    
-    function_url = create_or_update_lambda(
-        function_name=project_name,
-        image_uri=image_uri,
-        role_arn=lambda_role,
+    function_url = finish_deployment(
+        function_name=started["function_name"],
+        image_uri=started["image_uri"],
+        role_arn=started["role_arn"],
         env_vars=env_vars,
         memory=memory,
         timeout=timeout,
         ephemeral_storage=ephemeral_storage,
     )
     
-    print(f"\n✅ Deployment successful!")
-    print(f"🌐 Your API is live at: {function_url}")
-    
     return {
         "function_url": function_url,
-        "build_id": build_id,
-        "function_name": project_name,  # Return function name for storage
+        "build_id": started["build_id"],
+        "function_name": started["function_name"],  # Return function name for storage
     }
 
 
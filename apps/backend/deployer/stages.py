@@ -0,0 +1,146 @@
+"""
+Deploy Stage Instrumentation
+
+A deployment runs as a graph of named stages (runtime detection, ECR,
+IAM roles, CodeBuild, build, Lambda); `run_stages` starts each one as soon
+as the stages it depends on have finished, so independent steps overlap.
+Each stage's duration and outcome is passed to the registered listeners, so
+callers such as the API can export stage metrics without the deployer
+depending on them.
+
+Stage outputs can be checkpointed as they complete (`on_complete`) and
+passed back in (`completed`) to resume a deployment where it stopped.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# listener(stage, seconds, succeeded)
+StageListener = Callable[[str, float, bool], None]
+
+# on_complete(stage, output)
+StageCheckpoint = Callable[[str, Any], None]
+
+_listeners: List[StageListener] = []
+
+
+def add_stage_listener(listener: StageListener) -> None:
+    """Register a callback invoked after every stage finishes (idempotent)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _notify(name: str, seconds: float, succeeded: bool) -> None:
+    """Call every listener; a failing listener never fails the deployment."""
+    for listener in _listeners:
+        try:
+            listener(name, seconds, succeeded)
+        except Exception as e:
+            print(f"⚠️ Stage listener failed for {name}: {e}")
+
+
+@contextmanager
+def stage(name: str):
+    """Time a deploy stage and report it to the listeners."""
+    start = time.perf_counter()
+    succeeded = False
+    try:
+        yield
+        succeeded = True
+    finally:
+        _notify(name, time.perf_counter() - start, succeeded)
+
+
+# ─────────────────────────────────────────────────────────────
+# STAGE GRAPH
+# ─────────────────────────────────────────────────────────────
+
+# Max stages running at once (they are I/O bound: AWS and GitHub calls)
+MAX_PARALLEL_STAGES = 4
+
+
+class Stage(NamedTuple):
+    """
+    A deploy step: `run(results)` gets the results of earlier stages by name.
+
+    A stage starts as soon as every stage in `after` has finished.
+    """
+
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    after: Tuple[str, ...] = ()
+
+
+def run_stages(
+    stages: Sequence[Stage],
+    max_workers: int = MAX_PARALLEL_STAGES,
+    completed: Optional[Dict[str, Any]] = None,
+    on_complete: Optional[StageCheckpoint] = None,
+) -> Dict[str, Any]:
+    """
+    Run a graph of stages, independent ones concurrently.
+
+    Each stage is timed and reported like `stage()`. If a stage fails, stages
+    that haven't started are skipped, running ones are waited for, and the
+    first error is raised.
+
+    Args:
+        stages: The stage graph
+        max_workers: Max stages running at once
+        completed: Outputs of stages that already ran (e.g. before a crash);
+            those stages are not run again
+        on_complete: Called with (stage, output) as each stage finishes, in
+            the stage's worker; if it raises, the stage fails
+
+    Returns:
+        Dict of stage name -> the value its `run` returned
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [dep for dep in s.after if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage {s.name!r} depends on unknown stage(s): {', '.join(missing)}")
+
+    results: Dict[str, Any] = {name: value for name, value in (completed or {}).items() if name in by_name}
+    pending = {name: s for name, s in by_name.items() if name not in results}
+    if results:
+        print(f"⏩ Resuming after completed stages: {', '.join(results)}")
+    running: Dict[Future, str] = {}
+    error: Optional[BaseException] = None
+
+    def timed(s: Stage):
+        with stage(s.name):
+            output = s.run(results)
+            if on_complete:
+                on_complete(s.name, output)
+            return output
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deploy-stage") as executor:
+        while pending or running:
+            if error is None:
+                ready = [s for s in pending.values() if all(dep in results for dep in s.after)]
+                for s in ready:
+                    del pending[s.name]
+                    running[executor.submit(timed, s)] = s.name
+                if not running and pending:
+                    raise ValueError(f"Stage graph has a cycle: {', '.join(pending)}")
+            elif not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException as e:
+                    if error is None:
+                        error = e
+
+    if error is not None:
+        skipped = ", ".join(pending)
+        if skipped:
+            print(f"⏭️ Skipped stages after failure: {skipped}")
+        raise error
+    return results
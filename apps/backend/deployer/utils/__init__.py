@@ -4,11 +4,22 @@ Utils Module
 Utility functions for GitHub API interactions and common utilities.
 """
 
-from .github_api import detect_runtime_from_github, get_repo_info
-from .common import extract_project_name
-
-__all__ = [
-    "detect_runtime_from_github",
-    "get_repo_info",
-    "extract_project_name",
-]
+import importlib
+
+# Exports are imported on first access (PEP 562): frameworks detection in
+# the API shouldn't import requests via github_api.
+_EXPORTS = {
+    "detect_runtime_from_github": ".github_api",
+    "get_repo_info": ".github_api",
+    "extract_project_name": ".common",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -183,6 +183,7 @@ async def _fetch_file_content(
     repo: str,
     file_path: str,
     token: str,
+    client: httpx.AsyncClient,
 ) -> Optional[str]:
     """Fetch file content from GitHub API."""
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
@@ -193,13 +194,12 @@ async def _fetch_file_content(
         "X-GitHub-Api-Version": "2022-11-28",
     }
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                return response.text
-        except Exception as e:
-            print(f"Error fetching {file_path}: {e}")
+    try:
+        response = await client.get(url, headers=headers, timeout=10)
+        if response.status_code == 200:
+            return response.text
+    except Exception as e:
+        print(f"Error fetching {file_path}: {e}")
     
     return None
 
@@ -209,6 +209,7 @@ async def _check_file_exists(
     repo: str,
     file_path: str,
     token: str,
+    client: httpx.AsyncClient,
 ) -> bool:
     """Check if a file exists in the GitHub repo."""
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
@@ -219,12 +220,11 @@ async def _check_file_exists(
         "X-GitHub-Api-Version": "2022-11-28",
     }
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.head(url, headers=headers, timeout=10)
-            return response.status_code == 200
-        except Exception:
-            return False
+    try:
+        response = await client.head(url, headers=headers, timeout=10)
+        return response.status_code == 200
+    except Exception:
+        return False
 
 
 async def _check_package_json_deps(
@@ -233,11 +233,12 @@ async def _check_package_json_deps(
     file_path: str,
     packages: List[str],
     token: str,
+    client: httpx.AsyncClient,
 ) -> bool:
     """Check if package.json contains any of the specified packages."""
     import json
     
-    content = await _fetch_file_content(owner, repo, file_path, token)
+    content = await _fetch_file_content(owner, repo, file_path, token, client)
     if not content:
         return False
     
@@ -256,15 +257,34 @@ async def detect_framework(
     github_url: str,
     root_directory: str,
     token: str,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> DetectionResult:
     """
     Detect framework and suggest start command.
+    
+    Detection makes a series of GitHub API calls; pass a long-lived, pooled
+    `client` so they reuse connections. Without one, a client is opened for
+    the duration of this detection.
     """
     # Parse owner/repo from URL
     parts = github_url.rstrip("/").rstrip(".git").split("/")
     owner = parts[-2]
     repo = parts[-1]
     
+    if client is None:
+        async with httpx.AsyncClient() as client:
+            return await _detect_framework(owner, repo, root_directory, token, client)
+    return await _detect_framework(owner, repo, root_directory, token, client)
+
+
+async def _detect_framework(
+    owner: str,
+    repo: str,
+    root_directory: str,
+    token: str,
+    client: httpx.AsyncClient,
+) -> DetectionResult:
+    """Run the framework registry against a repository."""
     # Try each framework in order
     for framework in FRAMEWORKS:
         detectors = framework["detectors"]
@@ -278,7 +298,7 @@ async def detect_framework(
             # For Node.js with package matchers
             if match_package is not None:
                 if file_path == "package.json":
-                    if await _check_package_json_deps(owner, repo, full_path, match_package, token):
+                    if await _check_package_json_deps(owner, repo, full_path, match_package, token, client):
                         return DetectionResult(
                             detected=True,
                             framework=framework["name"],
@@ -290,7 +310,7 @@ async def detect_framework(
             
             # For Python with content matchers
             elif match_content is not None:
-                content = await _fetch_file_content(owner, repo, full_path, token)
+                content = await _fetch_file_content(owner, repo, full_path, token, client)
                 if content and re.search(match_content, content, re.IGNORECASE):
                     module = _file_to_module(file_path)
                     cmd = framework["start_command"]
@@ -309,7 +329,7 @@ async def detect_framework(
             
             # Fallback: just check if file exists
             else:
-                if await _check_file_exists(owner, repo, full_path, token):
+                if await _check_file_exists(owner, repo, full_path, token, client):
                     module = _file_to_module(file_path)
                     cmd = framework["start_command"]
                     if cmd:
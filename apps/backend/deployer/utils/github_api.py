@@ -5,9 +5,16 @@ Utilities for interacting with GitHub API to detect project runtime.
 """
 
 import requests
+from functools import lru_cache
 from typing import Optional
 
 
+@lru_cache()
+def _get_session() -> requests.Session:
+    """Shared session, so repeated calls reuse pooled keep-alive connections."""
+    return requests.Session()
+
+
 def detect_runtime_from_github(github_url: str, github_token: str, root_directory: str = "./") -> str:
     """
     Detect runtime by checking GitHub repo files via API.
@@ -78,7 +85,7 @@ def _file_exists(owner: str, repo: str, path: str, headers: dict) -> bool:
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
     
     try:
-        response = requests.head(url, headers=headers, timeout=10)
+        response = _get_session().head(url, headers=headers, timeout=10)
         return response.status_code == 200
     except Exception as e:
         print(f"⚠️  Error checking {path}: {e}")
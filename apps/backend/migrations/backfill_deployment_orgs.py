@@ -0,0 +1,73 @@
+"""
+Migration script to backfill organization_id on deployment records.
+
+The org-wide deployments feed queries the org-deployments-index GSI, which
+only contains deployments that carry organization_id. New deployments get
+it from create_deployment; this script copies it from each project onto
+deployments created before the index existed.
+
+This script:
+1. Ensures the deployments table and its indexes exist
+2. Scans deployments without organization_id and sets it from the project
+
+Run (from apps/backend): python -m migrations.backfill_deployment_orgs
+"""
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from api.db.dynamodb import get_or_create_deployments_table, get_project
+
+
+def get_deployments_without_org(table) -> list:
+    """Scan for deployment items that have no organization_id attribute."""
+    scan_kwargs = {
+        "FilterExpression": "attribute_not_exists(organization_id)",
+        "ProjectionExpression": "project_id, SK, deploy_id",
+    }
+
+    response = table.scan(**scan_kwargs)
+    items = response.get("Items", [])
+
+    # Handle pagination
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **scan_kwargs)
+        items.extend(response.get("Items", []))
+
+    return items
+
+
+def backfill_deployment_orgs():
+    """Set organization_id on every deployment that is missing it."""
+    table = get_or_create_deployments_table()
+
+    deployments = get_deployments_without_org(table)
+    print(f"Found {len(deployments)} deployments without organization_id")
+
+    org_by_project = {}
+    updated = 0
+    for deployment in deployments:
+        project_id = deployment["project_id"]
+        if project_id not in org_by_project:
+            project = get_project(project_id)
+            org_by_project[project_id] = project["organization_id"] if project else None
+
+        org_id = org_by_project[project_id]
+        if not org_id:
+            print(f"Skipping {deployment['deploy_id']}: project {project_id} not found")
+            continue
+
+        table.update_item(
+            Key={"project_id": project_id, "SK": deployment["SK"]},
+            UpdateExpression="SET organization_id = :org",
+            ExpressionAttributeValues={":org": org_id},
+        )
+        updated += 1
+
+    print(f"\nBackfill complete: {updated} deployments updated")
+
+
+if __name__ == "__main__":
+    backfill_deployment_orgs()
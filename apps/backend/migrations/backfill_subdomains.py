@@ -0,0 +1,139 @@
+"""
+Migration script to backfill subdomains on the shorlabs-projects table.
+
+This script:
+1. Ensures the subdomain-index GSI exists and waits for it to become ACTIVE
+   (DynamoDB indexes every existing item that already has a subdomain)
+2. Writes a SUBDOMAIN#<name> claim item for every project created before
+   claims existed, so new projects can no longer take their subdomain
+3. Assigns a subdomain and custom_url to legacy projects created before
+   subdomains existed, so they become reachable through the index
+
+A live project's subdomain is never changed. When two projects already
+share one, the oldest keeps it (or whichever already holds the claim); the
+others are reported, flagged with `subdomain_conflict` (the owner's
+project_id) and left for manual resolution.
+
+Run (from apps/backend): python -m migrations.backfill_subdomains
+"""
+
+import time
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from api.db.common import SHORLABS_DOMAIN, build_subdomain_claim, subdomain_claim_key
+from api.db.dynamodb import (
+    SUBDOMAIN_INDEX_NAME,
+    claim_subdomain,
+    get_dynamodb_resource,
+    get_or_create_table,
+)
+
+
+def wait_for_index(table) -> None:
+    """Block until the subdomain GSI has finished backfilling."""
+    while True:
+        table.reload()
+        index = next(
+            (i for i in table.global_secondary_indexes or [] if i["IndexName"] == SUBDOMAIN_INDEX_NAME),
+            None,
+        )
+        if index and index["IndexStatus"] == "ACTIVE":
+            print(f"{SUBDOMAIN_INDEX_NAME} is ACTIVE")
+            return
+        status = index["IndexStatus"] if index else "MISSING"
+        print(f"Waiting for {SUBDOMAIN_INDEX_NAME} ({status})...")
+        time.sleep(15)
+
+
+def get_all_projects(table) -> list:
+    """Scan for every project item."""
+    scan_kwargs = {
+        "FilterExpression": "begins_with(SK, :sk_prefix)",
+        "ExpressionAttributeValues": {":sk_prefix": "PROJECT#"},
+    }
+
+    response = table.scan(**scan_kwargs)
+    items = response.get("Items", [])
+
+    # Handle pagination
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **scan_kwargs)
+        items.extend(response.get("Items", []))
+
+    return items
+
+
+def claim_existing_subdomain(table, project: dict) -> str:
+    """
+    Claim the subdomain a project already has, without falling back to another.
+
+    Returns:
+        The project_id holding the claim (this project's if it was free)
+    """
+    try:
+        table.put_item(
+            Item=build_subdomain_claim(project["subdomain"], project["project_id"]),
+            ConditionExpression="attribute_not_exists(PK) OR claimed_by = :pid",
+            ExpressionAttributeValues={":pid": project["project_id"]},
+        )
+        return project["project_id"]
+    except get_dynamodb_resource().meta.client.exceptions.ConditionalCheckFailedException:
+        claim = table.get_item(Key=subdomain_claim_key(project["subdomain"]), ConsistentRead=True)
+        return claim["Item"]["claimed_by"]
+
+
+def backfill_subdomains():
+    """Create the index, claim existing subdomains and assign missing ones."""
+    table = get_or_create_table()
+    wait_for_index(table)
+
+    # Oldest first: on a shared subdomain, the project that had it first keeps it
+    projects = sorted(get_all_projects(table), key=lambda p: p.get("created_at") or "")
+    print(f"Found {len(projects)} projects")
+
+    assigned = 0
+    conflicts = []
+    for project in projects:
+        current = project.get("subdomain")
+        if current:
+            owner = claim_existing_subdomain(table, project)
+            if owner == project["project_id"]:
+                continue
+
+            # Renaming would break a live URL: flag it and leave it as is
+            table.update_item(
+                Key={"PK": project["PK"], "SK": project["SK"]},
+                UpdateExpression="SET subdomain_conflict = :owner",
+                ExpressionAttributeValues={":owner": owner},
+            )
+            conflicts.append(project["project_id"])
+            print(f"Skipping {project['project_id']}: subdomain {current} is claimed by {owner}")
+            continue
+
+        # Legacy project without a subdomain: give it one
+        subdomain = claim_subdomain(project["project_id"], project.get("name") or project["project_id"])
+        table.update_item(
+            Key={"PK": project["PK"], "SK": project["SK"]},
+            UpdateExpression="SET subdomain = :sd, custom_url = :url",
+            ExpressionAttributeValues={
+                ":sd": subdomain,
+                ":url": f"https://{subdomain}.{SHORLABS_DOMAIN}",
+            },
+        )
+        assigned += 1
+        print(f"Assigned {subdomain} to project {project['project_id']}")
+
+    print(
+        f"\nBackfill complete: {len(projects)} projects, {assigned} assigned a subdomain, "
+        f"{len(conflicts)} conflicts"
+    )
+    if conflicts:
+        print(f"Warning: resolve manually (flagged with subdomain_conflict): {', '.join(conflicts)}")
+
+
+if __name__ == "__main__":
+    backfill_subdomains()
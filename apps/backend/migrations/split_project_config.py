@@ -0,0 +1,96 @@
+"""
+Migration script to move project config onto CONFIG# items.
+
+Projects used to be a single PROJECT# item that also carried env_vars and
+compute settings. Those now live on a separate CONFIG#{project_id} item in
+the same partition, so listings and status reads only touch the small
+PROJECT# item.
+
+For every project that still carries config fields, this script writes them
+to the CONFIG# item (without overwriting values already there) and removes
+them from the PROJECT# item, both in one transaction. Reads merge legacy
+fields in the meantime, so it is safe to run while the API is serving.
+
+Run (from apps/backend): python -m migrations.split_project_config
+"""
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from api.db.common import PROJECT_CONFIG_FIELDS, project_config_key
+from api.db.dynamodb import get_dynamodb_resource, get_projects_table
+
+
+def get_projects_with_inline_config(table) -> list:
+    """Scan for project items that still carry any config field."""
+    names = {f"#f{i}": field for i, field in enumerate(PROJECT_CONFIG_FIELDS)}
+    scan_kwargs = {
+        "FilterExpression": "begins_with(SK, :sk_prefix) AND ("
+        + " OR ".join(f"attribute_exists({name})" for name in names)
+        + ")",
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": {":sk_prefix": "PROJECT#"},
+    }
+
+    response = table.scan(**scan_kwargs)
+    items = response.get("Items", [])
+
+    # Handle pagination
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **scan_kwargs)
+        items.extend(response.get("Items", []))
+
+    return items
+
+
+def split_project(table, project: dict) -> None:
+    """Move one project's config fields to its CONFIG# item."""
+    fields = {k: project[k] for k in PROJECT_CONFIG_FIELDS if k in project}
+    names = {f"#{k}": k for k in fields}
+    config_key = project_config_key(project["organization_id"], project["project_id"])
+
+    # The resource's client serializes plain Python values, like Table does
+    get_dynamodb_resource().meta.client.transact_write_items(
+        TransactItems=[
+            {
+                "Update": {
+                    "TableName": table.name,
+                    "Key": config_key,
+                    # if_not_exists: never clobber a value written after the split
+                    "UpdateExpression": "SET "
+                    + ", ".join(f"#{k} = if_not_exists(#{k}, :{k})" for k in fields),
+                    "ExpressionAttributeNames": names,
+                    "ExpressionAttributeValues": {f":{k}": v for k, v in fields.items()},
+                }
+            },
+            {
+                "Update": {
+                    "TableName": table.name,
+                    "Key": {"PK": project["PK"], "SK": project["SK"]},
+                    "UpdateExpression": "REMOVE " + ", ".join(names),
+                    "ConditionExpression": "attribute_exists(PK)",
+                    "ExpressionAttributeNames": names,
+                }
+            },
+        ]
+    )
+
+
+def split_project_config():
+    """Move config fields of every legacy project to CONFIG# items."""
+    table = get_projects_table()
+
+    projects = get_projects_with_inline_config(table)
+    print(f"Found {len(projects)} projects with inline config")
+
+    for project in projects:
+        split_project(table, project)
+        print(f"Split config of project {project['project_id']}")
+
+    print(f"\nMigration complete: {len(projects)} projects updated")
+
+
+if __name__ == "__main__":
+    split_project_config()
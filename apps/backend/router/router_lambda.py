@@ -14,6 +14,7 @@ Note: Lambda@Edge has limitations:
 
 import json
 import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.config import Config
 
 
@@ -27,6 +28,7 @@ dynamodb_config = Config(
 dynamodb = boto3.resource('dynamodb', config=dynamodb_config)
 
 TABLE_NAME = 'shorlabs-projects'
+SUBDOMAIN_INDEX_NAME = 'subdomain-index'
 RESERVED_SUBDOMAINS = {'www', 'api', 'app', 'admin', 'dashboard', 'docs'}
 
 # Subdomains that should be proxied to external services (not user projects)
@@ -118,19 +120,18 @@ def _lookup_project_by_subdomain(subdomain: str) -> dict | None:
     """
     Look up project by subdomain in DynamoDB.
     
-    Uses a table scan with filter - for production scale, add a GSI on subdomain.
+    Uses a keyed query on the subdomain GSI, so lookup cost stays constant
+    as the projects table grows.
     """
     try:
         table = dynamodb.Table(TABLE_NAME)
         
-        response = table.scan(
-            FilterExpression="subdomain = :sd AND begins_with(SK, :sk_prefix)",
-            ExpressionAttributeValues={
-                ":sd": subdomain,
-                ":sk_prefix": "PROJECT#",
-            },
+        response = table.query(
+            IndexName=SUBDOMAIN_INDEX_NAME,
+            KeyConditionExpression=Key('subdomain').eq(subdomain),
             ProjectionExpression="function_url, subdomain, #st",
             ExpressionAttributeNames={"#st": "status"},
+            Limit=1,
         )
         
         items = response.get('Items', [])
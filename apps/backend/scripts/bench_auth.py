@@ -0,0 +1,71 @@
+"""
+Microbenchmark: per-request cost of the auth dependency.
+
+Signs a Clerk-style RS256 session token with a throwaway key, installs the
+matching JWKS in api.auth's key cache (no network), then times:
+
+1. verify: full RS256 verification on every request (the old behaviour)
+2. cached: get_current_user_id, which verifies once and then serves the
+   payload from the verified-token cache until the token expires
+
+Run (from apps/backend): python -m scripts.bench_auth [--requests 5000]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ISSUER = "https://bench.clerk.accounts.dev"
+os.environ["CLERK_ISSUER"] = ISSUER
+
+from api import auth  # noqa: E402  (reads CLERK_ISSUER at import)
+
+
+def make_token_and_jwks() -> tuple:
+    """Create a signed session token and the JWKS that verifies it."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "bench", "use": "sig", "alg": "RS256"})
+
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "user_bench", "iss": ISSUER, "iat": now, "nbf": now, "exp": now + 3600},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+    return token, {"keys": [jwk]}
+
+
+def time_calls(func, arg, requests: int) -> float:
+    """Average microseconds per call of func(arg)."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        func(arg)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000, help="calls per mode")
+    args = parser.parse_args()
+
+    token, jwks = make_token_and_jwks()
+    auth.jwks_cache.load(jwks)
+    header = f"Bearer {token}"
+
+    print(f"🔬 {args.requests} calls per mode\n")
+    verify_us = time_calls(auth._decode_clerk_token, token, args.requests)
+    print(f"verify   {verify_us:9.1f} µs/request")
+    cached_us = time_calls(auth.get_current_user_id, header, args.requests)
+    print(f"cached   {cached_us:9.1f} µs/request")
+    print(f"\n✅ {verify_us / cached_us:.0f}x faster per request; cache {auth.get_auth_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
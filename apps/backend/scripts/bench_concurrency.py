@@ -0,0 +1,129 @@
+"""
+Benchmark: API throughput under concurrent requests when storage is slow.
+
+Serves api.main:app in-process (httpx over ASGI, auth bypassed) on the
+in-memory storage backend, with every storage call made to block for
+--latency-ms first, the way a boto3 round trip blocks its thread. It then
+sends the same project details request (two storage calls) at increasing
+concurrency and reports requests per second.
+
+Storage calls are offloaded to the I/O pool (api.db.aio), so while one
+request waits on storage the event loop serves the others: throughput should
+grow with concurrency up to the pool size (IO_EXECUTOR_WORKERS). If a route
+blocked the loop instead, every level would run at the serial rate. The
+script fails when throughput at a concurrency level is below half of what
+perfect scaling from the serial rate would give.
+
+Run (from apps/backend): python -m scripts.bench_concurrency [--latency-ms 20] [--concurrency 1,4,16,32]
+"""
+
+import argparse
+import asyncio
+import functools
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+# Must be set before the API modules are imported
+os.environ["STORAGE_BACKEND"] = "memory"
+
+ORG_ID = "org_bench"
+USER_ID = "user_bench"
+
+
+def inject_latency(latency: float) -> None:
+    """Make every operation bound in api.db.storage block for `latency` seconds first."""
+    from api.db import storage
+
+    def slow(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            time.sleep(latency)
+            return func(*args, **kwargs)
+        return wrapper
+
+    for op in storage.OPERATIONS:
+        setattr(storage, op, slow(getattr(storage, op)))
+
+
+async def run_level(client, path: str, concurrency: int, requests: int) -> float:
+    """Send `requests` requests with `concurrency` in flight; returns requests per second."""
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            response = await client.get(path, params={"org_id": ORG_ID})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def bench(args, concurrency_levels: list) -> dict:
+    """Run every concurrency level against the app; returns {concurrency: requests per second}."""
+    import httpx
+
+    from api.auth import get_current_user_id
+    from api.db import memory
+    from api.main import app
+
+    project = memory.create_project(
+        USER_ID, ORG_ID, "bench", "https://github.com/octo/bench", "octo/bench"
+    )
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    path = f"/api/projects/{project['project_id']}"
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path, params={"org_id": ORG_ID})  # warm up
+        for concurrency in concurrency_levels:
+            requests = max(args.requests, 8 * concurrency)
+            results[concurrency] = await run_level(client, path, concurrency, requests)
+    return results
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=20, help="injected latency per storage call")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="requests in flight")
+    parser.add_argument("--requests", type=int, default=64, help="requests per level (at least 8 per request in flight)")
+    args = parser.parse_args()
+    concurrency_levels = sorted(int(c) for c in args.concurrency.split(","))
+
+    from api.concurrency import IO_EXECUTOR_WORKERS
+
+    # api.db.aio binds the storage functions when imported, so this must run
+    # before the API is imported
+    inject_latency(args.latency_ms / 1000)
+
+    print(
+        f"🔬 Project details at {args.latency_ms:g} ms per storage call, "
+        f"{IO_EXECUTOR_WORKERS} I/O workers\n"
+    )
+    print(f"{'concurrency':>11} {'req/s':>8} {'speedup':>8} {'ideal':>6}")
+    # Keep the per-request timing log lines out of the report
+    with redirect_stdout(io.StringIO()):
+        results = asyncio.run(bench(args, concurrency_levels))
+
+    serial = results[concurrency_levels[0]] / concurrency_levels[0]
+    failed = []
+    for concurrency, rate in results.items():
+        ideal = min(concurrency, IO_EXECUTOR_WORKERS)
+        speedup = rate / serial
+        print(f"{concurrency:>11} {rate:8.1f} {speedup:7.1f}x {ideal:5d}x")
+        if speedup < ideal / 2:
+            failed.append(concurrency)
+
+    if failed:
+        print(f"\n❌ Throughput does not scale at concurrency {', '.join(map(str, failed))}")
+        sys.exit(1)
+    print(f"\n✅ Throughput scales with concurrency up to {IO_EXECUTOR_WORKERS} I/O workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: sequential vs parallel deploy stages.
+
+Runs deployer.orchestrator.deploy_project end to end with every AWS and
+GitHub step replaced by a fake that sleeps for a typical latency (no network,
+no AWS account), then compares:
+
+1. sequential: one stage at a time, as deploy_project used to run
+2. parallel: the stage graph, where runtime detection, ECR and the IAM
+   roles overlap
+
+and prints each stage's timings plus the critical path the graph implies.
+The build itself is modelled as a short fixed wait (--build-seconds); in
+production it dominates, and the saving is the setup time taken off either
+side of it.
+
+Run (from apps/backend): python -m scripts.bench_deploy_stages [--build-seconds 2]
+"""
+
+import argparse
+import functools
+import threading
+import time
+
+from deployer import orchestrator, stages
+
+# Simulated latencies in seconds: round trips each step makes
+GITHUB_RTT = 0.12
+AWS_RTT = 0.08
+
+FAKE_LATENCIES = {
+    # Up to 5 HEAD requests for package.json / requirements.txt / ...
+    "detect_runtime_from_github": 5 * GITHUB_RTT,
+    # DescribeRepositories
+    "create_ecr_repository": 1 * AWS_RTT,
+    # GetRole
+    "get_or_create_codebuild_role": 1 * AWS_RTT,
+    # GetRole + 7 AttachRolePolicy
+    "get_or_create_lambda_role": 8 * AWS_RTT,
+    # BatchGetProjects + UpdateProject
+    "create_or_update_codebuild_project": 2 * AWS_RTT,
+    # GetCallerIdentity + StartBuild
+    "start_build": 2 * AWS_RTT,
+    # DescribeImages
+    "get_image_digest": 1 * AWS_RTT,
+    # GetFunction, UpdateFunctionCode, waiter, UpdateFunctionConfiguration
+    "update_lambda_function": 5 * AWS_RTT,
+    # GetFunctionUrlConfig
+    "get_or_create_function_url": 1 * AWS_RTT,
+}
+
+
+def install_fakes(build_seconds: float) -> None:
+    """Replace the orchestrator's AWS/GitHub steps with latency-injected fakes."""
+    def fake(name, result):
+        def step(*args, **kwargs):
+            time.sleep(FAKE_LATENCIES[name])
+            return result
+        return step
+
+    orchestrator.detect_runtime_from_github = fake("detect_runtime_from_github", "python")
+    orchestrator.create_ecr_repository = fake(
+        "create_ecr_repository", "123456789012.dkr.ecr.us-east-1.amazonaws.com/shorlabs-bench"
+    )
+    orchestrator.get_or_create_codebuild_role = fake("get_or_create_codebuild_role", "arn:aws:iam::role/cb")
+    orchestrator.get_or_create_lambda_role = fake("get_or_create_lambda_role", "arn:aws:iam::role/lambda")
+    orchestrator.create_or_update_codebuild_project = fake("create_or_update_codebuild_project", None)
+    orchestrator.start_build = fake("start_build", "shorlabs-builder:bench")
+    orchestrator.get_image_digest = fake("get_image_digest", "sha256:bench")
+    orchestrator.update_lambda_function = fake("update_lambda_function", None)
+    orchestrator.get_or_create_function_url = fake("get_or_create_function_url", "https://bench.lambda-url.aws")
+
+    def wait_for_build(build_id):
+        time.sleep(build_seconds)
+        return True
+
+    orchestrator.wait_for_build = wait_for_build
+
+
+class StageTimings:
+    """Stage listener collecting durations."""
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, seconds: float, succeeded: bool) -> None:
+        with self._lock:
+            self.durations[stage] = seconds
+
+
+def deploy(max_workers: int, timings: StageTimings) -> float:
+    """Run one fake deployment; returns wall-clock seconds."""
+    orchestrator.run_stages = functools.partial(stages.run_stages, max_workers=max_workers)
+    timings.durations.clear()
+    start = time.perf_counter()
+    orchestrator.deploy_project(
+        github_url="https://github.com/octo/bench-app",
+        github_token="bench",
+        project_id="bench0000",
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--build-seconds", type=float, default=2.0, help="simulated image build")
+    args = parser.parse_args()
+
+    install_fakes(args.build_seconds)
+    timings = StageTimings()
+    stages.add_stage_listener(timings)
+
+    sequential = deploy(1, timings)
+    sequential_stages = dict(timings.durations)
+    parallel = deploy(stages.MAX_PARALLEL_STAGES, timings)
+
+    print(f"\n🔬 Fake deployment, build {args.build_seconds:g} s\n")
+    print(f"{'stage':<20} {'sequential':>11} {'parallel':>9}")
+    for name, seconds in sequential_stages.items():
+        print(f"{name:<20} {seconds:10.2f}s {timings.durations.get(name, 0):8.2f}s")
+
+    setup_before = sequential - args.build_seconds
+    setup_after = parallel - args.build_seconds
+    print(f"\nsequential {sequential:6.2f} s   (setup outside the build: {setup_before:.2f} s)")
+    print(f"parallel   {parallel:6.2f} s   (setup outside the build: {setup_after:.2f} s)")
+    print(f"\n✅ Critical path {sequential - parallel:.2f} s shorter ({(sequential - parallel) / sequential:.0%})")
+
+
+if __name__ == "__main__":
+    main()
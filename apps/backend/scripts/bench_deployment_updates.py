@@ -0,0 +1,113 @@
+"""
+Benchmark: cost of addressing one deployment as a project's history grows.
+
+Runs the DynamoDB storage backend against DynamoDB Local (see
+scripts.dynamodb_local). One project's deployment history is grown in steps,
+10 -> 10k deployments by default, and at every size it times:
+
+1. update: update_deployment by deploy_id alone (the deployer's status
+   writes; resolves the key through the deploy-id index, then UpdateItem)
+2. get: get_deployment of the project's oldest deployment (log views)
+
+with the DynamoDB calls and capacity units each one costs. Both address the
+deployment by key, so neither may grow with the history; the script fails
+otherwise.
+
+Run (from apps/backend): python -m scripts.bench_deployment_updates [--sizes 10,100,1000,10000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from scripts.dynamodb_local import (
+    DEFAULT_ENDPOINT,
+    consumed_capacity,
+    dynamodb_calls,
+    fresh_tables,
+    use_dynamodb_local,
+)
+
+ORG_ID = "org_bench"
+
+
+def grow_history(project_id: str, count: int) -> list:
+    """Write `count` more deployments for a project; returns their deploy ids."""
+    from api.db import dynamodb
+    from api.db.common import build_deployment_item
+
+    deploy_ids = []
+    with dynamodb.get_deployments_table().batch_writer() as batch:
+        for _ in range(count):
+            item = build_deployment_item(project_id, "shorlabs-builder:bench", ORG_ID)
+            item.update(status="SUCCEEDED", phase="DONE")
+            batch.put_item(Item=item)
+            deploy_ids.append(item["deploy_id"])
+    return deploy_ids
+
+
+def measure(operation, repeat: int) -> tuple:
+    """Run `operation` `repeat` times; returns (latencies in ms, calls per run, capacity units per run)."""
+    from api.timing import recording
+
+    latencies = []
+    units_before = consumed_capacity.units
+    with recording() as timings:
+        for i in range(repeat):
+            start = time.perf_counter()
+            operation(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+    calls = sum(dynamodb_calls(timings).values()) / repeat
+    return latencies, calls, (consumed_capacity.units - units_before) / repeat
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT, help="DynamoDB Local endpoint")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="history sizes (deployments)")
+    parser.add_argument("--repeat", type=int, default=20, help="operations timed per size")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    use_dynamodb_local(args.endpoint)
+    from api.db import dynamodb
+
+    fresh_tables()
+    project_id = "bench_history"
+    print(f"🔬 Deployment updates on {args.endpoint}, {args.repeat} operations per size\n")
+    print(f"{'history':>8} {'op':<7} {'p50':>8} {'p95':>8} {'calls':>6} {'capacity':>9}")
+
+    deploy_ids = []
+    results = {}
+    for size in sizes:
+        deploy_ids += grow_history(project_id, size - len(deploy_ids))
+        newest, oldest = deploy_ids[-1], deploy_ids[0]
+
+        updated = measure(
+            lambda i: dynamodb.update_deployment(project_id, newest, {"logs_url": f"https://logs/{i}"}),
+            args.repeat,
+        )
+        fetched = measure(lambda i: dynamodb.get_deployment(project_id, oldest), args.repeat)
+        results[size] = {"update": updated, "get": fetched}
+        for name, (latencies, calls, units) in results[size].items():
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(
+                f"{size:>8} {name:<7} {statistics.median(latencies):6.1f}ms {p95:6.1f}ms "
+                f"{calls:6g} {units:8.2f}u"
+            )
+
+    failed = False
+    for name in ("update", "get"):
+        first, last = results[sizes[0]][name], results[sizes[-1]][name]
+        if last[1] > first[1] or last[2] > 2 * first[2]:
+            failed = True
+            print(f"\n❌ {name} costs more with {sizes[-1]} deployments than with {sizes[0]}")
+    if failed:
+        sys.exit(1)
+    print(f"\n✅ Constant calls and capacity per operation from {sizes[0]} to {sizes[-1]} deployments")
+
+
+if __name__ == "__main__":
+    main()
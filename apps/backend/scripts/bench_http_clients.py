@@ -0,0 +1,167 @@
+"""
+Benchmark: per-call httpx clients vs the shared pooled clients.
+
+Starts a local TLS server standing in for GitHub/Autumn, then times the
+same sequence of GET requests made two ways:
+
+1. per-call: a new httpx.AsyncClient for every request (the old pattern),
+   so each call pays a TCP connect and a TLS handshake
+2. pooled: one long-lived client configured like api.http_clients, so
+   calls after the first reuse a kept-alive connection
+
+The stand-in server can add simulated network round trips (--rtt-ms) to
+approximate the distance to a real API; the handshake costs more round
+trips than a request on a warm connection, which is what pooling saves.
+
+Run (from apps/backend): python -m scripts.bench_http_clients [--requests 200] [--rtt-ms 20]
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import ssl
+import statistics
+import tempfile
+import time
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from api.http_clients import client_options
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 2\r\n"
+    b"\r\n"
+    b"{}"
+)
+
+
+def write_self_signed_cert(directory: str) -> tuple:
+    """Write a self-signed certificate for localhost; returns (cert, key) paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([
+                x509.DNSName("localhost"),
+                x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+            ]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+async def start_stand_in_server(cert_path: str, key_path: str, rtt: float):
+    """
+    Start a minimal keep-alive HTTPS server on 127.0.0.1.
+
+    Each new connection is delayed by two round trips (TCP + TLS handshake)
+    and each response by one.
+    """
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    context.set_alpn_protocols(["http/1.1"])
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await asyncio.sleep(2 * rtt)
+        try:
+            while True:
+                try:
+                    await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                await asyncio.sleep(rtt)
+                writer.write(RESPONSE)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+
+
+async def time_requests(url: str, requests: int, get) -> list:
+    """Time `requests` sequential calls of get(url); returns latencies in ms."""
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await get(url)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(label: str, latencies: list) -> float:
+    """Print latency stats for a run; returns the mean."""
+    ordered = sorted(latencies)
+    mean = statistics.mean(ordered)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<10} mean {mean:7.2f} ms   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+    return mean
+
+
+async def run(requests: int, rtt_ms: float) -> None:
+    """Run both modes against the stand-in server and print the comparison."""
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        server = await start_stand_in_server(cert_path, key_path, rtt_ms / 1000)
+        port = server.sockets[0].getsockname()[1]
+        url = f"https://localhost:{port}/repos/octo/app/contents/main.py"
+        verify = ssl.create_default_context(cafile=cert_path)
+        options = dict(client_options("github"), verify=verify)
+
+        async def per_call_get(url: str) -> httpx.Response:
+            async with httpx.AsyncClient(**options) as client:
+                return await client.get(url)
+
+        print(f"🔬 {requests} sequential GETs, simulated RTT {rtt_ms:g} ms\n")
+        per_call = summarize("per-call", await time_requests(url, requests, per_call_get))
+        async with httpx.AsyncClient(**options) as client:
+            pooled = summarize("pooled", await time_requests(url, requests, client.get))
+
+        saved = per_call - pooled
+        print(f"\n✅ Pooling saves {saved:.2f} ms per call ({saved / per_call:.0%})")
+
+        server.close()
+        await server.wait_closed()
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per mode")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="simulated network round trip")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rtt_ms))
+
+
+if __name__ == "__main__":
+    main()
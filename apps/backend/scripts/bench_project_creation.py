@@ -0,0 +1,136 @@
+"""
+Benchmark: project creation and subdomain lookup as the projects table grows.
+
+Runs the DynamoDB storage backend against DynamoDB Local (see
+scripts.dynamodb_local). The table is seeded in steps, 100 -> 100k projects
+by default, each with its subdomain claim and CONFIG# item; at every size it
+times:
+
+1. create: create_project for projects that all want the same name, so
+   every creation after the first also resolves subdomain collisions
+2. lookup: get_project_by_subdomain for random seeded subdomains
+
+and counts the DynamoDB calls each one makes. Subdomains resolve through the
+subdomain index and claim items, so the calls per operation must not grow
+with the table and no Scan may appear; the script fails otherwise. Latency
+should stay flat too, though on DynamoDB Local it also depends on the
+machine.
+
+Run (from apps/backend): python -m scripts.bench_project_creation [--sizes 100,1000,10000,100000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from scripts.dynamodb_local import DEFAULT_ENDPOINT, dynamodb_calls, fresh_tables, use_dynamodb_local
+
+# Organizations the seeded projects are spread over
+SEED_ORGS = 100
+
+
+def seed(start: int, stop: int) -> None:
+    """Write projects seed-<start>..seed-<stop - 1> the way create_project stores them."""
+    from api.db import dynamodb
+    from api.db.common import build_project_item, build_subdomain_claim, project_config_key, split_project_fields
+
+    with dynamodb.get_projects_table().batch_writer() as batch:
+        for i in range(start, stop):
+            org_id = f"org_seed_{i % SEED_ORGS}"
+            item = build_project_item(
+                project_id=f"seed{i:08d}",
+                user_id="user_seed",
+                organization_id=org_id,
+                name=f"seed-{i}",
+                github_url=f"https://github.com/seed/seed-{i}",
+                github_repo=f"seed/seed-{i}",
+                env_vars=None,
+                root_directory="./",
+                start_command="uvicorn main:app --host 0.0.0.0 --port 8080",
+                subdomain=f"seed-{i}",
+                memory=1024,
+                timeout=30,
+                ephemeral_storage=512,
+            )
+            hot, config = split_project_fields(item)
+            batch.put_item(Item=hot)
+            batch.put_item(Item=dict(project_config_key(org_id, item["project_id"]), **config))
+            batch.put_item(Item=build_subdomain_claim(f"seed-{i}", item["project_id"]))
+
+
+def measure(operation, repeat: int) -> tuple:
+    """Run `operation` `repeat` times; returns (latencies in ms, DynamoDB calls per run)."""
+    from api.timing import recording
+
+    latencies = []
+    with recording() as timings:
+        for i in range(repeat):
+            start = time.perf_counter()
+            operation(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+    calls = {op: count / repeat for op, count in dynamodb_calls(timings).items()}
+    return latencies, calls
+
+
+def format_calls(calls: dict) -> str:
+    """Render call counts as `Op n, Op n`."""
+    return ", ".join(f"{op} {count:g}" for op, count in sorted(calls.items()))
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT, help="DynamoDB Local endpoint")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="table sizes (projects)")
+    parser.add_argument("--repeat", type=int, default=20, help="operations timed per size")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    use_dynamodb_local(args.endpoint)
+    from api.db import dynamodb
+
+    fresh_tables()
+    print(f"🔬 Project creation on {args.endpoint}, {args.repeat} operations per size\n")
+    print(f"{'projects':>9} {'op':<7} {'p50':>8} {'p95':>8}  DynamoDB calls per op")
+
+    seeded = 0
+    results = {}
+    for size in sizes:
+        seed(seeded, size)
+        seeded = size
+
+        created = measure(
+            lambda i: dynamodb.create_project(
+                "user_bench", "org_bench", "app", "https://github.com/bench/app", "bench/app"
+            ),
+            args.repeat,
+        )
+        looked_up = measure(
+            lambda i: dynamodb.get_project_by_subdomain(f"seed-{random.randrange(size)}"),
+            args.repeat,
+        )
+        results[size] = (created, looked_up)
+        for name, (latencies, calls) in (("create", created), ("lookup", looked_up)):
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(f"{size:>9} {name:<7} {statistics.median(latencies):6.1f}ms {p95:6.1f}ms  {format_calls(calls)}")
+
+    failed = False
+    for name, index in (("create", 0), ("lookup", 1)):
+        calls = [results[size][index][1] for size in sizes]
+        if any("Scan" in c for c in calls):
+            failed = True
+            print(f"\n❌ {name} scans the table")
+        # Creation retries on a collision, so its calls depend on how many "app"
+        # projects exist (same at every size), not on the table size
+        if max(sum(c.values()) for c in calls) > 2 * min(sum(c.values()) for c in calls):
+            failed = True
+            print(f"\n❌ {name} makes more DynamoDB calls as the table grows")
+    if failed:
+        sys.exit(1)
+    print(f"\n✅ Calls per operation stay flat from {sizes[0]} to {sizes[-1]} projects, no scans")
+
+
+if __name__ == "__main__":
+    main()
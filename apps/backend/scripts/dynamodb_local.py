@@ -0,0 +1,91 @@
+"""
+Point the DynamoDB storage backend at DynamoDB Local, for the scripts that
+measure it.
+
+Start DynamoDB Local first:
+
+    docker run --rm -p 8000:8000 amazon/dynamodb-local -jar DynamoDBLocal.jar -inMemory
+
+The scripts work on their own tables (shorlabs-bench-*), created with the
+provisioning command, and count DynamoDB calls with the same botocore hooks
+that time API requests (api.timing). `consumed_capacity` adds up the
+capacity units DynamoDB reports for every call.
+"""
+
+import os
+
+# DynamoDB Local endpoint (boto3 reads AWS_ENDPOINT_URL_DYNAMODB)
+DEFAULT_ENDPOINT = os.environ.get("AWS_ENDPOINT_URL_DYNAMODB", "http://localhost:8000")
+
+BENCH_TABLES = {
+    "DYNAMODB_TABLE": "shorlabs-bench-projects",
+    "DEPLOYMENTS_TABLE": "shorlabs-bench-deployments",
+}
+
+
+class ConsumedCapacity:
+    """Capacity units DynamoDB reports for each call (ReturnConsumedCapacity=TOTAL)."""
+
+    def __init__(self):
+        self.units = 0.0
+
+    def install(self) -> None:
+        """Register the hooks (before the first boto3 client is created)."""
+        import boto3
+
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+        events = boto3.DEFAULT_SESSION.events
+        events.register("provide-client-params.dynamodb", self._request, unique_id="shorlabs-capacity-request")
+        events.register("after-call.dynamodb", self._response, unique_id="shorlabs-capacity-response")
+
+    def _request(self, params, model, **kwargs) -> None:
+        if "ReturnConsumedCapacity" in model.input_shape.members:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def _response(self, parsed, **kwargs) -> None:
+        consumed = parsed.get("ConsumedCapacity") or []
+        for entry in consumed if isinstance(consumed, list) else [consumed]:
+            self.units += float(entry.get("CapacityUnits", 0))
+
+
+consumed_capacity = ConsumedCapacity()
+
+
+def use_dynamodb_local(endpoint: str = DEFAULT_ENDPOINT) -> None:
+    """Configure the DynamoDB backend for DynamoDB Local (before api.db is imported)."""
+    os.environ["STORAGE_BACKEND"] = "dynamodb"
+    os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = endpoint
+    os.environ.update(BENCH_TABLES)
+    # DynamoDB Local accepts any credentials, but boto3 needs some
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+
+    from api.timing import install_botocore_hooks
+
+    install_botocore_hooks()
+    consumed_capacity.install()
+
+
+def fresh_tables() -> None:
+    """Drop the bench tables left by an earlier run and provision empty ones."""
+    from api.db import dynamodb
+
+    client = dynamodb.get_dynamodb_resource().meta.client
+    for table_name in BENCH_TABLES.values():
+        try:
+            client.delete_table(TableName=table_name)
+            client.get_waiter("table_not_exists").wait(TableName=table_name)
+        except client.exceptions.ResourceNotFoundException:
+            pass
+    dynamodb.provision_tables()
+
+
+def dynamodb_calls(timings) -> dict:
+    """DynamoDB call counts by operation, from an api.timing recorder."""
+    return {
+        name.split(".", 1)[1]: entry["count"]
+        for name, entry in timings.by_operation().items()
+        if name.startswith("dynamodb.")
+    }
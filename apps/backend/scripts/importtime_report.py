@@ -0,0 +1,140 @@
+"""
+Cold-start report: how long importing the API takes, and what it pulls in.
+
+Imports `api.main` in a fresh interpreter under `python -X importtime` (the
+same work the Lambda container does during init, before the first request)
+and prints the modules `api.main` imports directly, slowest first by
+cumulative time, then the slowest modules at any depth by self time. Fails
+when:
+
+1. the total import time exceeds the budget (--budget-ms, or IMPORT_BUDGET_MS)
+2. a module that only specific routes need is imported at startup (the
+   deployer, GitPython, requests, Mangum); those routes import them lazily
+
+Run (from apps/backend): python -m scripts.importtime_report [--top 20] [--budget-ms 1500]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+# Import-time budget for `import api.main`, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "1500"))
+
+# Modules that must not be imported while the API starts
+FORBIDDEN_AT_STARTUP = (
+    "deployer.orchestrator",
+    "deployer.aws.cloudwatch",
+    "git",
+    "requests",
+    "mangum",
+)
+
+ImportTiming = namedtuple("ImportTiming", ["module", "self_us", "cumulative_us", "depth"])
+
+
+def run_importtime(module: str) -> list:
+    """Import `module` in a fresh interpreter with -X importtime; returns the timings."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Parse -X importtime output.
+
+    Lines look like `import time:   self [us] | cumulative | imported package`,
+    with the package name indented two spaces per nesting level.
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return timings
+
+
+def children_of(timings: list, module: str) -> list:
+    """
+    The modules `module` imported directly (one level down in its subtree).
+
+    -X importtime prints a module after everything it imports, so the
+    subtree is the run of deeper lines just before the module's own line.
+    """
+    for index, parent in enumerate(timings):
+        if parent.module == module:
+            break
+    else:
+        return []
+    children = []
+    for t in reversed(timings[:index]):
+        if t.depth <= parent.depth:
+            break
+        if t.depth == parent.depth + 1:
+            children.append(t)
+    return children
+
+
+def print_timings(title: str, timings: list) -> None:
+    """Print a table of timings."""
+    print(f"\n{title}")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for t in timings:
+        print(f"{t.cumulative_us / 1000:9.1f} ms {t.self_us / 1000:7.1f} ms  {t.module}")
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="api.main", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="imports to list")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="fail above this")
+    args = parser.parse_args()
+
+    timings = run_importtime(args.module)
+    total_ms = sum(t.self_us for t in timings) / 1000
+
+    print(f"🔬 import {args.module}: {total_ms:.0f} ms across {len(timings)} modules")
+    # Direct imports carry their whole subtree in cumulative time: where the time goes
+    children = sorted(children_of(timings, args.module), key=lambda t: t.cumulative_us, reverse=True)
+    print_timings(f"Imported directly by {args.module}, by cumulative time:", children[:args.top])
+    # Self time at any depth: which single modules are expensive to execute
+    slowest = sorted(timings, key=lambda t: t.self_us, reverse=True)
+    print_timings("Slowest modules at any depth, by self time:", slowest[:args.top])
+
+    failed = False
+    imported = {t.module for t in timings}
+    forbidden = [m for m in FORBIDDEN_AT_STARTUP if m in imported]
+    if forbidden:
+        failed = True
+        print(f"\n❌ Imported at startup (should be lazy): {', '.join(forbidden)}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"\n❌ Import time {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if failed:
+        sys.exit(1)
+    print(f"\n✅ Within the {args.budget_ms:.0f} ms budget ({args.budget_ms - total_ms:.0f} ms to spare)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Load test: api.main:app on the in-memory storage backend, no AWS needed.
+
+Serves the app in-process (httpx over ASGI, auth bypassed), seeds one
+organization with projects and deployments, then keeps --concurrency
+requests in flight for --duration seconds, cycling through the dashboard's
+hot read paths:
+
+1. list: GET /api/projects?limit=20 (first page of the project list)
+2. details: GET /api/projects/{id} (project, config and latest deployments)
+3. status: GET /api/projects/{id}/status (the dashboard's polling endpoint)
+4. deployments: GET /api/deployments (the org's deployment feed)
+
+It reports requests per second overall and latency percentiles per path.
+The load generator shares the process with the app, so the figures are a
+lower bound on what a dedicated worker serves. With --profile the run is
+profiled (event loop thread: routing, middleware, validation and
+serialization) and the costliest functions are printed. Fails on any error
+response, or when throughput is below --min-rps.
+
+Run (from apps/backend): python -m scripts.load_test [--duration 10] [--concurrency 32] [--profile]
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+
+# Must be set before the API modules are imported
+os.environ["STORAGE_BACKEND"] = "memory"
+# Per-request timing log lines would dominate the run
+os.environ.setdefault("SERVER_TIMING_SAMPLE_RATE", "0")
+
+ORG_ID = "org_load"
+USER_ID = "user_load"
+
+
+def seed(projects: int, deployments: int) -> list:
+    """Create `projects` projects with `deployments` deployments each; returns their ids."""
+    from api.db import memory
+
+    project_ids = []
+    for i in range(projects):
+        project = memory.create_project(
+            USER_ID, ORG_ID, f"load-{i}", f"https://github.com/octo/load-{i}", f"octo/load-{i}",
+            env_vars={"GREETING": "hi"},
+        )
+        for _ in range(deployments):
+            memory.create_deployment(project["project_id"], "shorlabs-builder:load", ORG_ID)
+        project_ids.append(project["project_id"])
+    return project_ids
+
+
+def request_mix(project_ids: list) -> list:
+    """(label, path, params) for every request the load cycles through."""
+    params = {"org_id": ORG_ID}
+    mix = []
+    for project_id in project_ids:
+        mix += [
+            ("list", "/api/projects", dict(params, limit=20)),
+            ("details", f"/api/projects/{project_id}", params),
+            ("status", f"/api/projects/{project_id}/status", params),
+            ("deployments", "/api/deployments", params),
+        ]
+    return mix
+
+
+async def run_load(client, mix: list, concurrency: int, duration: float) -> tuple:
+    """Keep `concurrency` requests in flight for `duration` seconds; returns (latencies by label, errors)."""
+    latencies = {label: [] for label, _, _ in mix}
+    errors = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            label, path, params = mix[i % len(mix)]
+            i += 1
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies[label].append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors.append(f"{path} returned {response.status_code}")
+
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors
+
+
+async def load(args, profiler=None) -> tuple:
+    """Seed the store and run the load against the app; returns run_load's result."""
+    import httpx
+
+    from api.auth import get_current_user_id
+    from api.main import app
+
+    mix = request_mix(seed(args.projects, args.deployments))
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", limits=limits) as client:
+        await run_load(client, mix, args.concurrency, min(args.duration, 1))  # warm up
+        if profiler:
+            profiler.enable()
+        try:
+            return await run_load(client, mix, args.concurrency, args.duration)
+        finally:
+            if profiler:
+                profiler.disable()
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+    parser.add_argument("--projects", type=int, default=50, help="projects seeded")
+    parser.add_argument("--deployments", type=int, default=20, help="deployments seeded per project")
+    parser.add_argument("--min-rps", type=float, default=0, help="fail below this throughput")
+    parser.add_argument("--profile", action="store_true", help="profile the run")
+    parser.add_argument("--top", type=int, default=25, help="functions listed with --profile")
+    args = parser.parse_args()
+
+    print(
+        f"🔬 Load on api.main:app (memory backend): {args.concurrency} in flight for {args.duration:g}s, "
+        f"{args.projects} projects x {args.deployments} deployments\n"
+    )
+    profiler = cProfile.Profile() if args.profile else None
+    with redirect_stdout(io.StringIO()):
+        latencies, errors = asyncio.run(load(args, profiler))
+
+    total = sum(len(values) for values in latencies.values())
+    rps = total / args.duration
+    print(f"{'path':<12} {'requests':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, values in latencies.items():
+        if len(values) < 2:
+            continue
+        centiles = statistics.quantiles(values, n=100)
+        print(
+            f"{label:<12} {len(values):>9} {statistics.median(values):6.1f}ms "
+            f"{centiles[94]:6.1f}ms {centiles[98]:6.1f}ms"
+        )
+    print(f"\n{total} requests, {rps:.0f} req/s")
+
+    if profiler:
+        print(f"\nTop {args.top} functions by own time:")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("tottime").print_stats(args.top)
+
+    failed = False
+    if errors:
+        failed = True
+        print(f"\n❌ {len(errors)} error responses, first: {errors[0]}")
+    if rps < args.min_rps:
+        failed = True
+        print(f"\n❌ {rps:.0f} req/s is below the {args.min_rps:.0f} req/s minimum")
+    if failed:
+        sys.exit(1)
+    print("\n✅ No errors under load")
+
+
+if __name__ == "__main__":
+    main()
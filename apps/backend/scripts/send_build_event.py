@@ -0,0 +1,78 @@
+"""
+Local stand-in for EventBridge: deliver a CodeBuild build event to the API.
+
+In production, CodeBuild's "Build State Change" events reach /events through
+EventBridge and the build events queue (see setup_build_events.sh), and
+resume the deployment waiting on that build. Locally there is no EventBridge;
+the API polls the build itself (BUILD_EVENTS_ENABLED=false), or, with
+BUILD_EVENTS_ENABLED=true, this script plays EventBridge:
+
+    python -m scripts.send_build_event --build-id shorlabs-builder:<uuid> --status SUCCEEDED
+
+The event is wrapped in an SQS record, as the Lambda Web Adapter delivers it,
+unless --direct is given. Either way it is signed with the EVENTS_SECRET
+environment variable (the API's shared events secret): it does not come
+from one of the API's queues. Sending the same event twice is safe: the
+second delivery is ignored.
+
+Run (from apps/backend): python -m scripts.send_build_event --build-id ID [--status S] [--url URL]
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+import uuid
+
+from api.routes.projects import BUILD_TERMINAL_STATUSES, build_state_change_event
+
+
+def sqs_envelope(body: dict) -> dict:
+    """Wrap an event in a single-record SQS batch."""
+    return {
+        "Records": [{
+            "messageId": str(uuid.uuid4()),
+            "eventSource": "aws:sqs",
+            "body": json.dumps(body),
+        }]
+    }
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--build-id", required=True, help="CodeBuild build id (project:uuid)")
+    parser.add_argument("--status", default="SUCCEEDED", choices=BUILD_TERMINAL_STATUSES)
+    parser.add_argument("--url", default="http://localhost:8000/events", help="API events endpoint")
+    parser.add_argument("--direct", action="store_true", help="send the bare event, not an SQS record")
+    args = parser.parse_args()
+
+    event = build_state_change_event(args.build_id, args.status)
+    payload = event if args.direct else sqs_envelope(event)
+    headers = {
+        "Content-Type": "application/json",
+        "X-Events-Secret": os.environ.get("EVENTS_SECRET", ""),
+    }
+    request = urllib.request.Request(
+        args.url,
+        data=json.dumps(payload).encode(),
+        headers=headers,
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            result = json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        result = {"status": "error", "code": e.code, "message": e.read().decode()}
+
+    print(f"📤 Sent {args.status} for build {args.build_id} to {args.url}")
+    print(f"📥 {result}")
+    if isinstance(result, dict) and (result.get("batchItemFailures") or result.get("status") == "error"):
+        print("❌ The API did not accept the event (it will be retried in production)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
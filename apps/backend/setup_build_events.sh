@@ -0,0 +1,144 @@
+#!/bin/bash
+#
+# Route CodeBuild build completions to the API Lambda
+# EventBridge rule -> SQS queue -> Lambda; the API finishes the deployment
+# (Lambda rollout) when the build event arrives instead of polling CodeBuild
+#
+
+set -e
+
+# Load environment variables from .env file
+if [ -f .env ]; then
+    export $(cat .env | grep -v '^#' | xargs)
+    echo "✅ Loaded AWS credentials from .env"
+else
+    echo "❌ .env file not found!"
+    exit 1
+fi
+
+REGION="${AWS_DEFAULT_REGION:-us-east-1}"
+FUNCTION_NAME="shorlabs-api"
+CODEBUILD_PROJECT="shorlabs-builder"
+RULE_NAME="shorlabs-build-state-change"
+QUEUE_NAME="shorlabs-build-events"
+DLQ_NAME="shorlabs-build-events-dlq"
+
+echo "🔧 Setting up build completion events..."
+echo "   Region: $REGION"
+echo "   Function: $FUNCTION_NAME"
+echo "   CodeBuild project: $CODEBUILD_PROJECT"
+
+# Dead letter queue for events that keep failing
+DLQ_URL=$(aws sqs create-queue \
+  --queue-name "$DLQ_NAME" \
+  --attributes '{"MessageRetentionPeriod": "1209600"}' \
+  --region "$REGION" \
+  --query 'QueueUrl' \
+  --output text)
+
+DLQ_ARN=$(aws sqs get-queue-attributes \
+  --queue-url "$DLQ_URL" \
+  --attribute-names QueueArn \
+  --region "$REGION" \
+  --query 'Attributes.QueueArn' \
+  --output text)
+
+# Build events queue (standard: events for different builds are independent,
+# duplicates are dropped by the deployment's BUILD -> ROLLOUT condition)
+echo "📬 Creating build events queue..."
+QUEUE_URL=$(aws sqs create-queue \
+  --queue-name "$QUEUE_NAME" \
+  --attributes "{
+    \"VisibilityTimeout\": \"900\",
+    \"MessageRetentionPeriod\": \"86400\",
+    \"RedrivePolicy\": \"{\\\"deadLetterTargetArn\\\":\\\"$DLQ_ARN\\\",\\\"maxReceiveCount\\\":5}\"
+  }" \
+  --region "$REGION" \
+  --query 'QueueUrl' \
+  --output text)
+
+QUEUE_ARN=$(aws sqs get-queue-attributes \
+  --queue-url "$QUEUE_URL" \
+  --attribute-names QueueArn \
+  --region "$REGION" \
+  --query 'Attributes.QueueArn' \
+  --output text)
+
+echo "✅ Queue ready: $QUEUE_URL"
+
+# Create EventBridge rule matching finished builds of the builder project
+echo "📅 Creating EventBridge rule..."
+aws events put-rule \
+  --name "$RULE_NAME" \
+  --description "Forward finished Shorlabs builds to the API" \
+  --event-pattern "{
+    \"source\": [\"aws.codebuild\"],
+    \"detail-type\": [\"CodeBuild Build State Change\"],
+    \"detail\": {
+      \"project-name\": [\"$CODEBUILD_PROJECT\"],
+      \"build-status\": [\"SUCCEEDED\", \"FAILED\", \"FAULT\", \"STOPPED\", \"TIMED_OUT\"]
+    }
+  }" \
+  --state ENABLED \
+  --region "$REGION" \
+  > /dev/null
+
+RULE_ARN=$(aws events describe-rule \
+  --name "$RULE_NAME" \
+  --region "$REGION" \
+  --query 'Arn' \
+  --output text)
+
+echo "✅ EventBridge rule created: $RULE_NAME"
+
+# Allow the rule to send to the queue
+echo "🔐 Allowing EventBridge to send to the queue..."
+POLICY="{
+  \"Version\": \"2012-10-17\",
+  \"Statement\": [{
+    \"Effect\": \"Allow\",
+    \"Principal\": {\"Service\": \"events.amazonaws.com\"},
+    \"Action\": \"sqs:SendMessage\",
+    \"Resource\": \"$QUEUE_ARN\",
+    \"Condition\": {\"ArnEquals\": {\"aws:SourceArn\": \"$RULE_ARN\"}}
+  }]
+}"
+aws sqs set-queue-attributes \
+  --queue-url "$QUEUE_URL" \
+  --attributes "{\"Policy\": $(echo "$POLICY" | python3 -c 'import json,sys; print(json.dumps(sys.stdin.read()))')}" \
+  --region "$REGION"
+
+echo "🎯 Adding queue as EventBridge target..."
+aws events put-targets \
+  --rule "$RULE_NAME" \
+  --targets "Id=1,Arn=$QUEUE_ARN" \
+  --region "$REGION" \
+  > /dev/null
+
+# Deliver the queue to the Lambda
+echo "🔗 Connecting queue to Lambda..."
+EXISTING_MAPPING=$(aws lambda list-event-source-mappings \
+  --function-name "$FUNCTION_NAME" \
+  --event-source-arn "$QUEUE_ARN" \
+  --region "$REGION" \
+  --query 'EventSourceMappings[0].UUID' \
+  --output text 2>/dev/null)
+
+if [ "$EXISTING_MAPPING" == "None" ] || [ -z "$EXISTING_MAPPING" ]; then
+  aws lambda create-event-source-mapping \
+    --function-name "$FUNCTION_NAME" \
+    --event-source-arn "$QUEUE_ARN" \
+    --batch-size 1 \
+    --function-response-types ReportBatchItemFailures \
+    --region "$REGION" \
+    > /dev/null
+else
+  echo "   (Trigger already exists: $EXISTING_MAPPING)"
+fi
+
+echo ""
+echo "✅ Build completion events configured successfully!"
+echo ""
+echo "Deployments now finish when CodeBuild reports the build done."
+echo "To replay a build event locally:"
+echo "  python -m scripts.send_build_event --build-id $CODEBUILD_PROJECT:<uuid> --status SUCCEEDED"
@@ -0,0 +1,44 @@
+"""
+Shared fixtures: the API on the in-memory storage backend, no AWS needed.
+
+Run (from apps/backend): python -m pytest -q
+"""
+
+import os
+
+# Must be set before the API modules are imported
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("BUILD_EVENTS_ENABLED", "true")
+
+import pytest
+
+from api.db import memory
+
+
+@pytest.fixture(autouse=True)
+def storage():
+    """A fresh in-memory store for every test."""
+    memory.reset()
+    yield memory
+    memory.reset()
+
+
+@pytest.fixture
+def client():
+    """TestClient signed in as "user_test" (the lifespan, and its JWKS fetch, is not run)."""
+    from fastapi.testclient import TestClient
+
+    from api.auth import get_current_user_id
+    from api.main import app
+
+    app.dependency_overrides[get_current_user_id] = lambda: "user_test"
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def project(storage):
+    """A project of org "org_test"."""
+    return storage.create_project(
+        "user_test", "org_test", "demo", "https://github.com/octo/demo", "octo/demo",
+    )
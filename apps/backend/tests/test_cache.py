@@ -0,0 +1,69 @@
+"""In-process caches: TTLCache and the DynamoDB backend's project cache."""
+
+import pytest
+
+from api.cache import TTLCache
+
+
+def test_load_finishing_after_an_invalidation_is_not_cached():
+    cache = TTLCache()
+    generation = cache.generation()  # a read starts...
+    cache.invalidate("p1")  # ...a write lands...
+    cache.set("p1", "old", generation=generation)  # ...the read finishes with the old item
+
+    assert cache.get("p1") is None
+
+
+def test_load_started_after_an_invalidation_is_cached():
+    cache = TTLCache()
+    cache.invalidate("p1")
+    generation = cache.generation()
+    cache.invalidate("p2")
+    cache.set("p1", "new", generation=generation)
+
+    assert cache.get("p1") == "new"
+
+
+def test_forgotten_invalidations_are_assumed_to_be_recent():
+    cache = TTLCache(maxsize=1)
+    generation = cache.generation()
+    cache.invalidate("p1")
+    cache.invalidate("p2")  # p1's invalidation is no longer tracked
+    cache.set("p1", "old", generation=generation)
+
+    assert cache.get("p1") is None
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    """The DynamoDB backend reading one project from a stand-in table."""
+    from api.db import dynamodb
+
+    class Table:
+        name = "projects"
+
+        def get_item(self, Key, **kwargs):
+            return {"Item": {
+                "PK": Key["PK"], "SK": Key["SK"], "project_id": "p1", "organization_id": "org_test",
+                "status": "LIVE", "tags": {"team": "web"},
+            }}
+
+    monkeypatch.setattr(dynamodb, "get_projects_table", Table)
+    dynamodb._project_cache.clear()
+    yield dynamodb
+    dynamodb._project_cache.clear()
+
+
+def test_cached_projects_are_copies(dynamodb):
+    """Callers changing a project they read can't change what others read."""
+    project = dynamodb.get_project_by_key("org_test", "p1", cached=True)
+    project["status"] = "FAILED"
+    project["tags"]["team"] = "api"
+
+    cached = dynamodb.get_project_by_key("org_test", "p1", cached=True)
+    cached.pop("status")
+
+    again = dynamodb.get_project_by_key("org_test", "p1", cached=True)
+    assert again["status"] == "LIVE"
+    assert again["tags"] == {"team": "web"}
+    assert dynamodb.get_project_cache_stats()["hits"] >= 2
@@ -0,0 +1,63 @@
+"""Routes await storage on the I/O pool, so slow storage doesn't block the event loop."""
+
+import asyncio
+import functools
+import time
+
+import pytest
+
+from api.concurrency import offload
+from api.db import aio
+from api.db import storage as db
+from api.routes import deployments, github, projects
+
+# Injected latency per storage call, in seconds (the way a boto3 round trip blocks)
+LATENCY = 0.05
+
+
+@pytest.fixture
+def slow_storage(monkeypatch):
+    """Make every awaitable storage call block its thread for LATENCY first."""
+    def slow(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            time.sleep(LATENCY)
+            return func(*args, **kwargs)
+        return wrapper
+
+    # The routes import the api.db.aio functions by name
+    awaitables = {name: getattr(aio, name) for name in db.OPERATIONS if hasattr(aio, name)}
+    for module in (aio, projects, deployments, github):
+        for name, func in awaitables.items():
+            if getattr(module, name, None) is func:
+                monkeypatch.setattr(module, name, offload(slow(getattr(db, name))))
+
+
+def test_slow_storage_calls_overlap_across_requests(project, slow_storage):
+    """Concurrent requests wait on storage together, not one after another."""
+    import httpx
+
+    from api.auth import get_current_user_id
+    from api.main import app
+
+    path = f"/api/projects/{project['project_id']}"
+    requests = 8
+
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.get(path, params={"org_id": "org_test"}) for _ in range(requests)
+            ))
+            return time.perf_counter() - start, responses
+
+    app.dependency_overrides[get_current_user_id] = lambda: "user_test"
+    try:
+        elapsed, responses = asyncio.run(send_all())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [r.status_code for r in responses] == [200] * requests
+    # Each request makes two storage calls: served one at a time, that's 16 × LATENCY
+    assert elapsed < 6 * LATENCY
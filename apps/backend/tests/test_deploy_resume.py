@@ -0,0 +1,144 @@
+"""Crash-and-resume of the checkpointed deployment state machine, with fake AWS steps."""
+
+import time
+import uuid
+from collections import Counter
+
+import pytest
+
+import deployer.aws
+from api.db import storage as db
+from api.routes import projects
+from deployer import orchestrator
+
+# Boundaries a crash is injected after: each stage's checkpoint write, and
+# each phase change on the deployment record
+STAGE_BOUNDARIES = (
+    "detect_runtime",
+    "ecr_repository",
+    "codebuild_role",
+    "lambda_role",
+    "codebuild_project",
+    "start_build",
+    "build",
+    "image",
+    "lambda_update",
+    "function_url",
+)
+PHASE_BOUNDARIES = ("phase:BUILD", "phase:ROLLOUT", "phase:DONE")
+
+
+class Crash(BaseException):
+    """The worker died (not an Exception: no handler gets to run)."""
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the deployer's AWS/GitHub steps with fakes; counts calls per step."""
+    calls = Counter()
+
+    def fake(name, result):
+        def step(*args, **kwargs):
+            calls[name] += 1
+            return result
+        return step
+
+    monkeypatch.setattr(orchestrator, "detect_runtime_from_github", fake("detect_runtime_from_github", "python"))
+    monkeypatch.setattr(orchestrator, "create_ecr_repository", fake(
+        "create_ecr_repository", "123456789012.dkr.ecr.us-east-1.amazonaws.com/shorlabs-test"
+    ))
+    monkeypatch.setattr(orchestrator, "get_or_create_codebuild_role", fake("get_or_create_codebuild_role", "arn:cb"))
+    monkeypatch.setattr(orchestrator, "get_or_create_lambda_role", fake("get_or_create_lambda_role", "arn:lambda"))
+    monkeypatch.setattr(orchestrator, "create_or_update_codebuild_project", fake("create_or_update_codebuild_project", None))
+    monkeypatch.setattr(orchestrator, "start_build", fake("start_build", "shorlabs-builder:test"))
+    monkeypatch.setattr(orchestrator, "get_image_digest", fake("get_image_digest", "sha256:test"))
+    monkeypatch.setattr(orchestrator, "update_lambda_function", fake("update_lambda_function", None))
+    monkeypatch.setattr(orchestrator, "get_or_create_function_url", fake("get_or_create_function_url", "https://test.aws"))
+    monkeypatch.setattr(deployer.aws, "get_build_status", lambda build_id: {"status": "SUCCEEDED"})
+    return calls
+
+
+@pytest.fixture
+def clock(storage, monkeypatch):
+    """Wall clock of the storage backend; `clock.advance(s)` moves it forward."""
+    class Clock:
+        skew = 0
+
+        def time(self):
+            return time.time() + self.skew
+
+        def advance(self, seconds):
+            self.skew += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(storage, "time", clock)
+    return clock
+
+
+def inject_crash(monkeypatch, boundary: str) -> None:
+    """Make the worker die once, right after `boundary` is written."""
+    save_checkpoint = db.save_deployment_checkpoint
+    update_deployment = db.update_deployment
+    fired = []
+
+    def crash_once(point):
+        if point == boundary and not fired:
+            fired.append(point)
+            raise Crash(point)
+
+    def checkpoint(project_id, sk, stage, output=None, updates=None):
+        save_checkpoint(project_id, sk, stage, output, updates)
+        crash_once(stage)
+
+    def update(project_id, deploy_id, updates, **kwargs):
+        result = update_deployment(project_id, deploy_id, updates, **kwargs)
+        if result is not None and "phase" in updates:
+            crash_once(f"phase:{updates['phase']}")
+        return result
+
+    monkeypatch.setattr(db, "save_deployment_checkpoint", checkpoint)
+    monkeypatch.setattr(db, "update_deployment", update)
+
+
+def deliver(handler, *args, **kwargs) -> bool:
+    """Deliver one message; True if it was processed (deleted from the queue)."""
+    try:
+        handler(*args, **kwargs)
+        return True
+    except (Crash, LookupError):
+        return False
+
+
+@pytest.mark.parametrize("boundary", STAGE_BOUNDARIES + PHASE_BOUNDARIES)
+def test_deployment_resumes_after_a_crash(project, calls, clock, monkeypatch, boundary):
+    """Redelivered messages finish the deployment without repeating a step."""
+    project_id = project["project_id"]
+    request_id = uuid.uuid4().hex
+    event = projects.build_state_change_event("shorlabs-builder:test", "SUCCEEDED")
+    inject_crash(monkeypatch, boundary)
+
+    deploy_done = event_done = False
+    for _ in range(5):
+        if not deploy_done:
+            deploy_done = deliver(
+                projects._run_deployment_sync, project_id, project["github_url"], "token",
+                organization_id="org_test", request_id=request_id,
+            )
+        # CodeBuild only sends the event for a build that was started
+        if calls["start_build"] and not event_done:
+            event_done = deliver(projects.handle_codebuild_event, event)
+            if not event_done:
+                clock.advance(projects.ROLLOUT_LEASE_SECONDS + 1)  # SQS visibility timeout
+        if deploy_done and event_done:
+            break
+
+    assert db.get_project(project_id)["status"] == "LIVE"
+    [deployment] = db.list_deployments(project_id)
+    assert (deployment["status"], deployment["phase"]) == ("SUCCEEDED", "DONE")
+    assert set(deployment["checkpoints"]) == set(STAGE_BOUNDARIES)
+    assert [name for name, count in calls.items() if count > 1] == []
+
+    # A duplicate build event after completion changes nothing
+    before = dict(calls)
+    assert projects.handle_codebuild_event(event) is None
+    assert calls == before
@@ -0,0 +1,82 @@
+"""The deploy stage graph, with latency-injected fake AWS/GitHub steps."""
+
+import functools
+import time
+
+import pytest
+
+from deployer import orchestrator, stages
+
+# Simulated latency of one round trip, in seconds
+RTT = 0.03
+
+# Round trips each phase-one step makes (see scripts/bench_deploy_stages.py)
+FAKE_ROUND_TRIPS = {
+    "detect_runtime_from_github": 5,
+    "create_ecr_repository": 1,
+    "get_or_create_codebuild_role": 1,
+    "get_or_create_lambda_role": 8,
+    "create_or_update_codebuild_project": 2,
+    "start_build": 2,
+}
+
+
+@pytest.fixture
+def durations(monkeypatch):
+    """Install the fakes; returns stage name -> seconds, as the listeners see it."""
+    def fake(name, result):
+        def step(*args, **kwargs):
+            time.sleep(FAKE_ROUND_TRIPS[name] * RTT)
+            return result
+        return step
+
+    monkeypatch.setattr(orchestrator, "detect_runtime_from_github", fake("detect_runtime_from_github", "python"))
+    monkeypatch.setattr(orchestrator, "create_ecr_repository", fake(
+        "create_ecr_repository", "123456789012.dkr.ecr.us-east-1.amazonaws.com/shorlabs-test"
+    ))
+    monkeypatch.setattr(orchestrator, "get_or_create_codebuild_role", fake("get_or_create_codebuild_role", "arn:cb"))
+    monkeypatch.setattr(orchestrator, "get_or_create_lambda_role", fake("get_or_create_lambda_role", "arn:lambda"))
+    monkeypatch.setattr(orchestrator, "create_or_update_codebuild_project", fake("create_or_update_codebuild_project", None))
+    monkeypatch.setattr(orchestrator, "start_build", fake("start_build", "shorlabs-builder:test"))
+
+    durations = {}
+    monkeypatch.setattr(stages, "_listeners", [])
+    stages.add_stage_listener(lambda stage, seconds, succeeded: durations.__setitem__(stage, seconds))
+    return durations
+
+
+def start(monkeypatch, max_workers: int) -> float:
+    """Run phase one of a fake deployment; returns wall-clock seconds."""
+    monkeypatch.setattr(orchestrator, "run_stages", functools.partial(stages.run_stages, max_workers=max_workers))
+    began = time.perf_counter()
+    started = orchestrator.start_deployment(
+        github_url="https://github.com/octo/app", github_token="token", project_id="test0000",
+    )
+    assert started["build_id"] == "shorlabs-builder:test"
+    return time.perf_counter() - began
+
+
+def test_independent_stages_shorten_the_critical_path(monkeypatch, durations):
+    sequential = start(monkeypatch, max_workers=1)
+    assert sequential >= sum(FAKE_ROUND_TRIPS.values()) * RTT
+
+    parallel = start(monkeypatch, max_workers=stages.MAX_PARALLEL_STAGES)
+    # The Lambda role (8 round trips) is the longest chain; everything else overlaps it
+    assert parallel < 12 * RTT < sequential
+    assert set(durations) == {
+        "detect_runtime", "ecr_repository", "codebuild_role", "lambda_role", "codebuild_project", "start_build",
+    }
+    assert durations["lambda_role"] >= 8 * RTT
+
+
+def test_failed_stage_skips_its_dependents(monkeypatch, durations):
+    def fail(*args, **kwargs):
+        raise RuntimeError("AccessDenied")
+
+    monkeypatch.setattr(orchestrator, "get_or_create_codebuild_role", fail)
+
+    with pytest.raises(RuntimeError, match="AccessDenied"):
+        start(monkeypatch, max_workers=stages.MAX_PARALLEL_STAGES)
+
+    assert "codebuild_project" not in durations
+    assert "start_build" not in durations
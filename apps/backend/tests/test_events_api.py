@@ -0,0 +1,117 @@
+"""Events posted to /events: who may send them, and where they are handled."""
+
+import json
+import threading
+
+import pytest
+
+from api import main
+from api.routes.projects import build_state_change_event
+
+SECRET = "events-secret"
+
+
+@pytest.fixture(autouse=True)
+def events_secret(monkeypatch):
+    monkeypatch.setattr(main, "EVENTS_SECRET", SECRET)
+
+
+def test_direct_build_event_requires_secret(client, storage, project):
+    storage.create_deployment(project["project_id"], "shorlabs-builder:1", "org_test")
+    event = build_state_change_event("shorlabs-builder:1", "FAILED")
+
+    assert client.post("/events", json=event).status_code == 401
+    assert client.post("/events", json=event, headers={"X-Events-Secret": "guess"}).status_code == 401
+
+    [deployment] = storage.list_deployments(project["project_id"])
+    assert deployment["status"] == "IN_PROGRESS"
+
+
+def test_direct_build_event_rejected_without_configured_secret(client, monkeypatch):
+    monkeypatch.setattr(main, "EVENTS_SECRET", "")
+    event = build_state_change_event("shorlabs-builder:1", "SUCCEEDED")
+
+    assert client.post("/events", json=event, headers={"X-Events-Secret": ""}).status_code == 401
+
+
+def test_build_event_for_unknown_build_is_retried(client):
+    """No deployment is waiting on the build (yet): a non-2xx status makes the sender retry."""
+    event = build_state_change_event("shorlabs-builder:unknown", "SUCCEEDED")
+
+    response = client.post("/events", json=event, headers={"X-Events-Secret": SECRET})
+
+    assert response.status_code == 409
+
+
+def stream_batch(project_id: str) -> dict:
+    """A DynamoDB Streams batch removing a project."""
+    return {
+        "Records": [{
+            "eventSource": "aws:dynamodb",
+            "eventName": "REMOVE",
+            "dynamodb": {"Keys": {"PK": {"S": "ORG#org_test"}, "SK": {"S": f"PROJECT#{project_id}"}}},
+        }]
+    }
+
+
+def test_stream_records_require_secret(client, project):
+    batch = stream_batch(project["project_id"])
+
+    assert client.post("/events", json=batch).status_code == 401
+
+    response = client.post("/events", json=batch, headers={"X-Events-Secret": SECRET})
+    assert response.status_code == 200
+    assert response.json()["body"] == "Published 1 project changes"
+
+
+QUEUE_ARN = "arn:aws:sqs:us-east-1:123456789012:shorlabs-build-events"
+
+
+def sqs_batch(event: dict, source_arn: str = QUEUE_ARN) -> dict:
+    """An SQS batch carrying one event, as the Lambda Web Adapter posts it."""
+    return {
+        "Records": [{
+            "messageId": "m1",
+            "eventSource": "aws:sqs",
+            "eventSourceARN": source_arn,
+            "body": json.dumps(event),
+        }]
+    }
+
+
+def test_sqs_records_must_come_from_an_event_queue(client, storage, project, monkeypatch):
+    """Records wrapped in an SQS envelope by anyone else are rejected, like direct events."""
+    monkeypatch.setattr(main, "EVENT_QUEUE_ARNS", {QUEUE_ARN})
+    storage.create_deployment(project["project_id"], "shorlabs-builder:1", "org_test")
+    event = build_state_change_event("shorlabs-builder:1", "FAILED")
+
+    # Through the function URL (the adapter adds the request context)
+    forged = client.post("/events", json=sqs_batch(event), headers={"x-amzn-request-context": "{}"})
+    assert forged.status_code == 401
+    # From a queue the Lambda doesn't consume
+    other_queue = sqs_batch(event, "arn:aws:sqs:us-east-1:210987654321:elsewhere")
+    assert client.post("/events", json=other_queue).status_code == 401
+
+    [deployment] = storage.list_deployments(project["project_id"])
+    assert deployment["status"] == "IN_PROGRESS"
+
+
+def test_sqs_records_rejected_without_configured_queues(client, monkeypatch):
+    monkeypatch.setattr(main, "EVENT_QUEUE_ARNS", set())
+    event = build_state_change_event("shorlabs-builder:1", "FAILED")
+
+    assert client.post("/events", json=sqs_batch(event)).status_code == 401
+
+
+def test_sqs_records_are_handled_off_the_event_loop(client, monkeypatch):
+    from api.routes import projects
+
+    monkeypatch.setattr(main, "EVENT_QUEUE_ARNS", {QUEUE_ARN})
+    threads = []
+    monkeypatch.setattr(projects, "handle_codebuild_event", lambda event: threads.append(threading.current_thread()))
+
+    response = client.post("/events", json=sqs_batch(build_state_change_event("shorlabs-builder:1", "SUCCEEDED")))
+
+    assert response.status_code == 200
+    [thread] = threads
+    assert thread.name.startswith("io")
@@ -0,0 +1,77 @@
+"""Pooled HTTP clients across event loops."""
+
+import asyncio
+import http.server
+import queue
+import socketserver
+import threading
+
+import pytest
+
+from api.http_clients import HTTPClients
+
+
+class OKHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so the client pools the connection
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), OKHandler)
+    server.daemon_threads = True  # don't wait for connections a test leaves open
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_are_closed_with_their_event_loop(server_url):
+    clients = HTTPClients()
+
+    async def request():
+        client = clients.github()
+        assert (await client.get(server_url)).status_code == 200
+        return client
+
+    first = asyncio.run(request())
+    assert first.is_closed
+
+    second = asyncio.run(request())
+    assert second is not first and second.is_closed
+
+
+def test_clients_of_a_running_loop_are_closed_there():
+    """A loop still running in another thread closes its old clients right away."""
+    clients = HTTPClients()
+    handoff = queue.Queue()
+    release = threading.Event()
+
+    async def hold_loop():
+        handoff.put(clients.github())
+        await asyncio.to_thread(release.wait)
+
+    thread = threading.Thread(target=asyncio.run, args=(hold_loop(),))
+    thread.start()
+    try:
+        first = handoff.get(timeout=5)
+
+        async def replace():
+            client = clients.github()
+            await asyncio.sleep(0.1)
+            return client
+
+        second = asyncio.run(replace())
+        assert second is not first
+        assert first.is_closed
+    finally:
+        release.set()
+        thread.join()
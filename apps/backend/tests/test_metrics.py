@@ -0,0 +1,39 @@
+"""Metric exporters."""
+
+import threading
+
+from api import metrics
+from api.metrics import Gauge, Registry, register_cache
+
+
+def test_cache_hits_and_misses_are_counters(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(metrics, "registry", registry)
+
+    register_cache("tokens", lambda: {"hits": 3, "misses": 1, "size": 2})
+    text = registry.render_openmetrics()
+
+    assert "# TYPE shorlabs_cache_hits counter" in text
+    assert 'shorlabs_cache_hits_total{cache="tokens"} 3' in text
+    assert 'shorlabs_cache_misses_total{cache="tokens"} 1' in text
+    assert "# TYPE shorlabs_cache_size gauge" in text
+    assert 'shorlabs_cache_size{cache="tokens"} 2' in text
+
+
+def test_request_path_flush_reads_callbacks_off_the_event_loop(client, monkeypatch, capsys):
+    """Callback metrics may block (AWS calls): the middleware's flush runs on the I/O pool."""
+    threads = []
+
+    def callback():
+        threads.append(threading.current_thread().name)
+        return {(): 1}
+
+    gauge = Gauge("test_blocking_gauge", "Reads something slow.", callback=callback)
+    monkeypatch.setitem(metrics.registry._metrics, gauge.name, gauge)
+    monkeypatch.setattr(metrics, "METRICS_EMF_ENABLED", True)
+    monkeypatch.setattr(metrics, "METRICS_EMF_FLUSH_SECONDS", 0)
+
+    assert client.get("/health").status_code == 200
+
+    assert threads and all(name.startswith("io") for name in threads)
+    assert "shorlabs_test_blocking_gauge" in capsys.readouterr().out
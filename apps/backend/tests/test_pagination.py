@@ -0,0 +1,71 @@
+"""Pagination cursors on the in-memory backend."""
+
+import pytest
+
+from api.db.common import encode_cursor
+
+
+def paginated_routes(project_id):
+    """(path, cursor parameter, params) of every route that takes a cursor."""
+    return [
+        ("/api/projects", "cursor", {"org_id": "org_test", "limit": 1}),
+        (f"/api/projects/{project_id}", "deployments_cursor", {"org_id": "org_test", "deployments_limit": 1}),
+        ("/api/deployments", "cursor", {"org_id": "org_test", "limit": 1}),
+    ]
+
+
+@pytest.fixture
+def history(storage, project):
+    """Two projects of org "org_test" with two deployments each."""
+    other = storage.create_project("user_test", "org_test", "other", "https://github.com/octo/other", "octo/other")
+    for p in (project, other):
+        for _ in range(2):
+            storage.create_deployment(p["project_id"], organization_id="org_test", request_id="req")
+    return project
+
+
+def test_cursors_page_through_every_route(client, history):
+    for path, name, params in paginated_routes(history["project_id"]):
+        first = client.get(path, params=params)
+        assert first.status_code == 200
+        body = first.json()
+        cursor = first.headers.get("x-next-cursor") or body.get("next_cursor") or body.get("deployments_next_cursor")
+        assert cursor, path
+
+        second = client.get(path, params=dict(params, **{name: cursor}))
+        assert second.status_code == 200, path
+
+
+@pytest.mark.parametrize("key", [
+    {"SK": "PROJECT#x"},
+    {"PK": "ORG#org_test", "SK": None},
+    {"PK": "ORG#org_test", "SK": "PROJECT#x", "extra": "1"},
+    {"project_id": "p", "SK": "DEPLOY#x"},
+    ["not", "a", "key"],
+])
+def test_malformed_cursors_are_rejected(client, history, key):
+    cursor = encode_cursor(key)
+
+    for path, name, params in paginated_routes(history["project_id"]):
+        response = client.get(path, params=dict(params, **{name: cursor}))
+        assert response.status_code == 400, path
+
+
+def test_cursors_from_another_partition_are_rejected(client, storage, history):
+    """A cursor can't be used to page through another org's or project's items."""
+    stranger = storage.create_project("user_x", "org_other", "x", "https://github.com/octo/x", "octo/x")
+    storage.create_deployment(stranger["project_id"], organization_id="org_other", request_id="req")
+    cursors = {
+        "/api/projects": encode_cursor({"PK": "ORG#org_other", "SK": f"PROJECT#{stranger['project_id']}"}),
+        f"/api/projects/{history['project_id']}": encode_cursor(
+            {"project_id": stranger["project_id"], "SK": "DEPLOY#2099"}
+        ),
+        "/api/deployments": encode_cursor({
+            "organization_id": "org_other", "started_at": "2099", "project_id": stranger["project_id"],
+            "SK": "DEPLOY#2099",
+        }),
+    }
+
+    for path, name, params in paginated_routes(history["project_id"]):
+        response = client.get(path, params=dict(params, **{name: cursors[path]}))
+        assert response.status_code == 400, path
@@ -0,0 +1,120 @@
+"""Project routes on the in-memory backend."""
+
+import asyncio
+import json
+
+
+def test_project_details_with_deployment_before_build(client, storage, project):
+    """A deployment recorded before its build started has no build_id yet."""
+    storage.create_deployment(project["project_id"], organization_id="org_test", request_id="req")
+
+    response = client.get(f"/api/projects/{project['project_id']}", params={"org_id": "org_test"})
+
+    assert response.status_code == 200
+    [deployment] = response.json()["deployments"]
+    assert deployment["build_id"] is None
+    assert deployment["status"] == "IN_PROGRESS"
+
+
+def test_project_details_lists_build_id(client, storage, project):
+    storage.create_deployment(project["project_id"], "shorlabs-builder:1", "org_test")
+
+    response = client.get(f"/api/projects/{project['project_id']}", params={"org_id": "org_test"})
+
+    assert response.status_code == 200
+    assert response.json()["deployments"][0]["build_id"] == "shorlabs-builder:1"
+
+
+def test_project_list_etag_changes_on_every_write(client, storage, project):
+    """The list ETag is revalidated from the org version: each write changes it."""
+    project_id = project["project_id"]
+    seen = []
+
+    def list_etag():
+        response = client.get("/api/projects", params={"org_id": "org_test"})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        cached = client.get("/api/projects", params={"org_id": "org_test"}, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert etag not in seen
+        seen.append(etag)
+        return response.json()
+
+    list_etag()
+
+    # Hot field only
+    storage.update_project_by_key("org_test", project_id, {"status": "LIVE"})
+    list_etag()
+
+    # Config field only (written to the CONFIG# item)
+    response = client.put(
+        f"/api/projects/{project_id}/env-vars", params={"org_id": "org_test"}, json={"env_vars": {"A": "1"}}
+    )
+    assert response.status_code == 200
+    list_etag()
+
+    other = storage.create_project("user_test", "org_test", "other", "https://github.com/octo/other", "octo/other")
+    list_etag()
+
+    storage.delete_project(project_id)
+    listing = list_etag()
+    assert [p["project_id"] for p in listing] == [other["project_id"]]
+
+
+def test_project_details_etag_changes_on_deployment_writes(client, storage, project):
+    """Deployment writes don't touch the project's updated_at, but still change the details ETag."""
+    project_id = project["project_id"]
+    deployment = storage.create_deployment(project_id, organization_id="org_test", request_id="req")
+    params = {"org_id": "org_test"}
+
+    def details_etag():
+        response = client.get(f"/api/projects/{project_id}", params=params)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        cached = client.get(f"/api/projects/{project_id}", params=params, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        return etag, response.json()["deployments"][0]
+
+    etag, _ = details_etag()
+
+    storage.save_deployment_checkpoint(
+        project_id, deployment["SK"], "start_build", "shorlabs-builder:1", {"build_id": "shorlabs-builder:1"}
+    )
+    stale = client.get(f"/api/projects/{project_id}", params=params, headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+    etag, shown = details_etag()
+    assert shown["build_id"] == "shorlabs-builder:1"
+
+    storage.update_deployment(project_id, deployment["deploy_id"], {"status": "SUCCEEDED"})
+    stale = client.get(f"/api/projects/{project_id}", params=params, headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+    assert stale.json()["deployments"][0]["status"] == "SUCCEEDED"
+
+
+
+def test_status_stream_starts_from_the_stored_status(storage, project, monkeypatch):
+    """The first event is read consistently, not from a cache another process's write left stale."""
+    from api.routes import projects
+
+    storage.update_project_by_key("org_test", project["project_id"], {"status": "LIVE"})
+    read = projects.get_project_by_key
+
+    async def get_project_by_key(org_id, project_id, cached=False, **kwargs):
+        if cached:
+            return dict(project, status="BUILDING")  # what a stale cache would hold
+        return await read(org_id, project_id, **kwargs)
+
+    monkeypatch.setattr(projects, "get_project_by_key", get_project_by_key)
+
+    async def first_event():
+        response = await projects.stream_project_events(
+            project["project_id"], request=None, user_id="user_test", org_id="org_test"
+        )
+        try:
+            return await response.body_iterator.__anext__()
+        finally:
+            await response.body_iterator.aclose()
+
+    event = asyncio.run(first_event())
+
+    assert json.loads(event.split("data: ", 1)[1])["status"] == "LIVE"
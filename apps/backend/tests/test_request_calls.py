@@ -0,0 +1,101 @@
+"""The DynamoDB backend's request path issues no DescribeTable (moto's in-process fake)."""
+
+from collections import Counter
+
+import pytest
+
+from api.concurrency import offload
+from api.db import aio
+from api.db import storage as db
+from api.routes import deployments, github, projects
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    """The API bound to the DynamoDB backend on freshly provisioned fake tables."""
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.delenv("AWS_ENDPOINT_URL_DYNAMODB", raising=False)
+
+    from api.db import dynamodb
+
+    with moto.mock_aws():
+        dynamodb.get_dynamodb_resource.cache_clear()
+        dynamodb.provision_tables()
+        # The routes import the api.db.aio functions by name
+        awaitables = {name: getattr(aio, name) for name in db.OPERATIONS if hasattr(aio, name)}
+        for module in (aio, projects, deployments, github):
+            for name, func in awaitables.items():
+                if getattr(module, name, None) is func:
+                    monkeypatch.setattr(module, name, offload(getattr(dynamodb, name)))
+        for name in db.OPERATIONS:
+            monkeypatch.setattr(db, name, getattr(dynamodb, name))
+        yield dynamodb
+        dynamodb._table_registry.clear()
+        dynamodb._project_cache.clear()
+        dynamodb.get_dynamodb_resource.cache_clear()
+
+
+@pytest.fixture
+def calls(dynamodb):
+    """DynamoDB calls by operation, from a fresh process's point of view (no table handles yet)."""
+    calls = Counter()
+
+    def count(model, **kwargs):
+        calls[model.name] += 1
+
+    dynamodb.get_dynamodb_resource().meta.client.meta.events.register("before-call.dynamodb", count)
+    dynamodb._table_registry.clear()
+    dynamodb._project_cache.clear()
+    return calls
+
+
+def endpoints(project_id: str) -> list:
+    """(method, path, request kwargs) for every storage-backed endpoint."""
+    params = {"org_id": "org_test"}
+    return [
+        ("GET", "/api/projects", {"params": params}),
+        ("GET", "/api/projects", {"params": dict(params, limit=10)}),
+        ("GET", f"/api/projects/{project_id}", {"params": params}),
+        ("GET", f"/api/projects/{project_id}/status", {"params": params}),
+        ("PUT", f"/api/projects/{project_id}/env-vars", {"params": params, "json": {"env_vars": {"GREETING": "hi"}}}),
+        ("PATCH", f"/api/projects/{project_id}", {"params": params, "json": {"name": "checked"}}),
+        ("GET", "/api/deployments", {"params": params}),
+        ("GET", "/api/github/status", {"params": params}),
+    ]
+
+
+def test_tables_are_described_once_per_process(client, dynamodb, calls):
+    project = dynamodb.create_project(
+        "user_test", "org_test", "demo", "https://github.com/octo/demo", "octo/demo", env_vars={"A": "1"},
+    )
+    dynamodb.create_deployment(project["project_id"], "shorlabs-builder:test", "org_test")
+    dynamodb.save_github_token("org_test", "user_test", "token", {"username": "octo"}, "1")
+    # One DescribeTable per table, the first time the process uses it
+    assert calls["DescribeTable"] == len(dynamodb._table_registry) == 3
+
+    for method, path, kwargs in endpoints(project["project_id"]):
+        calls.clear()
+        response = client.request(method, path, **kwargs)
+
+        assert response.status_code == 200, f"{method} {path}: {response.text}"
+        assert calls["DescribeTable"] == 0, f"{method} {path}"
+        assert sum(calls.values()) > 0, f"{method} {path}"
+
+
+def test_stale_table_handles_are_bootstrapped_again(dynamodb, calls):
+    """A handle whose table is gone is dropped and re-bootstrapped once, then reused."""
+    project = dynamodb.create_project(
+        "user_test", "org_test", "demo", "https://github.com/octo/demo", "octo/demo",
+    )
+    stale = dynamodb.get_dynamodb_resource().Table("shorlabs-deleted")
+    dynamodb._table_registry[dynamodb.TABLE_NAME] = stale
+    calls.clear()
+
+    assert dynamodb.get_project(project["project_id"])["project_id"] == project["project_id"]
+    assert dynamodb.get_project(project["project_id"])["project_id"] == project["project_id"]
+
+    assert calls["DescribeTable"] == 1
+    assert dynamodb._table_registry[dynamodb.TABLE_NAME] is not stale
@@ -0,0 +1,75 @@
+"""Deployment retention and its archive."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.db import archive, retention
+from api.db.retention import apply_deployment_retention, select_expired_deployments
+
+
+def deployments(count: int, age: timedelta = timedelta()) -> list:
+    """`count` finished deployments started `age` ago, newest first."""
+    started_at = (datetime.utcnow() - age).isoformat()
+    return [
+        {"deploy_id": f"d{i}", "SK": f"DEPLOY#{i:04d}", "status": "SUCCEEDED", "started_at": started_at}
+        for i in reversed(range(count))
+    ]
+
+
+def test_recent_deployments_are_capped():
+    """A project that deploys often keeps at most max_count deployments, however recent."""
+    history = deployments(12)
+
+    expired = select_expired_deployments(history, keep_count=3, keep_days=30, max_count=10)
+
+    assert [d["deploy_id"] for d in expired] == ["d1", "d0"]
+
+
+def test_old_deployments_expire_beyond_keep_count():
+    history = deployments(5, age=timedelta(days=60))
+
+    expired = select_expired_deployments(history, keep_count=3, keep_days=30, max_count=10)
+
+    assert [d["deploy_id"] for d in expired] == ["d1", "d0"]
+
+
+def test_in_progress_deployments_are_never_expired():
+    history = deployments(5)
+    history[-1]["status"] = "IN_PROGRESS"
+
+    expired = select_expired_deployments(history, keep_count=1, keep_days=30, max_count=2)
+
+    assert [d["deploy_id"] for d in expired] == ["d2", "d1"]
+
+
+@pytest.fixture
+def object_store():
+    archive.get_object_store.cache_clear()
+    yield
+    archive.get_object_store.cache_clear()
+
+
+def test_archive_requires_a_bucket_on_lambda(storage, project, monkeypatch, object_store):
+    """Lambda's filesystem is read-only: without a bucket, nothing is expired."""
+    monkeypatch.setattr(archive, "DEPLOYMENT_ARCHIVE_BUCKET", None)
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "shorlabs-api")
+    for _ in range(3):
+        deployment = storage.create_deployment(project["project_id"], organization_id="org_test", request_id="r")
+        storage.update_deployment(project["project_id"], deployment["deploy_id"], {"status": "SUCCEEDED"})
+    monkeypatch.setattr(retention, "select_expired_deployments", lambda history: history[1:])
+
+    with pytest.raises(archive.ArchiveNotConfiguredError):
+        apply_deployment_retention(project["project_id"])
+
+    assert len(storage.list_deployments(project["project_id"])) == 3
+
+
+def test_archive_falls_back_to_a_local_directory(monkeypatch, tmp_path, object_store):
+    monkeypatch.setattr(archive, "DEPLOYMENT_ARCHIVE_BUCKET", None)
+    monkeypatch.setattr(archive, "DEPLOYMENT_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+
+    archive.write_deployment_archive("p1", deployments(2))
+
+    assert [d["deploy_id"] for d in archive.read_archived_deployments("p1")] == ["d1", "d0"]